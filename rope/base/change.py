@@ -1,6 +1,8 @@
 import datetime
 import difflib
 import os
+import sys
+import tempfile
 import time
 
 import rope.base.fscommands
@@ -61,7 +63,7 @@ class ChangeSet(Change):
     def do(self, job_set=taskhandle.NullJobSet()):
         try:
             done = []
-            for change in self.changes:
+            for change in _batch_changes(self.changes):
                 change.do(job_set)
                 done.append(change)
             self.time = time.time()
@@ -73,7 +75,7 @@ class ChangeSet(Change):
     def undo(self, job_set=taskhandle.NullJobSet()):
         try:
             done = []
-            for change in reversed(self.changes):
+            for change in reversed(_batch_changes(self.changes)):
                 change.undo(job_set)
                 done.append(change)
         except Exception:
@@ -115,6 +117,225 @@ class ChangeSet(Change):
         return result
 
 
+class LazyChangeSet(ChangeSet):
+    """A `ChangeSet` whose changes are computed when they are needed
+
+    `changes` is an iterable, usually a generator, of `Change` objects.
+    `iter_changes()` generates the changes one by one, so that they
+    can be previewed before all of them are computed; `changes` field
+    computes all of them.  `do()` computes all the changes before
+    performing any of them, since performing a change might affect
+    the changes that follow.
+
+    If `spill` is `True`, the contents of `ChangeContents` changes are
+    moved to a temporary `ContentsJournal` as soon as they are
+    computed or performed, so that only the contents of the file being
+    changed are kept in memory.
+
+    """
+
+    def __init__(self, description, changes, timestamp=None, spill=False):
+        super(LazyChangeSet, self).__init__(description, timestamp)
+        self._pending = iter(changes)
+        self.journal = ContentsJournal() if spill else None
+
+    @property
+    def changes(self):
+        for change in self.iter_changes():
+            pass
+        return self._changes
+
+    @changes.setter
+    def changes(self, changes):
+        self._changes = changes
+
+    def is_computed(self):
+        """Tell whether all of the changes have been computed"""
+        return self._pending is None
+
+    def iter_changes(self):
+        """Generate the changes, computing them if necessary"""
+        index = 0
+        while index < len(self._changes) or self._compute_next():
+            yield self._changes[index]
+            index += 1
+
+    def _compute_next(self):
+        if self._pending is None:
+            return False
+        try:
+            change = next(self._pending)
+        except StopIteration:
+            self._pending = None
+            return False
+        self._spill(change)
+        self._changes.append(change)
+        return True
+
+    def _spill(self, change):
+        if self.journal is None:
+            return
+        if isinstance(change, ChangeContents):
+            change.spill(self.journal)
+        elif isinstance(change, ChangeSet):
+            for child in change.changes:
+                self._spill(child)
+
+    def do(self, job_set=taskhandle.NullJobSet()):
+        changes = _batch_changes(self.changes, self.journal)
+        try:
+            done = []
+            for change in changes:
+                change.do(job_set)
+                done.append(change)
+                self._spill(change)
+            self.time = time.time()
+        except Exception:
+            for change in done:
+                change.undo()
+            raise
+
+    def add_change(self, change):
+        self.changes.append(change)
+        self._spill(change)
+
+    def get_description(self):
+        result = [str(self) + ':\n\n\n']
+        for change in self.iter_changes():
+            result.append(change.get_description())
+            result.append('\n')
+        return ''.join(result)
+
+
+class ContentsJournal(object):
+    """Keeps texts in a temporary file
+
+    `add()` writes a text to the file and returns an object whose
+    `read()` method reads it back.  The file is removed when the
+    journal is garbage collected.
+
+    """
+
+    def __init__(self):
+        self._file = None
+        self._size = 0
+
+    def add(self, text):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        data = text.encode('utf-8', _encoding_errors)
+        self._file.seek(self._size)
+        self._file.write(data)
+        entry = _JournalEntry(self, self._size, len(data))
+        self._size += len(data)
+        return entry
+
+    def _read(self, offset, length):
+        self._file.seek(offset)
+        return self._file.read(length).decode('utf-8', _encoding_errors)
+
+
+class _JournalEntry(object):
+
+    def __init__(self, journal, offset, length):
+        self.journal = journal
+        self.offset = offset
+        self.length = length
+
+    def read(self):
+        return self.journal._read(self.offset, self.length)
+
+
+_encoding_errors = 'surrogatepass' if sys.version_info[0] > 2 else 'strict'
+
+
+class _ChangeContentsBatch(ChangeSet):
+    """Performs several `ChangeContents` at once
+
+    The files are replaced only after all of them are written and
+    observers are notified once for all of them.  If writing fails,
+    no file is changed.  If `journal` is given, old contents are moved
+    to it as soon as they are read.  Contents are read one file at a
+    time just before writing them; so the contents that are kept in
+    the journal are not all loaded at once.
+
+    """
+
+    def __init__(self, changes, journal=None):
+        super(_ChangeContentsBatch, self).__init__('Changing files')
+        self.changes = changes
+        self.journal = journal
+        self.project = changes[0].resource.project
+
+    def do(self, job_set=taskhandle.NullJobSet()):
+        for change in self.changes:
+            if change.old_contents is None:
+                change.old_contents = change.resource.read()
+                if self.journal is not None:
+                    change.spill(self.journal)
+        try:
+            self._write(job_set, 'new_contents')
+        except Exception:
+            self._restore()
+            raise
+
+    def _restore(self):
+        # files written with different `fscommands` might be replaced
+        operations = _ResourceOperations(self.project)
+        for change in self.changes:
+            if change.resource.exists() and \
+               change.resource.read() != change.old_contents:
+                operations.write_file(change.resource, change.old_contents)
+
+    def undo(self, job_set=taskhandle.NullJobSet()):
+        for change in self.changes:
+            if change.old_contents is None:
+                raise exceptions.HistoryError(
+                    'Undoing a change that is not performed yet!')
+        self._write(job_set, 'old_contents')
+
+    def _write(self, job_set, attribute):
+        changes = dict((change.resource, change) for change in self.changes)
+
+        def get_contents(resource):
+            return getattr(changes[resource], attribute)
+        for change in self.changes:
+            job_set.started_job(str(change))
+        _ResourceOperations(self.project).write_files(
+            [change.resource for change in self.changes], get_contents)
+        for change in self.changes:
+            job_set.finished_job()
+
+
+def _batch_changes(changes, journal=None):
+    """Group consecutive `ChangeContents` into `_ChangeContentsBatch`
+
+    Changes to a resource that has been changed in the same batch
+    start a new batch.
+    """
+    result = []
+    batch = []
+    resources = set()
+    for change in list(changes) + [None]:
+        if isinstance(change, ChangeContents) and \
+           change.resource not in resources:
+            batch.append(change)
+            resources.add(change.resource)
+            continue
+        if len(batch) > 1:
+            result.append(_ChangeContentsBatch(batch, journal))
+        else:
+            result.extend(batch)
+        batch = []
+        resources = set()
+        if isinstance(change, ChangeContents):
+            batch.append(change)
+            resources.add(change.resource)
+        elif change is not None:
+            result.append(change)
+    return result
+
+
 def _handle_job_set(function):
     """A decorator for handling `taskhandle.JobSet`
 
@@ -143,6 +364,29 @@ class ChangeContents(Change):
         self.new_contents = new_contents
         self.old_contents = old_contents
 
+    @property
+    def new_contents(self):
+        return _read_contents(self._new_contents)
+
+    @new_contents.setter
+    def new_contents(self, contents):
+        self._new_contents = contents
+
+    @property
+    def old_contents(self):
+        return _read_contents(self._old_contents)
+
+    @old_contents.setter
+    def old_contents(self, contents):
+        self._old_contents = contents
+
+    def spill(self, journal):
+        """Move the contents of this change to a `ContentsJournal`"""
+        if isinstance(self._new_contents, _text_type):
+            self._new_contents = journal.add(self._new_contents)
+        if isinstance(self._old_contents, _text_type):
+            self._old_contents = journal.add(self._old_contents)
+
     @_handle_job_set
     def do(self):
         if self.old_contents is None:
@@ -176,6 +420,15 @@ class ChangeContents(Change):
         return [self.resource]
 
 
+def _read_contents(contents):
+    if isinstance(contents, _JournalEntry):
+        return contents.read()
+    return contents
+
+
+_text_type = type(u'')
+
+
 class MoveResource(Change):
     """Move a resource to a new location
 
@@ -302,11 +555,20 @@ class RemoveResource(Change):
 
 
 def count_changes(change):
-    """Counts the number of basic changes a `Change` will make"""
+    """Counts the number of basic changes a `Change` will make
+
+    `None` is returned for `LazyChangeSet` whose changes are not
+    computed yet.
+    """
+    if isinstance(change, LazyChangeSet) and not change.is_computed():
+        return None
     if isinstance(change, ChangeSet):
         result = 0
         for child in change.changes:
-            result += count_changes(child)
+            count = count_changes(child)
+            if count is None:
+                return None
+            result += count
         return result
     return 1
 
@@ -334,6 +596,37 @@ class _ResourceOperations(object):
         for observer in list(self.project.observers):
             observer.resource_changed(resource)
 
+    def write_files(self, resources, get_contents):
+        """Write several files at once
+
+        `get_contents(resource)` returns the new contents of each of
+        `resources`; it is called just before writing that file.
+        Observers are notified after all files are written.
+        """
+        groups = []
+        for resource in resources:
+            fscommands = self._get_fscommands(resource)
+            if not groups or groups[-1][0] is not fscommands:
+                groups.append((fscommands, []))
+            groups[-1][1].append(resource)
+        fsync = self.project.prefs.get('fsync_changes', False)
+        for fscommands, group in groups:
+            items = ((resource.real_path,
+                      rope.base.fscommands.unicode_to_file_data(
+                          get_contents(resource)))
+                     for resource in group)
+            if hasattr(fscommands, 'write_many'):
+                fscommands.write_many(items, fsync)
+            else:
+                for path, data in items:
+                    fscommands.write(path, data)
+        for observer in list(self.project.observers):
+            if hasattr(observer, 'resources_changed'):
+                observer.resources_changed(resources)
+            else:
+                for resource in resources:
+                    observer.resource_changed(resource)
+
     def move(self, resource, new_resource):
         fscommands = self._get_fscommands(resource)
         fscommands.move(resource.real_path, new_resource.real_path)
@@ -393,7 +686,11 @@ class ChangeToData(object):
         return (description, changes, change.time)
 
     def convertChangeContents(self, change):
-        return (change.resource.path, change.new_contents, change.old_contents)
+        # old contents are saved as a delta against the new contents
+        if change.old_contents is None:
+            return (change.resource.path, change.new_contents, None)
+        delta = _get_delta(change.new_contents, change.old_contents)
+        return (change.resource.path, change.new_contents, None, delta)
 
     def convertMoveResource(self, change):
         return (change.resource.path, change.new_resource.path)
@@ -408,6 +705,8 @@ class ChangeToData(object):
         change_type = type(change)
         if change_type in (CreateFolder, CreateFile):
             change_type = CreateResource
+        elif change_type is LazyChangeSet:
+            change_type = ChangeSet
         method = getattr(self, 'convert' + change_type.__name__)
         return (change_type.__name__, method(change))
 
@@ -423,8 +722,11 @@ class DataToChange(object):
             result.add_change(self(child))
         return result
 
-    def makeChangeContents(self, path, new_contents, old_contents):
+    def makeChangeContents(self, path, new_contents, old_contents,
+                           old_delta=None):
         resource = self.project.get_file(path)
+        if old_delta is not None:
+            old_contents = _apply_delta(new_contents, old_delta)
         return ChangeContents(resource, new_contents, old_contents)
 
     def makeMoveResource(self, old_path, new_path):
@@ -448,3 +750,25 @@ class DataToChange(object):
     def __call__(self, data):
         method = getattr(self, 'make' + data[0])
         return method(*data[1])
+
+
+def _get_delta(text, other):
+    """Return the changes needed for changing `text` to `other`
+
+    The result is a list of ``(start, end, lines)`` tuples; `lines`
+    should replace lines `start` till `end` of `text`.
+    """
+    lines = text.splitlines(True)
+    other_lines = other.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, lines, other_lines)
+    return [(start, end, other_lines[other_start:other_end])
+            for tag, start, end, other_start, other_end
+            in matcher.get_opcodes() if tag != 'equal']
+
+
+def _apply_delta(text, delta):
+    """Apply a delta returned by `_get_delta()` to `text`"""
+    lines = text.splitlines(True)
+    for start, end, new_lines in reversed(delta):
+        lines[start:end] = new_lines
+    return ''.join(lines)
@@ -1,8 +1,11 @@
+import array
 import bisect
 import re
 import token
 import tokenize
 
+from rope.base import utils
+
 
 class ChangeCollector(object):
 
@@ -36,25 +39,13 @@ class ChangeCollector(object):
 class SourceLinesAdapter(object):
     """Adapts source to Lines interface
 
-    Note: The creation of this class is expensive.
+    The line starts of each source are computed once and shared by
+    the adapters of the same source; see `get_line_starts()`.
     """
 
     def __init__(self, source_code):
         self.code = source_code
-        self.starts = None
-        self._initialize_line_starts()
-
-    def _initialize_line_starts(self):
-        self.starts = []
-        self.starts.append(0)
-        try:
-            i = 0
-            while True:
-                i = self.code.index('\n', i) + 1
-                self.starts.append(i)
-        except ValueError:
-            pass
-        self.starts.append(len(self.code) + 1)
+        self.starts = get_line_starts(source_code)
 
     def get_line(self, lineno):
         return self.code[self.starts[lineno - 1]:
@@ -72,6 +63,31 @@ class SourceLinesAdapter(object):
     def get_line_end(self, lineno):
         return self.starts[lineno] - 1
 
+    def get_line_and_column(self, offset):
+        """Return the line number and column of `offset`"""
+        lineno = bisect.bisect(self.starts, offset)
+        return lineno, offset - self.starts[lineno - 1]
+
+    def get_offset(self, lineno, column):
+        """Return the offset of `column` in line `lineno`"""
+        return self.starts[lineno - 1] + column
+
+
+@utils.cached(16)
+def get_line_starts(source_code):
+    """Return the offsets of the starts of lines in `source_code`
+
+    The result is an `array.array` with one more item than the number
+    of lines; the last one is one more than the length of the source.
+    It is shared between callers and should not be changed.
+    """
+    starts = array.array('l', [0])
+    offset = 0
+    for line in source_code.split('\n'):
+        offset += len(line) + 1
+        starts.append(offset)
+    return starts
+
 
 class ArrayLinesAdapter(object):
 
@@ -160,9 +176,53 @@ class _CustomGenerator(object):
 
 
 def custom_generator(lines):
+    if isinstance(lines, SourceLinesAdapter):
+        return _generate_logical_lines(lines)
     return _CustomGenerator(lines)()
 
 
+def _generate_logical_lines(lines):
+    """Like `_CustomGenerator` but uses `get_source_regions()`"""
+    code = lines.code
+    regions = get_source_regions(code)
+    continued = set()
+    parens = 0
+    index = 0
+    for match in _line_tokens.finditer(code):
+        offset = match.start()
+        while index < len(regions) and regions[index][1] <= offset:
+            index += 1
+        token = match.group()
+        if index < len(regions) and regions[index][0] <= offset:
+            # new lines in strings continue lines but backslashes at
+            # the end of comments do not
+            if token[-1] == '\n' and \
+               (regions[index][2] != 'comment' or parens):
+                continued.add(lines.get_line_number(offset))
+        elif token in '([{':
+            parens += 1
+        elif token in ')]}':
+            parens -= 1
+        elif parens or token == '\\\n':
+            continued.add(lines.get_line_number(offset))
+    size = lines.length()
+    result = []
+    i = 1
+    while i <= size:
+        while i <= size and not lines.get_line(i).strip():
+            i += 1
+        if i <= size:
+            start = i
+            while i in continued and i < size:
+                i += 1
+            result.append((start, i))
+            i += 1
+    return result
+
+
+_line_tokens = re.compile(r'\\\n|[\({\[\]}\)\n]')
+
+
 class LogicalLineFinder(object):
 
     def __init__(self, lines):
@@ -369,3 +429,28 @@ def get_formatted_string_pattern():
 
 def get_comment_pattern():
     return r'#[^\n]*'
+
+
+@utils.cached(7)
+def get_source_regions(source):
+    """Return comments, strings and formatted strings of `source`
+
+    The result is a list of ``(start, end, kind)`` tuples sorted by
+    offset, in which `kind` is one of ``'comment'``, ``'string'`` or
+    ``'fstring'``.  The source is scanned only once for logical lines,
+    `rope.base.simplify`, `rope.base.worder.Worder` and textual
+    occurrence finders.
+    """
+    global _regions_pattern
+    if _regions_pattern is None:
+        # the lookahead lets the scanner skip most offsets quickly
+        _regions_pattern = re.compile(
+            '(?=[#\'"]|[uUbBrRfF]{1,2}[\'"])'
+            '(?:(?P<comment>%s)|(?P<string>%s)|(?P<fstring>%s))' % (
+                get_comment_pattern(), get_string_pattern(),
+                get_formatted_string_pattern()))
+    return [(match.start(), match.end(), match.lastgroup)
+            for match in _regions_pattern.finditer(source)]
+
+
+_regions_pattern = None
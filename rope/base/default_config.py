@@ -41,6 +41,36 @@ def set_prefs(prefs):
     prefs['save_objectdb'] = True
     prefs['compress_objectdb'] = False
 
+    # Where to keep object information: 'memory' loads all of it when
+    # the project is opened and saves all of it when it is closed;
+    # 'sqlite' keeps it in an SQLite database and reads and writes only
+    # what is used, which is faster for projects with large object DBs.
+    prefs['objectdb_backend'] = 'memory'
+
+    # If `True`, rope keeps an index of the names used in each file
+    # and skips the files that cannot contain a name when searching
+    # for its occurrences.  It makes renames much faster in large
+    # projects.
+    prefs['use_name_index'] = False
+    prefs['save_name_index'] = True
+    prefs['compress_name_index'] = False
+
+    # If `True`, rope keeps the parsed ASTs of modules in the
+    # ``astcache`` folder of ``.ropeproject`` and loads them instead
+    # of parsing unchanged files again.
+    prefs['save_ast_cache'] = False
+
+    # The maximum number of modules rope keeps in memory; the least
+    # recently used ones are dropped when there are more.  Zero means
+    # no limit.  Useful for long-running processes in large projects.
+    prefs['max_cached_modules'] = 0
+
+    # If `True`, rope asks the operating system to report changes made
+    # to project files by other programs (only Linux inotify is
+    # supported for now) and `project.validate()` checks only these
+    # files.
+    prefs['watch_files'] = False
+
     # If `True`, rope analyzes each module when it is being saved.
     prefs['automatic_soa'] = True
     # The depth of calls to follow in static object analysis
@@ -49,6 +79,17 @@ def set_prefs(prefs):
     # If `False` when running modules or unit tests "dynamic object
     # analysis" is turned off.  This makes them much faster.
     prefs['perform_doa'] = True
+    # If it is more than zero, only the first `doa_samples` calls
+    # with different argument and return types are recorded for each
+    # function.  Rope then uses a profile function instead of a trace
+    # function and the programs run much faster while collecting
+    # data.
+    prefs['doa_samples'] = 0
+
+    # The maximum number of calls with different arguments or returned
+    # objects recorded for each function in dynamic object analysis.
+    # Zero means no limit.
+    prefs['max_doa_calls'] = 0
 
     # Rope can check the validity of its object DB when running.
     prefs['validate_objectdb'] = True
@@ -60,6 +101,10 @@ def set_prefs(prefs):
     prefs['save_history'] = True
     prefs['compress_history'] = False
 
+    # If `True`, files changed together by a refactoring are flushed
+    # to the disk before replacing the old files.
+    prefs['fsync_changes'] = False
+
     # Set the number spaces used for indenting.  According to
     # :PEP:`8`, it is best to use 4 spaces.  Since most of rope's
     # unit-tests use 4 spaces it is more reliable, too.
@@ -10,6 +10,7 @@ import re
 import os
 import shutil
 import subprocess
+import tempfile
 
 import rope.base.utils.pycompat as pycompat
 
@@ -58,6 +59,87 @@ class FileSystemCommands(object):
         finally:
             file_.close()
 
+    def write_many(self, items, fsync=False):
+        """Write several files at once
+
+        `items` is an iterable of ``(path, data)`` tuples.  The data of
+        existing files is written to temporary files in the same
+        folders first; they replace the files only after all of them
+        are written, so if writing fails no file is changed.  `items`
+        is consumed one item at a time and only the data of the files
+        that do not exist yet is kept until the files are replaced.
+        If `fsync` is `True`, the temporary files are flushed to the
+        disk before replacing the files.
+
+        """
+        temps = []
+        try:
+            for path, data in items:
+                path = os.path.realpath(path)
+                if os.path.isfile(path):
+                    temps.append((self._write_temp(path, data, fsync),
+                                  path, None))
+                else:
+                    temps.append((None, path, data))
+        except Exception:
+            self._remove_temps(temps)
+            raise
+        folders = set(os.path.dirname(path) for temp, path, data in temps)
+        try:
+            while temps:
+                temp, path, data = temps.pop(0)
+                if temp is None:
+                    self.write(path, data)
+                else:
+                    _replace(temp, path)
+        finally:
+            self._remove_temps(temps)
+        if fsync:
+            for folder in folders:
+                _fsync_folder(folder)
+
+    def _remove_temps(self, temps):
+        for temp, path, data in temps:
+            if temp is not None:
+                _remove_quietly(temp)
+
+    def _write_temp(self, path, data, fsync):
+        folder, name = os.path.split(path)
+        fd, temp = tempfile.mkstemp(prefix='.' + name + '.', dir=folder)
+        try:
+            with os.fdopen(fd, 'wb') as file_:
+                file_.write(data)
+                if fsync:
+                    file_.flush()
+                    os.fsync(file_.fileno())
+            os.chmod(temp, os.stat(path).st_mode & 0o7777)
+        except Exception:
+            _remove_quietly(temp)
+            raise
+        return temp
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _fsync_folder(path):
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class SubversionCommands(object):
 
@@ -83,6 +165,9 @@ class SubversionCommands(object):
     def write(self, path, data):
         self.normal_actions.write(path, data)
 
+    def write_many(self, items, fsync=False):
+        self.normal_actions.write_many(items, fsync)
+
 
 class MercurialCommands(object):
 
@@ -127,33 +212,134 @@ class MercurialCommands(object):
     def write(self, path, data):
         self.normal_actions.write(path, data)
 
+    def write_many(self, items, fsync=False):
+        self.normal_actions.write_many(items, fsync)
+
 
 class GITCommands(object):
+    """Performs file system operations and updates the git index
+
+    Between `start_batch()` and `end_batch()` calls, files are moved
+    and removed directly and the index is updated when the batch ends,
+    running one git process for all paths of consecutive operations of
+    the same kind.
+
+    """
+
+    _chunk_size = 1000
 
     def __init__(self, root):
         self.root = root
         self._do(['version'])
         self.normal_actions = FileSystemCommands()
+        self._batch_depth = 0
+        self._pending = []
 
     def create_file(self, path):
         self.normal_actions.create_file(path)
-        self._do(['add', self._in_dir(path)])
+        if self._batch_depth:
+            self._queue('add', self._in_dir(path))
+        else:
+            self._do(['add', self._in_dir(path)])
 
     def create_folder(self, path):
         self.normal_actions.create_folder(path)
 
     def move(self, path, new_location):
-        self._do(['mv', self._in_dir(path), self._in_dir(new_location)])
+        if self._batch_depth:
+            self.normal_actions.move(path, new_location)
+            self._queue_move(self._in_dir(path), self._in_dir(new_location))
+        else:
+            self._do(['mv', self._in_dir(path), self._in_dir(new_location)])
 
     def remove(self, path):
-        self._do(['rm', self._in_dir(path)])
+        if self._batch_depth:
+            self.normal_actions.remove(path)
+            self._queue('rm', self._in_dir(path))
+        else:
+            self._do(['rm', self._in_dir(path)])
 
     def write(self, path, data):
         # XXX: should we use ``git add``?
         self.normal_actions.write(path, data)
 
-    def _do(self, args):
-        _execute(['git'] + args, cwd=self.root)
+    def write_many(self, items, fsync=False):
+        self.normal_actions.write_many(items, fsync)
+
+    def start_batch(self):
+        self._batch_depth += 1
+
+    def end_batch(self):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            pending = self._pending
+            self._pending = []
+            for kind, items in pending:
+                getattr(self, '_update_' + kind)(items)
+
+    def _queue(self, kind, item):
+        if not self._pending or self._pending[-1][0] != kind:
+            self._pending.append((kind, []))
+        self._pending[-1][1].append(item)
+
+    def _queue_move(self, path, new_path):
+        if self._pending and self._pending[-1][0] == 'mv':
+            moves = self._pending[-1][1]
+            for index, (old_path, moved_path) in enumerate(moves):
+                if moved_path == path:
+                    moves[index] = (old_path, new_path)
+                    return
+        self._queue('mv', (path, new_path))
+
+    def _update_add(self, paths):
+        self._do_paths(['add'], paths)
+
+    def _update_rm(self, paths):
+        self._do_paths(['rm', '-r', '--cached', '--quiet',
+                        '--ignore-unmatch'], paths)
+
+    def _update_mv(self, moves):
+        # moving index entries like ``git mv`` does; changes in the
+        # working tree that are not staged should stay unstaged
+        moves = [(_git_path(path), _git_path(new_path))
+                 for path, new_path in moves]
+        moved = dict(moves)
+        removed = []
+        added = []
+        for info, path in self._index_entries(
+                [path for path, new_path in moves]):
+            parent = path
+            while parent:
+                if parent in moved:
+                    new_path = moved[parent] + path[len(parent):]
+                    removed.append(b'0 ' + b'0' * 40 + b'\t' + path)
+                    added.append(info + b'\t' + new_path)
+                    break
+                parent = parent.rpartition(b'/')[0]
+        if added:
+            self._do(['update-index', '-z', '--index-info'],
+                     input=b''.join(entry + b'\0'
+                                    for entry in removed + added))
+
+    def _index_entries(self, paths):
+        result = []
+        for chunk in self._chunks(paths):
+            output = _read_output(['git', '--literal-pathspecs', 'ls-files',
+                                   '-s', '-z', '--'] + chunk, cwd=self.root)
+            result.extend(entry.split(b'\t', 1)
+                          for entry in output.split(b'\0') if entry)
+        return result
+
+    def _do_paths(self, args, paths):
+        for chunk in self._chunks(paths):
+            self._do(['--literal-pathspecs'] + args + ['--'] + chunk)
+
+    def _chunks(self, paths):
+        return [paths[index:index + self._chunk_size]
+                for index in range(0, len(paths), self._chunk_size)]
+
+    def _do(self, args, input=None):
+        _execute(['git'] + args, cwd=self.root, input=input)
 
     def _in_dir(self, path):
         if path.startswith(self.root):
@@ -161,6 +347,14 @@ class GITCommands(object):
         return self.root
 
 
+def _git_path(path):
+    path = path.replace(os.sep, '/')
+    if isinstance(path, bytes):
+        return path
+    return path.encode('utf-8', 'surrogateescape' if pycompat.PY3
+                       else 'strict')
+
+
 class DarcsCommands(object):
 
     def __init__(self, root):
@@ -184,16 +378,54 @@ class DarcsCommands(object):
     def write(self, path, data):
         self.normal_actions.write(path, data)
 
+    def write_many(self, items, fsync=False):
+        self.normal_actions.write_many(items, fsync)
+
     def _do(self, args):
         _execute(['darcs'] + args, cwd=self.root)
 
 
-def _execute(args, cwd=None):
-    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE)
-    process.wait()
+def _execute(args, cwd=None, input=None):
+    if input is None:
+        process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE)
+        process.wait()
+    else:
+        process = subprocess.Popen(args, cwd=cwd, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE)
+        process.communicate(input)
     return process.returncode
 
 
+def _read_output(args, cwd=None):
+    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE)
+    return process.communicate()[0]
+
+
+def batch(fscommands):
+    """Return a context manager for grouping the operations of `fscommands`
+
+    `fscommands` that update a version control system might update it
+    for all operations performed in the ``with`` statement at once;
+    see `GITCommands`.
+    """
+    return _Batch(fscommands)
+
+
+class _Batch(object):
+
+    def __init__(self, fscommands):
+        self.fscommands = fscommands
+
+    def __enter__(self):
+        if hasattr(self.fscommands, 'start_batch'):
+            self.fscommands.start_batch()
+        return self.fscommands
+
+    def __exit__(self, type, value, traceback):
+        if hasattr(self.fscommands, 'end_batch'):
+            self.fscommands.end_batch()
+
+
 def unicode_to_file_data(contents, encoding=None):
     if not isinstance(contents, unicode):
         return contents
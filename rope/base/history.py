@@ -1,28 +1,73 @@
-from rope.base import exceptions, change, taskhandle
+from rope.base import exceptions, change, fscommands, taskhandle
 
 
 class History(object):
-    """A class that holds project history"""
+    """A class that holds project history
+
+    The history is saved in an append-only journal: each change is
+    written once, when the history is written for the first time after
+    it is done, and after that only the ids of the changes in undo and
+    redo lists are appended.  The journal is rewritten when it holds
+    too many changes that are no longer in these lists.
+
+    """
 
     def __init__(self, project, maxundos=None):
         self.project = project
         self._undo_list = []
         self._redo_list = []
         self._maxundos = maxundos
+        self._change_ids = {}
+        self._next_id = 0
+        self._journal_changes = None
         self._load_history()
         self.project.data_files.add_write_hook(self.write)
         self.current_change = None
 
     def _load_history(self):
         if self.save:
-            result = self.project.data_files.read_data(
+            records, complete = self.project.data_files.read_journal(
                 'history', compress=self.compress, import_=True)
-            if result is not None:
-                to_change = change.DataToChange(self.project)
-                for data in result[0]:
-                    self._undo_list.append(to_change(data))
-                for data in result[1]:
-                    self._redo_list.append(to_change(data))
+            if len(records) == 1 and isinstance(records[0], list):
+                self._load_old_history(records[0])
+            elif records:
+                self._load_journal(records)
+            if not complete:
+                # changes appended after what could not be read would
+                # be lost; rewrite the journal instead
+                self._journal_changes = None
+
+    def _load_old_history(self, data):
+        to_change = change.DataToChange(self.project)
+        for change_data in data[0]:
+            self._undo_list.append(to_change(change_data))
+        for change_data in data[1]:
+            self._redo_list.append(to_change(change_data))
+
+    def _load_journal(self, records):
+        to_change = change.DataToChange(self.project)
+        changes = {}
+        undo_ids = redo_ids = []
+        for record in records:
+            if record[0] == 'snapshot':
+                changes.clear()
+                for id, change_data in record[1]:
+                    changes[id] = change_data
+                undo_ids, redo_ids = record[2], record[3]
+            elif record[0] == 'change':
+                changes[record[1]] = record[2]
+            elif record[0] == 'lists':
+                undo_ids, redo_ids = record[1], record[2]
+        self._journal_changes = len(changes)
+        if changes:
+            self._next_id = max(changes) + 1
+        for ids, change_list in ((undo_ids, self._undo_list),
+                                 (redo_ids, self._redo_list)):
+            for id in ids:
+                if id in changes:
+                    change_ = to_change(changes[id])
+                    self._change_ids[change_] = id
+                    change_list.append(change_)
 
     def do(self, changes, task_handle=taskhandle.NullTaskHandle()):
         """Perform the change and add it to the `self.undo_list`
@@ -33,7 +78,8 @@ class History(object):
         """
         try:
             self.current_change = changes
-            changes.do(change.create_job_set(task_handle, changes))
+            with fscommands.batch(self.project.fscommands):
+                changes.do(change.create_job_set(task_handle, changes))
         finally:
             self.current_change = None
         if self._is_change_interesting(changes):
@@ -111,7 +157,8 @@ class History(object):
             try:
                 job_set = change.create_job_set(task_handle,
                                                 self.current_change)
-                self.current_change.undo(job_set)
+                with fscommands.batch(self.project.fscommands):
+                    self.current_change.undo(job_set)
             finally:
                 self.current_change = None
             self.redo_list.append(self.undo_list.pop())
@@ -122,7 +169,8 @@ class History(object):
             try:
                 job_set = change.create_job_set(task_handle,
                                                 self.current_change)
-                self.current_change.do(job_set)
+                with fscommands.batch(self.project.fscommands):
+                    self.current_change.do(job_set)
             finally:
                 self.current_change = None
             self.undo_list.append(self.redo_list.pop())
@@ -151,13 +199,51 @@ class History(object):
 
     def write(self):
         if self.save:
-            data = []
-            to_data = change.ChangeToData()
             self._remove_extra_items()
-            data.append([to_data(change_) for change_ in self.undo_list])
-            data.append([to_data(change_) for change_ in self.redo_list])
-            self.project.data_files.write_data('history', data,
-                                               compress=self.compress)
+            changes = self.undo_list + self.redo_list
+            new_changes = [change_ for change_ in changes
+                           if change_ not in self._change_ids]
+            if self._journal_changes is None or \
+               self._journal_changes + len(new_changes) > \
+               2 * max(self.max_undos, len(changes)):
+                self._write_snapshot(changes)
+            else:
+                self._append_to_journal(new_changes)
+
+    def _write_snapshot(self, changes):
+        to_data = change.ChangeToData()
+        live_ids = {}
+        for change_ in changes:
+            live_ids[change_] = self._get_change_id(change_)
+        self._change_ids = live_ids
+        data = [(self._change_ids[change_], to_data(change_))
+                for change_ in changes]
+        record = ('snapshot', data) + self._get_list_ids()
+        self.project.data_files.write_data('history', record,
+                                           compress=self.compress)
+        self._journal_changes = len(changes)
+
+    def _append_to_journal(self, new_changes):
+        to_data = change.ChangeToData()
+        data_files = self.project.data_files
+        for change_ in new_changes:
+            record = ('change', self._get_change_id(change_),
+                      to_data(change_))
+            data_files.write_data('history', record,
+                                  compress=self.compress, append=True)
+            self._journal_changes += 1
+        data_files.write_data('history', ('lists',) + self._get_list_ids(),
+                              compress=self.compress, append=True)
+
+    def _get_change_id(self, change_):
+        if change_ not in self._change_ids:
+            self._change_ids[change_] = self._next_id
+            self._next_id += 1
+        return self._change_ids[change_]
+
+    def _get_list_ids(self):
+        return ([self._change_ids[change_] for change_ in self.undo_list],
+                [self._change_ids[change_] for change_ in self.redo_list])
 
     def get_file_undo_list(self, resource):
         result = []
@@ -3,6 +3,7 @@ import os.path
 
 import rope.base.project
 import rope.base.pycore
+from rope.base import parallel
 from rope.base import pyobjectsdef
 from rope.base import utils
 from rope.base import taskhandle
@@ -70,19 +71,50 @@ def analyze_module(project, resource):
     project.pycore.analyze_module(resource)
 
 
-def analyze_modules(project, task_handle=taskhandle.NullTaskHandle()):
+def analyze_modules(project, task_handle=taskhandle.NullTaskHandle(),
+                    workers=None):
     """Perform static object analysis on all python files in the project
 
     Note that this might be really time consuming.
+
+    If `workers` is not `None`, the files are divided among `workers`
+    processes; see `rope.base.parallel`.  The information collected
+    in them is added to the object DB of `project`.  Each process uses
+    only the information it collects; so the results might be less
+    complete than analyzing the files in this process.
     """
     resources = project.get_python_files()
     job_set = task_handle.create_jobset('Analyzing Modules', len(resources))
+    if parallel.is_available(workers) and len(resources) > 1:
+        results = parallel.map_resources(
+            project, _analyze_resources, resources,
+            workers=workers, job_set=job_set)
+        objectdb = project.pycore.object_info.objectdb
+        for records in results:
+            objectdb.add_records(records)
+        project.pycore.module_cache.forget_all_data()
+        return
     for resource in resources:
         job_set.started_job(resource.path)
         analyze_module(project, resource)
         job_set.finished_job()
 
 
+def _analyze_resources(project, resources):
+    """Called in `rope.base.parallel` worker processes
+
+    Returns the records of the object information collected.
+    """
+    objectdb = project.pycore.object_info.objectdb
+    objectdb.start_recording()
+    try:
+        for resource in resources:
+            project.pycore.analyze_module(resource)
+    finally:
+        records = objectdb.stop_recording()
+    return records
+
+
 def get_string_module(project, code, resource=None, force_errors=False):
     """Returns a `PyObject` object for the given code
 
@@ -0,0 +1,142 @@
+"""An index of the identifiers used in project files
+
+`NameIndex` keeps the set of identifiers used in each file.  It is
+used by `rope.refactor.occurrences.Finder` for skipping the files
+that cannot contain the name being searched for, without reading or
+parsing them.
+
+The index is kept in ``.ropeproject/nameindex``.  Entries are updated
+when rope changes a file and are checked against the modification
+time and size of files (see `rope.base.resourceobserver.
+ChangeIndicator`) for catching changes made by other programs.
+
+"""
+import re
+
+from rope.base import exceptions
+from rope.base import resourceobserver
+
+
+class NameIndex(object):
+
+    def __init__(self, project, observe=True):
+        """Construct a NameIndex object
+
+        If `observe` is `True`, listen for project changes and update
+        the index.
+        """
+        self.project = project
+        self.timekeeper = resourceobserver.ChangeIndicator()
+        self.files = {}
+        self._load()
+        project.data_files.add_write_hook(self._write)
+        if observe:
+            observer = resourceobserver.ResourceObserver(
+                changed=self._changed, moved=self._moved,
+                removed=self._removed)
+            project.add_observer(observer)
+
+    def contains(self, resource, name):
+        """Tell whether `name` might appear in `resource`
+
+        It returns `True` when the index cannot tell; for instance
+        when `resource` cannot be read.
+        """
+        if not _is_identifier(name):
+            return True
+        names = self._get_names(resource)
+        return names is None or name in names
+
+    def get_names(self, resource):
+        """Return the set of identifiers used in `resource`"""
+        names = self._get_names(resource)
+        if names is None:
+            return set()
+        return set(names)
+
+    def filter_resources(self, resources, name):
+        """Return the resources in `resources` that might contain `name`"""
+        return [resource for resource in resources
+                if self.contains(resource, name)]
+
+    def get_resources(self, name):
+        """Return the python files of the project that might contain `name`
+        """
+        return self.filter_resources(self.project.get_python_files(), name)
+
+    def clear(self):
+        """Clear all entries of the index"""
+        self.files.clear()
+
+    def _get_names(self, resource):
+        path = resource.path
+        try:
+            indicator = self.timekeeper.get_indicator(resource)
+        except OSError:
+            self._forget(path)
+            return None
+        if path in self.files:
+            old_indicator, names = self.files[path]
+            if old_indicator == indicator:
+                return names
+        try:
+            source = resource.read()
+        except (IOError, exceptions.ModuleDecodeError):
+            self._forget(path)
+            return None
+        names = frozenset(_find_identifiers(source))
+        self.files[path] = (indicator, names)
+        return names
+
+    def _forget(self, path):
+        self.files.pop(path, None)
+
+    def _load(self):
+        if not self.persist:
+            return
+        data = self.project.data_files.read_data(
+            'nameindex', compress=self.compress)
+        if data is not None:
+            self.files.update(data)
+
+    def _write(self):
+        if self.persist:
+            self.project.data_files.write_data(
+                'nameindex', self.files, self.compress)
+
+    def _changed(self, resource):
+        if not resource.is_folder():
+            self._forget(resource.path)
+
+    def _moved(self, resource, new_resource):
+        self._removed(resource)
+        self._changed(new_resource)
+
+    def _removed(self, resource):
+        if resource.is_folder():
+            prefix = resource.path + '/' if resource.path else ''
+            for path in list(self.files):
+                if path.startswith(prefix):
+                    self._forget(path)
+        else:
+            self._forget(resource.path)
+
+    @property
+    def compress(self):
+        return self.project.prefs.get('compress_name_index', False)
+
+    @property
+    def persist(self):
+        return self.project.prefs.get('save_name_index', True)
+
+
+_identifier_pattern = re.compile(r'\w+', re.UNICODE)
+
+
+def _is_identifier(name):
+    match = _identifier_pattern.match(name)
+    return match is not None and match.end() == len(name)
+
+
+def _find_identifiers(source):
+    return _identifier_pattern.findall(source)
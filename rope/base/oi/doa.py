@@ -8,6 +8,7 @@ except ImportError:
 import marshal
 import os
 import socket
+import struct
 import subprocess
 import sys
 import tempfile
@@ -36,14 +37,24 @@ except ImportError:
     compare_digest = _compat_compare_digest
 
 
+_header_size = 4 + hashlib.sha256().digest_size
+_max_frame_size = 1 << 28
+
+
 class PythonFileRunner(object):
     """A class for running python project files"""
 
     def __init__(self, pycore, file_, args=None, stdin=None,
-                 stdout=None, analyze_data=None):
+                 stdout=None, analyze_data=None, analyze_batch=None):
+        """Construct a runner
+
+        `analyze_data` is called for each call record received from
+        the process and `analyze_batch` for lists of them.
+        """
         self.pycore = pycore
         self.file = file_
         self.analyze_data = analyze_data
+        self.analyze_batch = analyze_batch
         self.observers = []
         self.args = args
         self.stdin = stdin
@@ -63,10 +74,14 @@ class PythonFileRunner(object):
         send_info = '-'
         if self.receiver:
             send_info = self.receiver.get_send_info()
+        prefs = self.pycore.project.prefs
+        samples = prefs.get('doa_samples', 0)
+        max_calls = prefs.get('max_doa_calls', 0)
         args = [sys.executable, runmod_path, send_info,
-                self.pycore.project.address, self.file.real_path]
-        if self.analyze_data is None:
-            del args[1:4]
+                self.pycore.project.address, str(samples), str(max_calls),
+                self.file.real_path]
+        if not self._is_analyzing():
+            del args[1:6]
         if self.args is not None:
             args.extend(self.args)
         self.process = subprocess.Popen(
@@ -74,16 +89,20 @@ class PythonFileRunner(object):
             cwd=os.path.split(file_path)[0], stdin=self.stdin,
             stdout=self.stdout, stderr=self.stdout, close_fds=os.name != 'nt')
 
+    def _is_analyzing(self):
+        return self.analyze_data is not None or \
+            self.analyze_batch is not None
+
     def _init_data_receiving(self):
-        if self.analyze_data is None:
+        if not self._is_analyzing():
             return
         # Disabling FIFO data transfer due to blocking when running
         # unittests in the GUI.
         # XXX: Handle FIFO data transfer for `rope.ui.testview`
-        if True or os.name == 'nt':
-            self.receiver = _SocketReceiver()
+        if hasattr(socket, 'AF_UNIX'):
+            self.receiver = _UnixSocketReceiver()
         else:
-            self.receiver = _FIFOReceiver()
+            self.receiver = _SocketReceiver()
         self.receiving_thread = threading.Thread(
             target=self._receive_information)
         self.receiving_thread.setDaemon(True)
@@ -91,8 +110,12 @@ class PythonFileRunner(object):
 
     def _receive_information(self):
         #temp = open('/dev/shm/info', 'wb')
-        for data in self.receiver.receive_data():
-            self.analyze_data(data)
+        for batch in self.receiver.receive_batches():
+            if self.analyze_batch is not None:
+                self.analyze_batch(batch)
+            if self.analyze_data is not None:
+                for data in batch:
+                    self.analyze_data(data)
             #temp.write(str(data) + '\n')
         #temp.close()
         for observer in self.observers:
@@ -101,7 +124,7 @@ class PythonFileRunner(object):
     def wait_process(self):
         """Wait for the process to finish"""
         self.process.wait()
-        if self.analyze_data:
+        if self._is_analyzing():
             self.receiving_thread.join()
 
     def kill_process(self):
@@ -125,10 +148,63 @@ class PythonFileRunner(object):
         self.observers.append(observer)
 
 
+class PythonFileRunners(object):
+    """Runs python project files at the same time
+
+    It has the methods of `PythonFileRunner` for controlling all of
+    the processes.  The finishing observers are notified once when all
+    of them are finished.  Each runner receives data from its process
+    in its own thread; so the functions that analyze the data should
+    be thread-safe.
+
+    """
+
+    def __init__(self, runners):
+        self.runners = runners
+        self.observers = []
+        self._running = len(runners)
+        self._lock = threading.Lock()
+        for runner in runners:
+            runner.add_finishing_observer(self._runner_finished)
+
+    def run(self):
+        """Execute the processes"""
+        for runner in self.runners:
+            runner.run()
+
+    def wait_process(self):
+        """Wait for the processes to finish"""
+        for runner in self.runners:
+            runner.wait_process()
+
+    def kill_process(self):
+        """Stop the processes"""
+        for runner in self.runners:
+            runner.kill_process()
+
+    def add_finishing_observer(self, observer):
+        """Notify this observer when all executions finish"""
+        self.observers.append(observer)
+
+    def _runner_finished(self):
+        with self._lock:
+            self._running -= 1
+            finished = self._running == 0
+        if finished:
+            for observer in self.observers:
+                observer()
+
+
 class _MessageReceiver(object):
 
     def receive_data(self):
-        pass
+        for batch in self.receive_batches():
+            for data in batch:
+                yield data
+
+    def receive_batches(self):
+        for data in self.receive_data():
+            yield [data]
 
     def get_send_info(self):
         pass
@@ -153,47 +229,76 @@ class _SocketReceiver(_MessageReceiver):
         return '%d:%s' % (self.data_port,
                           base64.b64encode(self.key).decode('utf-8'))
 
-    def receive_data(self):
+    def receive_batches(self):
         conn, addr = self.server_socket.accept()
         self.server_socket.close()
         my_file = conn.makefile('rb')
         while True:
-            # Received messages must meet the following criteria:
-            # 1. Must be contained on a single line.
-            # 2. Must be prefixed with a base64 encoded sha256 message digest 
-            #    of the base64 encoded pickle data.
+            # Received frames must meet the following criteria:
+            # 1. Must start with the 4-byte big-endian length of the
+            #    pickled data, not larger than `_max_frame_size`.
+            # 2. Must be followed by the sha256 message digest of the
+            #    pickled data and the pickled data itself.
             # 3. Message digest must be computed using the correct key.
             #
-            # Any messages received that do not meet these criteria will never
-            # be unpickled and will be dropped silently.
-            try:
-                buf = my_file.readline()
-                if len(buf) == 0:
-                    break
-
-                try:
-                    digest_end = buf.index(b':')
-                    buf_digest = base64.b64decode(buf[:digest_end])
-                    buf_data = buf[digest_end + 1:-1]
-                    decoded_buf_data = base64.b64decode(buf_data)
-                except:
-                    # Corrupted data; the payload cannot be trusted and just has
-                    # to be dropped. See CVE-2014-3539.
-                    continue
-
-                digest = hmac.new(self.key, buf_data, hashlib.sha256).digest()
-                if not compare_digest(buf_digest, digest):
-                    # Signature mismatch; the payload cannot be trusted and just
-                    # has to be dropped. See CVE-2014-3539.
-                    continue
-
-                yield pickle.loads(decoded_buf_data)
-            except EOFError:
+            # Frames with wrong digests will never be unpickled and will
+            # be dropped silently; the rest of the data is dropped if
+            # the length is invalid or the data is cut.
+            header = my_file.read(_header_size)
+            if len(header) < _header_size:
+                break
+            length = struct.unpack('>I', header[:4])[0]
+            if length > _max_frame_size:
                 break
+            buf_data = my_file.read(length)
+            if len(buf_data) < length:
+                break
+            digest = hmac.new(self.key, buf_data, hashlib.sha256).digest()
+            if not compare_digest(header[4:], digest):
+                # Signature mismatch; the payload cannot be trusted and just
+                # has to be dropped. See CVE-2014-3539.
+                continue
+            yield pickle.loads(buf_data)
         my_file.close()
         conn.close()
 
 
+class _UnixSocketReceiver(_SocketReceiver):
+    """Receives data on a unix domain socket
+
+    The socket is made in a new temporary folder that only the current
+    user can access; so no ports are searched and any number of them
+    can be used at the same time.
+
+    """
+
+    def __init__(self):
+        self.folder = tempfile.mkdtemp(prefix='rope_doa_')
+        self.path = os.path.join(self.folder, 'socket')
+        self.key = os.urandom(32)
+        self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server_socket.bind(self.path)
+        self.server_socket.listen(1)
+
+    def get_send_info(self):
+        return 'unix:%s:%s' % (base64.b64encode(self.key).decode('utf-8'),
+                               self.path)
+
+    def receive_batches(self):
+        try:
+            for batch in super(_UnixSocketReceiver, self).receive_batches():
+                yield batch
+        finally:
+            self.close()
+
+    def close(self):
+        self.server_socket.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        if os.path.exists(self.folder):
+            os.rmdir(self.folder)
+
+
 class _FIFOReceiver(_MessageReceiver):
 
     def __init__(self):
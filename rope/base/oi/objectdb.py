@@ -8,6 +8,7 @@ class ObjectDB(object):
         self.validation = validation
         self.observers = []
         self.files = db.files
+        self.records = None
 
     def validate_files(self):
         for file in list(self.files):
@@ -53,12 +54,58 @@ class ObjectDB(object):
         old_returned = scope_info.get_returned(args)
         if self.validation.is_more_valid(returned, old_returned):
             scope_info.add_call(args, returned)
+            self._record(('callinfo', path, key, args, returned))
+
+    def add_callinfos(self, callinfos):
+        """Add a list of ``(path, key, args, returned)`` call infos"""
+        scope_infos = {}
+        for path, key, args, returned in callinfos:
+            scope_info = scope_infos.get((path, key))
+            if scope_info is None:
+                scope_info = self._get_scope_info(path, key, readonly=False)
+                scope_infos[(path, key)] = scope_info
+            old_returned = scope_info.get_returned(args)
+            if self.validation.is_more_valid(returned, old_returned):
+                scope_info.add_call(args, returned)
+                self._record(('callinfo', path, key, args, returned))
 
     def add_pername(self, path, key, name, value):
         scope_info = self._get_scope_info(path, key, readonly=False)
         old_value = scope_info.get_per_name(name)
         if self.validation.is_more_valid(value, old_value):
             scope_info.save_per_name(name, value)
+            self._record(('pername', path, key, name, value))
+
+    def start_recording(self):
+        """Start recording the information that is added
+
+        `stop_recording()` returns the list of records; they can be
+        added to another `ObjectDB` using `add_records()`.
+        """
+        self.records = []
+
+    def stop_recording(self):
+        records = self.records
+        self.records = None
+        return records
+
+    def add_records(self, records):
+        """Add the information recorded by another `ObjectDB`
+
+        The information is added only if it is more valid than what
+        this DB holds.
+        """
+        callinfos = []
+        for record in records:
+            if record[0] == 'callinfo':
+                callinfos.append(record[1:])
+            else:
+                self.add_pername(*record[1:])
+        self.add_callinfos(callinfos)
+
+    def _record(self, record):
+        if self.records is not None:
+            self.records.append(record)
 
     def add_file_list_observer(self, observer):
         self.observers.append(observer)
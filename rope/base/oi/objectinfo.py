@@ -1,7 +1,8 @@
+import threading
 import warnings
 
 from rope.base import exceptions, resourceobserver
-from rope.base.oi import objectdb, memorydb, transform
+from rope.base.oi import objectdb, memorydb, sqlitedb, transform
 
 
 class ObjectInfoManager(object):
@@ -17,6 +18,7 @@ class ObjectInfoManager(object):
         self.to_textual = transform.PyObjectToTextual(project)
         self.to_pyobject = transform.TextualToPyObject(project)
         self.doi_to_pyobject = transform.DOITextualToPyObject(project)
+        self._doa_lock = threading.Lock()
         self._init_objectdb()
         if project.prefs.get('validate_objectdb', False):
             self._init_validation()
@@ -33,7 +35,11 @@ class ObjectInfoManager(object):
             if dbtype != 'memory' and self.project.ropefolder is not None:
                 persist = True
         self.validation = TextualValidation(self.to_pyobject)
-        db = memorydb.MemoryDB(self.project, persist=persist)
+        backend = self.project.prefs.get('objectdb_backend', 'memory')
+        if backend == 'sqlite' and sqlitedb.sqlite3 is not None:
+            db = sqlitedb.SQLiteDB(self.project, persist=persist)
+        else:
+            db = memorydb.MemoryDB(self.project, persist=persist)
         self.objectdb = objectdb.ObjectDB(db, self.validation)
 
     def _init_validation(self):
@@ -81,7 +87,7 @@ class ObjectInfoManager(object):
             if result is None:
                 result = returned
         if result is not None:
-            return self.to_pyobject(result)
+            return self._to_pyobject(pyobject, result)
 
     def get_exact_returned(self, pyobject, args):
         path, key = self._get_scope(pyobject)
@@ -89,7 +95,7 @@ class ObjectInfoManager(object):
             returned = self.objectdb.get_returned(
                 path, key, self._args_to_textual(pyobject, args))
             if returned is not None:
-                return self.to_pyobject(returned)
+                return self._to_pyobject(pyobject, returned)
 
     def _args_to_textual(self, pyfunction, args):
         parameters = list(pyfunction.get_param_names(special_args=False))
@@ -116,7 +122,7 @@ class ObjectInfoManager(object):
             if unknowns == 0:
                 break
         if unknowns < arg_count:
-            return [self.to_pyobject(parameter)
+            return [self._to_pyobject(pyobject, parameter)
                     for parameter in parameters]
 
     def get_passed_objects(self, pyfunction, parameter_index):
@@ -127,20 +133,41 @@ class ObjectInfoManager(object):
         for call_info in self.objectdb.get_callinfos(path, key):
             args = call_info.get_parameters()
             if len(args) > parameter_index:
-                parameter = self.to_pyobject(args[parameter_index])
+                parameter = self._to_pyobject(pyfunction,
+                                              args[parameter_index])
                 if parameter is not None:
                     result.append(parameter)
         return result
 
     def doa_data_received(self, data):
+        self.doa_batch_received([data])
+
+    def doa_batch_received(self, batch):
+        """Save a list of call records received from DOA
+
+        Each textual form is transformed once for the whole batch.
+        It can be called from several threads; batches are saved one
+        at a time.
+        """
+        with self._doa_lock:
+            self._save_doa_batch(batch)
+
+    def _save_doa_batch(self, batch):
+        normals = {}
+
         def doi_to_normal(textual):
-            pyobject = self.doi_to_pyobject(textual)
-            return self.to_textual(pyobject)
-        function = doi_to_normal(data[0])
-        args = tuple([doi_to_normal(textual) for textual in data[1]])
-        returned = doi_to_normal(data[2])
-        if function[0] == 'defined' and len(function) == 3:
-            self._save_data(function, args, returned)
+            if textual not in normals:
+                pyobject = self.doi_to_pyobject(textual)
+                normals[textual] = self.to_textual(pyobject)
+            return normals[textual]
+        callinfos = []
+        for data in batch:
+            function = doi_to_normal(data[0])
+            if function[0] == 'defined' and len(function) == 3:
+                args = tuple([doi_to_normal(textual) for textual in data[1]])
+                returned = doi_to_normal(data[2])
+                callinfos.append((function[1], function[2], args, returned))
+        self.objectdb.add_callinfos(callinfos)
 
     def function_called(self, pyfunction, params, returned=None):
         function_text = self.to_textual(pyfunction)
@@ -161,7 +188,21 @@ class ObjectInfoManager(object):
         if path is not None:
             result = self.objectdb.get_pername(path, key, name)
             if result is not None:
-                return self.to_pyobject(result)
+                return self._to_pyobject(scope.pyobject, result)
+
+    def _to_pyobject(self, pyobject, textual):
+        """Transform `textual` read for `pyobject` to a `PyObject`
+
+        The module of `pyobject` is recorded as depending on the
+        modules `textual` refers to; see `PyCore.module_cache`.
+        """
+        resource = pyobject.get_module().get_resource()
+        if resource is not None:
+            module_cache = self.project.pycore.module_cache
+            for path in _textual_paths(textual):
+                dependency = self.to_pyobject.path_to_resource(path)
+                module_cache.add_dependency(resource, dependency)
+        return self.to_pyobject(textual)
 
     def _save_data(self, function, args, returned=('unknown',)):
         self.objectdb.add_callinfo(function[1], function[2], args, returned)
@@ -187,6 +228,17 @@ class ObjectInfoManager(object):
         return str(self.objectdb)
 
 
+def _textual_paths(textual):
+    if not isinstance(textual, tuple) or not textual:
+        return
+    if textual[0] == 'defined' and len(textual) > 1:
+        yield textual[1]
+        return
+    for item in textual[1:]:
+        for path in _textual_paths(item):
+            yield path
+
+
 class TextualValidation(object):
 
     def __init__(self, to_pyobject):
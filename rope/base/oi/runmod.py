@@ -2,6 +2,7 @@ def __rope_start_everything():
     import os
     import sys
     import socket
+    import struct
     try:
         import cPickle as pickle
     except ImportError:
@@ -21,22 +22,46 @@ def __rope_start_everything():
             pass
 
     class _SocketSender(_MessageSender):
+        """Sends call records in frames
 
-        def __init__(self, port, key):
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(('127.0.0.1', port))
+        Records are collected in batches.  Each batch is pickled and
+        sent as a frame: a 4-byte big-endian length, the HMAC-SHA256
+        digest of the pickled batch and the pickled batch itself.
+
+        """
+
+        batch_size = 1024
+
+        def __init__(self, address, key, family=socket.AF_INET):
+            s = socket.socket(family, socket.SOCK_STREAM)
+            s.connect(address)
             self.my_file = s.makefile('wb')
             self.key = base64.b64decode(key)
+            self.batch = []
+            self.lock = threading.Lock()
 
         def send_data(self, data):
-            if not self.my_file.closed:
-                pickled_data = base64.b64encode(
-                    pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
-                dgst = hmac.new(self.key, pickled_data, hashlib.sha256).digest()
-                self.my_file.write(base64.b64encode(dgst) + b':' +
-                                   pickled_data + b'\n')
+            with self.lock:
+                if self.my_file.closed:
+                    return
+                self.batch.append(data)
+                if len(self.batch) >= self.batch_size:
+                    self._send_batch()
+
+        def _send_batch(self):
+            if not self.batch:
+                return
+            pickled_data = pickle.dumps(self.batch, pickle.HIGHEST_PROTOCOL)
+            dgst = hmac.new(self.key, pickled_data, hashlib.sha256).digest()
+            self.my_file.write(struct.pack('>I', len(pickled_data)) +
+                               dgst + pickled_data)
+            self.batch = []
+
         def close(self):
-            self.my_file.close()
+            with self.lock:
+                if not self.my_file.closed:
+                    self._send_batch()
+                    self.my_file.close()
 
     class _FileSender(_MessageSender):
 
@@ -63,18 +88,44 @@ def __rope_start_everything():
 
     class _FunctionCallDataSender(object):
 
-        def __init__(self, send_info, project_root):
+        def __init__(self, send_info, project_root, samples=0,
+                     max_calls=0):
             self.project_root = project_root
-            if send_info[0].isdigit():
+            if send_info.startswith('unix:'):
+                key, path = send_info[len('unix:'):].split(':', 1)
+                self.sender = _SocketSender(path, key, socket.AF_UNIX)
+            elif send_info[0].isdigit():
                 port, key = send_info.split(':', 1)
-                self.sender = _SocketSender(int(port), key)
+                self.sender = _SocketSender(('127.0.0.1', int(port)), key)
             else:
                 self.sender = _FileSender(send_info)
+            # each call is sent once for each code object and no calls
+            # of code objects in `finished` are sent or checked
+            self.sent_calls = {}
+            self.finished = finished = set()
+            self.max_calls = max_calls
+            self.samples = samples
+            if samples:
+                # only the first `samples` signatures of each code
+                # object are sent and the calls of a code object are
+                # not checked after `samples` signatures or
+                # `samples * 64` calls; a profile function is called
+                # only for calls and returns, not for every line
+                self.signatures = {}
+                self.calls = {}
+
+                def global_profile(frame, event, arg):
+                    if event == 'return' and frame.f_code not in finished:
+                        self.on_function_return(frame, arg)
+                sys.setprofile(global_profile)
+                threading.setprofile(global_profile)
+                return
 
             def global_trace(frame, event, arg):
                 # HACK: Ignoring out->in calls
                 # This might lose some information
-                if self._is_an_interesting_call(frame):
+                if frame.f_code not in finished and \
+                   self._is_an_interesting_call(frame):
                     return self.on_function_call
             sys.settrace(global_trace)
             threading.settrace(global_trace)
@@ -82,6 +133,32 @@ def __rope_start_everything():
         def on_function_call(self, frame, event, arg):
             if event != 'return':
                 return
+            if frame.f_code not in self.finished:
+                self._send_call(frame, arg)
+            return self.on_function_call
+
+        def on_function_return(self, frame, arg):
+            if not self._is_an_interesting_call(frame):
+                return
+            code = frame.f_code
+            calls = self.calls.get(code, 0) + 1
+            self.calls[code] = calls
+            if calls >= self.samples * 64:
+                self.finished.add(code)
+            f_locals = frame.f_locals
+            signature = tuple(type(f_locals.get(argname))
+                              for argname in
+                              code.co_varnames[:code.co_argcount])
+            signature += (type(arg),)
+            signatures = self.signatures.setdefault(code, set())
+            if signature in signatures:
+                return
+            signatures.add(signature)
+            if len(signatures) >= self.samples:
+                self.finished.add(code)
+            self._send_call(frame, arg)
+
+        def _send_call(self, frame, arg):
             args = []
             returned = ('unknown',)
             code = frame.f_code
@@ -97,12 +174,17 @@ def __rope_start_everything():
             except (TypeError, AttributeError):
                 pass
             try:
-                data = (self._object_to_persisted_form(frame.f_code),
-                        tuple(args), returned)
+                call = (tuple(args), returned)
+                sent_calls = self.sent_calls.setdefault(code, set())
+                if call in sent_calls:
+                    return
+                data = (self._object_to_persisted_form(frame.f_code),) + call
+                sent_calls.add(call)
+                if self.max_calls and len(sent_calls) >= self.max_calls:
+                    self.finished.add(code)
                 self.sender.send_data(data)
             except (TypeError):
                 pass
-            return self.on_function_call
 
         def _is_an_interesting_call(self, frame):
             #if frame.f_code.co_name in ['?', '<module>']:
@@ -115,6 +197,7 @@ def __rope_start_everything():
                 return False
             return True
 
+        @_cached
         def _is_code_inside_project(self, code):
             source = self._path(code.co_filename)
             return source is not None and os.path.exists(source) and \
@@ -206,24 +289,30 @@ def __rope_start_everything():
         def close(self):
             self.sender.close()
             sys.settrace(None)
+            sys.setprofile(None)
 
     def _realpath(path):
         return os.path.realpath(os.path.abspath(os.path.expanduser(path)))
 
     send_info = sys.argv[1]
     project_root = sys.argv[2]
-    file_to_run = sys.argv[3]
+    samples = int(sys.argv[3])
+    max_calls = int(sys.argv[4])
+    file_to_run = sys.argv[5]
     run_globals = globals()
     run_globals.update({'__name__': '__main__',
                         '__builtins__': __builtins__,
                         '__file__': file_to_run})
 
     if send_info != '-':
-        data_sender = _FunctionCallDataSender(send_info, project_root)
-    del sys.argv[1:4]
-    pycompat.execfile(file_to_run, run_globals)
-    if send_info != '-':
-        data_sender.close()
+        data_sender = _FunctionCallDataSender(send_info, project_root,
+                                              samples, max_calls)
+    del sys.argv[1:6]
+    try:
+        pycompat.execfile(file_to_run, run_globals)
+    finally:
+        if send_info != '-':
+            data_sender.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,237 @@
+"""An object DB that keeps its data in an SQLite database
+
+Unlike `rope.base.oi.memorydb.MemoryDB`, nothing is loaded when the
+project is opened; scope information is read from the database when
+it is asked for and changes are committed when the project is closed
+or synced.  The database is kept in ``.ropeproject/objectdb.sqlite``.
+
+"""
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+from rope.base.oi import objectdb
+
+
+class SQLiteDB(objectdb.FileDict):
+
+    def __init__(self, project, persist=None):
+        self.project = project
+        self._persist = persist
+        self._connection = None
+        self.files = self
+        self.project.data_files.add_write_hook(self.write)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            # the connection is created lazily since `.ropeproject`
+            # might not exist when the project is being opened
+            self._connection = sqlite3.connect(self._get_path(),
+                                               check_same_thread=False)
+            self._create_tables()
+        return self._connection
+
+    def _get_path(self):
+        if not self.persist or self.project.ropefolder is None:
+            return ':memory:'
+        return os.path.join(self.project.ropefolder.real_path,
+                            'objectdb.sqlite')
+
+    def _create_tables(self):
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS files ('
+            '    id INTEGER PRIMARY KEY, path TEXT UNIQUE);'
+            'CREATE TABLE IF NOT EXISTS scopes ('
+            '    id INTEGER PRIMARY KEY, file_id INTEGER, key TEXT,'
+            '    UNIQUE (file_id, key));'
+            'CREATE TABLE IF NOT EXISTS callinfos ('
+            '    scope_id INTEGER, args_key TEXT, args BLOB, returned BLOB,'
+            '    PRIMARY KEY (scope_id, args_key));'
+            'CREATE TABLE IF NOT EXISTS pernames ('
+            '    scope_id INTEGER, name TEXT, value BLOB,'
+            '    PRIMARY KEY (scope_id, name));')
+
+    def execute(self, query, args=()):
+        return self.connection.execute(query, args)
+
+    def keys(self):
+        return [row[0] for row in self.execute('SELECT path FROM files')]
+
+    def values(self):
+        return [FileInfo(self, row[0])
+                for row in self.execute('SELECT id FROM files')]
+
+    def __iter__(self):
+        for path in self.keys():
+            yield path
+
+    def __len__(self):
+        return self.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def __setitem__(self):
+        raise NotImplementedError()
+
+    def __contains__(self, key):
+        return self._get_file_id(key) is not None
+
+    def __getitem__(self, key):
+        file_id = self._get_file_id(key)
+        if file_id is None:
+            raise KeyError(key)
+        return FileInfo(self, file_id)
+
+    def _get_file_id(self, path):
+        row = self.execute('SELECT id FROM files WHERE path = ?',
+                           (path,)).fetchone()
+        if row is not None:
+            return row[0]
+
+    def create(self, path):
+        self.execute('INSERT OR IGNORE INTO files (path) VALUES (?)', (path,))
+
+    def rename(self, file, newfile):
+        if file not in self:
+            return
+        if newfile in self:
+            del self[newfile]
+        self.execute('UPDATE files SET path = ? WHERE path = ?',
+                     (newfile, file))
+
+    def __delitem__(self, file):
+        file_id = self._get_file_id(file)
+        if file_id is None:
+            raise KeyError(file)
+        for scope_id in [row[0] for row in self.execute(
+                'SELECT id FROM scopes WHERE file_id = ?', (file_id,))]:
+            _remove_scope(self, scope_id)
+        self.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def write(self):
+        if self._connection is not None:
+            self._connection.commit()
+
+    @property
+    def persist(self):
+        if self._persist is not None:
+            return self._persist
+        else:
+            return self.project.prefs.get('save_objectdb', False)
+
+
+class FileInfo(objectdb.FileInfo):
+
+    def __init__(self, db, file_id):
+        self.db = db
+        self.file_id = file_id
+
+    def create_scope(self, key):
+        self.db.execute(
+            'INSERT OR IGNORE INTO scopes (file_id, key) VALUES (?, ?)',
+            (self.file_id, key))
+
+    def keys(self):
+        return [row[0] for row in self.db.execute(
+            'SELECT key FROM scopes WHERE file_id = ?', (self.file_id,))]
+
+    def __contains__(self, key):
+        return self._get_scope_id(key) is not None
+
+    def __getitem__(self, key):
+        scope_id = self._get_scope_id(key)
+        if scope_id is None:
+            raise KeyError(key)
+        return ScopeInfo(self.db, scope_id)
+
+    def _get_scope_id(self, key):
+        row = self.db.execute(
+            'SELECT id FROM scopes WHERE file_id = ? AND key = ?',
+            (self.file_id, key)).fetchone()
+        if row is not None:
+            return row[0]
+
+    def __delitem__(self, key):
+        scope_id = self._get_scope_id(key)
+        if scope_id is None:
+            raise KeyError(key)
+        _remove_scope(self.db, scope_id)
+
+    def __iter__(self):
+        for key in self.keys():
+            yield key
+
+    def __len__(self):
+        return self.db.execute(
+            'SELECT COUNT(*) FROM scopes WHERE file_id = ?',
+            (self.file_id,)).fetchone()[0]
+
+    def __setitem__(self):
+        raise NotImplementedError()
+
+
+class ScopeInfo(objectdb.ScopeInfo):
+
+    def __init__(self, db, scope_id):
+        self.db = db
+        self.scope_id = scope_id
+
+    def get_per_name(self, name):
+        row = self.db.execute(
+            'SELECT value FROM pernames WHERE scope_id = ? AND name = ?',
+            (self.scope_id, name)).fetchone()
+        if row is not None:
+            return _loads(row[0])
+
+    def save_per_name(self, name, value):
+        self.db.execute(
+            'INSERT OR REPLACE INTO pernames (scope_id, name, value) '
+            'VALUES (?, ?, ?)', (self.scope_id, name, _dumps(value)))
+
+    def get_returned(self, parameters):
+        row = self.db.execute(
+            'SELECT returned FROM callinfos '
+            'WHERE scope_id = ? AND args_key = ?',
+            (self.scope_id, _args_key(parameters))).fetchone()
+        if row is not None:
+            return _loads(row[0])
+
+    def get_call_infos(self):
+        for args, returned in self.db.execute(
+                'SELECT args, returned FROM callinfos WHERE scope_id = ?',
+                (self.scope_id,)).fetchall():
+            yield objectdb.CallInfo(_loads(args), _loads(returned))
+
+    def add_call(self, parameters, returned):
+        self.db.execute(
+            'INSERT OR REPLACE INTO callinfos '
+            '(scope_id, args_key, args, returned) VALUES (?, ?, ?, ?)',
+            (self.scope_id, _args_key(parameters), _dumps(parameters),
+             _dumps(returned)))
+
+
+def _remove_scope(db, scope_id):
+    db.execute('DELETE FROM callinfos WHERE scope_id = ?', (scope_id,))
+    db.execute('DELETE FROM pernames WHERE scope_id = ?', (scope_id,))
+    db.execute('DELETE FROM scopes WHERE id = ?', (scope_id,))
+
+
+def _args_key(args):
+    # pickles of equal values might differ; `repr()` of the textual
+    # forms, which are made of tuples and strings, does not
+    return repr(args)
+
+
+def _dumps(value):
+    return sqlite3.Binary(pickle.dumps(value, 2))
+
+
+def _loads(data):
+    return pickle.loads(bytes(data))
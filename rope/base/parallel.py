@@ -0,0 +1,159 @@
+"""Running per-resource jobs in a pool of worker processes
+
+`map_resources()` splits a list of resources into chunks and calls a
+function for each chunk in a worker process.  Each worker opens its
+own `rope.base.project.Project` on the root of the main project and
+keeps it open for the chunks it receives.  The function should be
+defined at module level, so that it can be pickled, and its arguments
+and return values should be picklable, too.  Resources out of the
+project are passed to the workers as `NoProject` resources.
+
+Note that workers read the files from the disk; changes that are not
+saved yet are not visible to them.
+
+"""
+import os
+
+from rope.base import taskhandle
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import concurrent.futures as futures
+except ImportError:  # PY2
+    futures = None
+
+
+def is_available(workers):
+    """Tell whether jobs would be run in `workers` worker processes"""
+    return futures is not None and workers is not None and \
+        (workers == 0 or workers > 1)
+
+
+def is_picklable(obj):
+    """Tell whether `obj` can be passed to worker processes"""
+    try:
+        pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # local functions and lambdas raise `AttributeError` or
+        # `PicklingError` depending on the version of python
+        return False
+    return True
+
+
+def map_resources(project, function, resources, args=(), workers=None,
+                  job_set=taskhandle.NullJobSet(), chunk_size=None):
+    """Call `function` for chunks of `resources` in worker processes
+
+    `function` is called as ``function(project, chunk, *args)`` in a
+    worker process, in which `project` is the project of that worker
+    and `chunk` is a list of `rope.base.resources.Resource` of that
+    project.  The results are returned as a list with one item for each
+    chunk in the order of `resources`; use `chunks()` to get the chunks.
+
+    `workers` is the number of processes; if it is 0 the number of
+    processors is used.  If parallel jobs are not available (see
+    `is_available()`) `function` is called in this process for each
+    resource, as a chunk of its own.  `job_set` is updated as chunks
+    are finished and pending chunks are cancelled if its task is
+    stopped.
+
+    """
+    if not is_available(workers):
+        results = []
+        for resource in resources:
+            job_set.started_job(resource.path)
+            results.append(function(project, [resource], *args))
+            job_set.finished_job()
+        return results
+    if workers == 0:
+        workers = _cpu_count()
+    parts = chunks(resources, workers, chunk_size)
+    project_args = _project_arguments(project)
+    executor = futures.ProcessPoolExecutor(workers)
+    try:
+        pending = {}
+        for index, part in enumerate(parts):
+            paths = [_resource_path(project, resource) for resource in part]
+            future = executor.submit(_call_function, project_args,
+                                     function, paths, args)
+            pending[future] = index
+        results = [None] * len(parts)
+        try:
+            for future in futures.as_completed(pending):
+                index = pending[future]
+                results[index] = future.result()
+                for resource in parts[index]:
+                    job_set.started_job(resource.path)
+                    job_set.finished_job()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        return results
+    finally:
+        executor.shutdown()
+
+
+def chunks(resources, workers=None, chunk_size=None):
+    """Split `resources` as `map_resources()` does"""
+    resources = list(resources)
+    if chunk_size is None:
+        if not workers:
+            workers = _cpu_count()
+        chunk_size = max(1, min(64, len(resources) // (workers * 4)))
+    return [resources[index:index + chunk_size]
+            for index in range(0, len(resources), chunk_size)]
+
+
+def _cpu_count():
+    return os.cpu_count() or 1
+
+
+def _project_arguments(project):
+    prefs = dict(project.prefs.prefs)
+    prefs['ignored_resources'] = list(project.ignored.patterns)
+    # workers should not save or analyze anything
+    prefs['save_objectdb'] = False
+    prefs['save_history'] = False
+    prefs['save_name_index'] = False
+    prefs['automatic_soa'] = False
+    prefs['validate_objectdb'] = False
+    return (project.address, project._ropefolder_name, prefs)
+
+
+_worker_projects = {}
+
+
+def _resource_path(project, resource):
+    # resources out of the project, like the modules found in the
+    # python path, are sent with their real paths
+    if resource.project is project:
+        return resource.path, False
+    return resource.real_path, True
+
+
+def _call_function(project_args, function, paths, args):
+    import rope.base.project
+    project = _get_worker_project(project_args)
+    resources = []
+    for path, is_external in paths:
+        if is_external:
+            resource = rope.base.project.get_no_project().get_resource(path)
+        else:
+            resource = project.get_resource(path)
+        resources.append(resource)
+    return function(project, resources, *args)
+
+
+def _get_worker_project(project_args):
+    import rope.base.project
+    address, ropefolder, prefs = project_args
+    key = (address, ropefolder)
+    if key not in _worker_projects:
+        _worker_projects[key] = rope.base.project.Project(
+            address, ropefolder=ropefolder, **prefs)
+    return _worker_projects[key]
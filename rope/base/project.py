@@ -6,7 +6,8 @@ import warnings
 import rope.base.fscommands
 import rope.base.resourceobserver as resourceobserver
 import rope.base.utils.pycompat as pycompat
-from rope.base import exceptions, taskhandle, prefs, history, pycore, utils
+from rope.base import (exceptions, taskhandle, prefs, history, pycore,
+                       nameindex, utils, watcher)
 from rope.base.exceptions import ModuleNotFoundError
 from rope.base.resources import File, Folder, _ResourceMatcher
 
@@ -15,6 +16,11 @@ try:
 except ImportError:
     import pickle
 
+try:
+    from os import scandir as _scandir
+except ImportError:
+    _scandir = None
+
 
 class _Project(object):
 
@@ -178,6 +184,16 @@ class _Project(object):
     def pycore(self):
         return pycore.PyCore(self)
 
+    @property
+    @utils.saveit
+    def name_index(self):
+        """The `rope.base.nameindex.NameIndex` of this project
+
+        It is `None` if ``use_name_index`` project config is `False`.
+        """
+        if self.prefs.get('use_name_index', False):
+            return nameindex.NameIndex(self)
+
     def close(self):
         warnings.warn('Cannot close a NoProject',
                       DeprecationWarning, stacklevel=2)
@@ -217,7 +233,9 @@ class Project(_Project):
         super(Project, self).__init__(fscommands)
         self.ignored = _ResourceMatcher()
         self.file_list = _FileListCacher(self)
-        self.prefs.add_callback('ignored_resources', self.ignored.set_patterns)
+        self._python_files = None
+        self.watcher = None
+        self.prefs.add_callback('ignored_resources', self._set_ignored)
         if ropefolder is not None:
             self.prefs['ignored_resources'] = [ropefolder]
         self._init_prefs(prefs)
@@ -234,8 +252,18 @@ class Project(_Project):
 
     def get_python_files(self):
         """Returns all python files available in the project"""
-        return [resource for resource in self.get_files()
-                if self.pycore.is_python_file(resource)]
+        files = self.get_files()
+        generation = self.file_list.generation
+        if self._python_files is None or \
+           self._python_files[0] != generation:
+            self._python_files = (generation, [
+                resource for resource in files
+                if self.pycore.is_python_file(resource)])
+        return list(self._python_files[1])
+
+    def _set_ignored(self, patterns):
+        self.ignored.set_patterns(patterns)
+        self.file_list.invalidate()
 
     def _get_resource_path(self, name):
         return os.path.join(self._address, *name.split('/'))
@@ -269,8 +297,10 @@ class Project(_Project):
                 run_globals['set_prefs'](self.prefs)
         for key, value in prefs.items():
             self.prefs[key] = value
-        self._init_other_parts()
+        # the rope folder is made first since the object DB might be
+        # opened when pycore is made
         self._init_ropefolder()
+        self._init_other_parts()
         if 'project_opened' in run_globals:
             run_globals['project_opened'](self)
 
@@ -282,6 +312,8 @@ class Project(_Project):
     def _init_other_parts(self):
         # Forcing the creation of `self.pycore` to register observers
         self.pycore
+        if self.prefs.get('watch_files', False):
+            self.watcher = watcher.create_watcher(self)
 
     def is_ignored(self, resource):
         return self.ignored.does_match(resource)
@@ -293,6 +325,8 @@ class Project(_Project):
     def close(self):
         """Closes project open resources"""
         self.data_files.write()
+        if self.watcher is not None:
+            self.watcher.close()
 
     def set(self, key, value):
         """Set the `key` preference to `value`"""
@@ -304,6 +338,15 @@ class Project(_Project):
             return self.get_folder(self._ropefolder_name)
 
     def validate(self, folder=None):
+        """Validate files and folders contained in `folder`
+
+        If the project is watched (see ``watch_files`` project config),
+        the changes reported by the watcher are used instead and
+        `folder` is ignored.
+        """
+        if self.watcher is not None:
+            self.watcher.process_events()
+            return
         if folder is None:
             folder = self.root
         super(Project, self).validate(folder)
@@ -346,34 +389,110 @@ def get_no_project():
 
 
 class _FileListCacher(object):
+    """Keeps the list of the files of a project
+
+    The list is updated as resources are created, moved or removed.
+    `generation` is increased whenever the list changes; comparing it
+    with an older value shows whether the list has changed since then.
+
+    """
 
     def __init__(self, project):
         self.project = project
         self.files = None
+        self.generation = 0
         rawobserver = resourceobserver.ResourceObserver(
-            self._changed, self._invalid, self._invalid,
-            self._invalid, self._invalid)
+            self._changed, self._moved, self._created,
+            self._removed, self._validate)
         self.project.add_observer(rawobserver)
 
     def get_files(self):
         if self.files is None:
             self.files = set()
             self._add_files(self.project.root)
+            self.generation += 1
         return self.files
 
+    def invalidate(self):
+        """Forget the list; it is computed again when needed"""
+        self.files = None
+        self.generation += 1
+
     def _add_files(self, folder):
-        for child in folder.get_children():
-            if child.is_folder():
-                self._add_files(child)
-            elif not self.project.is_ignored(child):
-                self.files.add(child)
+        if _scandir is None:
+            for child in folder.get_children():
+                if child.is_folder():
+                    self._add_files(child)
+                elif not self.project.is_ignored(child):
+                    self.files.add(child)
+            return
+        # the type of each entry is read from the directory listing;
+        # ignored folders and symbolic links are never entered
+        matcher = self.project.ignored
+        folders = [folder.path]
+        while folders:
+            path = folders.pop()
+            try:
+                entries = list(_scandir(self.project._get_resource_path(path)))
+            except OSError:
+                continue
+            for entry in entries:
+                child = path + '/' + entry.name if path else entry.name
+                try:
+                    if entry.is_symlink() or matcher.does_match_path(child):
+                        continue
+                    if entry.is_dir():
+                        folders.append(child)
+                    elif entry.is_file():
+                        self.files.add(File(self.project, child))
+                except OSError:
+                    continue
+
+    def _add_resource(self, resource):
+        if self.files is None or not resource.exists():
+            return
+        if resource.path and self.project.is_ignored(resource):
+            return
+        count = len(self.files)
+        if resource.is_folder():
+            self._add_files(resource)
+        else:
+            self.files.add(resource)
+        if len(self.files) != count:
+            self.generation += 1
+
+    def _remove_resource(self, resource):
+        if self.files is None:
+            return
+        if resource.is_folder():
+            removed = [file for file in self.files
+                       if resource.contains(file)]
+        else:
+            removed = [resource] if resource in self.files else []
+        if removed:
+            self.files.difference_update(removed)
+            self.generation += 1
 
     def _changed(self, resource):
         if resource.is_folder():
-            self.files = None
+            self._validate(resource)
 
-    def _invalid(self, resource, new_resource=None):
-        self.files = None
+    def _moved(self, resource, new_resource):
+        self._remove_resource(resource)
+        self._add_resource(new_resource)
+
+    def _created(self, resource):
+        self._add_resource(resource)
+
+    def _removed(self, resource):
+        self._remove_resource(resource)
+
+    def _validate(self, resource):
+        if resource == self.project.root:
+            self.invalidate()
+            return
+        self._remove_resource(resource)
+        self._add_resource(resource)
 
 
 class _DataFiles(object):
@@ -391,27 +510,79 @@ class _DataFiles(object):
         if not compress and import_:
             self._import_old_files(name)
         if file.exists():
-            input = opener(file.real_path, 'rb')
+            result = self._read_records(file, opener)
+            if len(result) == 1:
+                return result[0]
+            if len(result) > 1:
+                return result
+
+    def read_records(self, name, compress=False, import_=False):
+        """Return the list of all objects appended to `name`
+
+        Objects that cannot be read, for instance because the
+        file was truncated, are ignored.
+        """
+        return self.read_journal(name, compress, import_)[0]
+
+    def read_journal(self, name, compress=False, import_=False):
+        """Return ``(records, complete)`` for `name`
+
+        `records` is what `read_records()` returns and `complete` is
+        `False` if some objects could not be read.  Objects appended
+        after the ones that could not be read are not read back; such
+        files should be rewritten instead.
+        """
+        if self.project.ropefolder is None:
+            return [], True
+        compress = compress and self._can_compress()
+        file = self._get_file(name, compress)
+        if not compress and import_:
+            self._import_old_files(name)
+        if not file.exists():
+            return [], True
+        return self._read_journal(file, self._get_opener(compress))
+
+    def _read_records(self, file, opener):
+        input = opener(file.real_path, 'rb')
+        try:
+            result = []
             try:
-                result = []
+                while True:
+                    result.append(pickle.load(input))
+            except EOFError:
+                pass
+            return result
+        finally:
+            input.close()
+
+    def _read_journal(self, file, opener):
+        input = opener(file.real_path, 'rb')
+        result = []
+        try:
+            while True:
+                position = input.tell()
                 try:
-                    while True:
-                        result.append(pickle.load(input))
+                    result.append(pickle.load(input))
                 except EOFError:
-                    pass
-                if len(result) == 1:
-                    return result[0]
-                if len(result) > 1:
-                    return result
-            finally:
-                input.close()
-
-    def write_data(self, name, data, compress=False):
+                    # a truncated object raises `EOFError`, too
+                    input.seek(position)
+                    return result, not input.read(1)
+        except Exception:
+            return result, False
+        finally:
+            input.close()
+
+    def write_data(self, name, data, compress=False, append=False):
+        """Write `data` to `name`
+
+        If `append` is `True`, `data` is added to the end of the
+        file; see `read_records()`.
+        """
         if self.project.ropefolder is not None:
             compress = compress and self._can_compress()
             file = self._get_file(name, compress)
             opener = self._get_opener(compress)
-            output = opener(file.real_path, 'wb')
+            output = opener(file.real_path, 'ab' if append else 'wb')
             try:
                 pickle.dump(data, output, 2)
             finally:
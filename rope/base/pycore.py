@@ -1,14 +1,24 @@
 import bisect
+import collections
 import difflib
+import hashlib
+import os
 import sys
+import tempfile
 import warnings
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 import rope.base.libutils
 import rope.base.resourceobserver
 import rope.base.resources
 import rope.base.oi.doa
 import rope.base.oi.objectinfo
 import rope.base.oi.soa
+from rope.base import ast
 from rope.base import builtins
 from rope.base import exceptions
 from rope.base import stdmods
@@ -26,6 +36,7 @@ class PyCore(object):
         self.cache_observers = []
         self.module_cache = _ModuleCache(self)
         self.extension_cache = _ExtensionCache(self)
+        self.ast_cache = _ASTCache(self)
         self.object_info = rope.base.oi.objectinfo.ObjectInfoManager(project)
         self._init_python_files()
         self._init_automatic_soa()
@@ -173,17 +184,36 @@ class PyCore(object):
         controlling the process.
 
         """
-        perform_doa = self.project.prefs.get('perform_doi', True)
-        perform_doa = self.project.prefs.get('perform_doa', perform_doa)
-        receiver = self.object_info.doa_data_received
-        if not perform_doa:
-            receiver = None
         runner = rope.base.oi.doa.PythonFileRunner(
-            self, resource, args, stdin, stdout, receiver)
+            self, resource, args, stdin, stdout,
+            analyze_batch=self._get_doa_receiver())
         runner.add_finishing_observer(self.module_cache.forget_all_data)
         runner.run()
         return runner
 
+    def run_modules(self, resources, args=None, stdout=None):
+        """Run `resources` modules at the same time
+
+        Object information is collected from all of them as in
+        `run_module()`.  Returns a `rope.base.oi.doa.PythonFileRunners`
+        object for controlling the processes.
+
+        """
+        receiver = self._get_doa_receiver()
+        runners = rope.base.oi.doa.PythonFileRunners(
+            [rope.base.oi.doa.PythonFileRunner(
+                self, resource, args, stdout=stdout, analyze_batch=receiver)
+             for resource in resources])
+        runners.add_finishing_observer(self.module_cache.forget_all_data)
+        runners.run()
+        return runners
+
+    def _get_doa_receiver(self):
+        perform_doa = self.project.prefs.get('perform_doi', True)
+        perform_doa = self.project.prefs.get('perform_doa', perform_doa)
+        if perform_doa:
+            return self.object_info.doa_batch_received
+
     def analyze_module(self, resource, should_analyze=lambda py: True,
                        search_subscopes=lambda py: True, followed_calls=None):
         """Analyze `resource` module for static object inference
@@ -231,22 +261,70 @@ class PyCore(object):
 
 
 class _ModuleCache(object):
+    """Caches the `PyModule` of resources
+
+    If ``max_cached_modules`` project config is set, the least
+    recently used modules are evicted when there are more modules and
+    the concluded data of the modules depending on them is forgotten.
+
+    When a module changes, the concluded data of only those modules
+    that depend on it, directly or transitively, is forgotten.
+    Dependencies are recorded with `add_dependency()` when imported
+    modules are resolved and when objects are read from the object DB.
+
+    """
 
     def __init__(self, pycore):
         self.pycore = pycore
-        self.module_map = {}
+        self.module_map = collections.OrderedDict()
         self.pycore.cache_observers.append(self._invalidate_resource)
         self.observer = self.pycore.observer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dependents = {}
+        self.dependencies = {}
 
     def _invalidate_resource(self, resource):
         if resource in self.module_map:
-            self.forget_all_data()
-            self.observer.remove_resource(resource)
-            del self.module_map[resource]
+            self.forget_dependents_data(resource)
+            self._remove(resource)
+
+    def add_dependency(self, resource, dependency):
+        """Record that the module of `resource` depends on `dependency`
+
+        Both arguments are resources and might be `None`.
+        """
+        if resource is None or dependency is None or resource == dependency:
+            return
+        self.dependents.setdefault(dependency, set()).add(resource)
+        self.dependencies.setdefault(resource, set()).add(dependency)
+
+    def get_dependents(self, resource):
+        """Return the resources that depend on `resource` transitively"""
+        result = set()
+        pending = [resource]
+        while pending:
+            current = pending.pop()
+            for dependent in self.dependents.get(current, ()):
+                if dependent not in result and dependent != resource:
+                    result.add(dependent)
+                    pending.append(dependent)
+        return result
+
+    def forget_dependents_data(self, resource):
+        """Forget the concluded data of modules depending on `resource`"""
+        for dependent in self.get_dependents(resource):
+            if dependent in self.module_map:
+                self.module_map[dependent]._forget_concluded_data()
 
     def get_pymodule(self, resource, force_errors=False):
         if resource in self.module_map:
-            return self.module_map[resource]
+            self.hits += 1
+            result = self.module_map.pop(resource)
+            self.module_map[resource] = result
+            return result
+        self.misses += 1
         if resource.is_folder():
             result = PyPackage(self.pycore, resource,
                                force_errors=force_errors)
@@ -257,14 +335,44 @@ class _ModuleCache(object):
                 return result
         self.module_map[resource] = result
         self.observer.add_resource(resource)
+        self._evict()
         return result
 
+    def _evict(self):
+        max_modules = self.pycore.project.prefs.get('max_cached_modules')
+        if not max_modules:
+            return
+        while len(self.module_map) > max_modules:
+            resource = next(iter(self.module_map))
+            # evicted modules are not observed; the modules depending
+            # on them should resolve them again if they change
+            self.forget_dependents_data(resource)
+            self._remove(resource)
+            self.evictions += 1
+
+    def _remove(self, resource):
+        self.observer.remove_resource(resource)
+        del self.module_map[resource]
+        for dependency in self.dependencies.pop(resource, ()):
+            dependents = self.dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(resource)
+                if not dependents:
+                    del self.dependents[dependency]
+
     def forget_all_data(self):
         for pymodule in self.module_map.values():
             pymodule._forget_concluded_data()
 
+    def get_stats(self):
+        """Return a dict of cache hits, misses and evictions"""
+        return {'modules': len(self.module_map), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
     def __str__(self):
-        return 'PyCore caches %d PyModules\n' % len(self.module_map)
+        return 'PyCore caches %d PyModules (%d hits, %d misses, ' \
+            '%d evictions)\n' % (len(self.module_map), self.hits,
+                                 self.misses, self.evictions)
 
 
 class _ExtensionCache(object):
@@ -282,6 +390,88 @@ class _ExtensionCache(object):
         return self.extensions.get(name)
 
 
+class _ASTCache(object):
+    """Keeps the ASTs of python files in ``.ropeproject/astcache``
+
+    There is one entry for each file name and version of the
+    interpreter.  It holds the digest of the contents the AST was made
+    for and it is replaced when the contents change; so the cache does
+    not grow as files are changed.  Use `clear()` for removing all
+    entries.
+
+    """
+
+    def __init__(self, pycore):
+        self.pycore = pycore
+        self.project = pycore.project
+
+    def parse(self, source_bytes, filename='<string>'):
+        """Return the AST of `source_bytes` using the cache if possible"""
+        folder = self._get_folder()
+        if folder is None:
+            return ast.parse(source_bytes, filename=filename)
+        path = os.path.join(folder, self._get_key(filename))
+        digest = hashlib.sha1(source_bytes).hexdigest()
+        node = self._load(path, digest)
+        if node is None:
+            node = ast.parse(source_bytes, filename=filename)
+            self._save(folder, path, (digest, node))
+        return node
+
+    def clear(self):
+        """Remove all entries of the cache"""
+        folder = self._get_folder()
+        if folder is not None:
+            for name in os.listdir(folder):
+                os.remove(os.path.join(folder, name))
+
+    def _get_key(self, filename):
+        if not isinstance(filename, bytes):
+            filename = filename.encode('utf-8', 'replace')
+        digest = hashlib.sha1(filename).hexdigest()
+        return '%s-%d%d' % (digest, sys.version_info[0], sys.version_info[1])
+
+    def _load(self, path, digest):
+        try:
+            with open(path, 'rb') as input:
+                saved_digest, node = pickle.load(input)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError,
+                ValueError, TypeError, AttributeError):
+            return None
+        if saved_digest == digest:
+            return node
+
+    def _save(self, folder, path, entry):
+        # writing to a temporary file first; other processes might be
+        # reading the same entry
+        try:
+            handle, temp_path = tempfile.mkstemp(dir=folder)
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                pickle.dump(entry, output, pickle.HIGHEST_PROTOCOL)
+            _replace(temp_path, path)
+        except (IOError, OSError, pickle.PicklingError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _get_folder(self):
+        if not self.project.prefs.get('save_ast_cache', False) or \
+           self.project.ropefolder is None:
+            return None
+        folder = os.path.join(self.project.ropefolder.real_path, 'astcache')
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                return None
+        return folder
+
+
+_replace = getattr(os, 'replace', os.rename)
+
+
 def perform_soa_on_changed_scopes(project, resource, old_contents):
     pycore = project.pycore
     if resource.exists() and pycore.is_python_file(resource):
@@ -181,12 +181,14 @@ class PyModule(pyobjects.PyModule):
             if source_code is None:
                 source_bytes = resource.read_bytes()
                 source_code = fscommands.file_data_to_unicode(source_bytes)
+                ast_node = pycore.ast_cache.parse(source_bytes,
+                                                  filename=filename)
             else:
                 if isinstance(source_code, unicode):
                     source_bytes = fscommands.unicode_to_file_data(source_code)
                 else:
                     source_bytes = source_code
-            ast_node = ast.parse(source_bytes, filename=filename)
+                ast_node = ast.parse(source_bytes, filename=filename)
         except SyntaxError as e:
             raise exceptions.ModuleSyntaxError(filename, e.lineno, e.msg)
         except UnicodeDecodeError as e:
@@ -247,6 +249,8 @@ class PyPackage(pyobjects.PyPackage):
         init_dot_py = self._get_init_dot_py()
         if init_dot_py:
             init_object = self.pycore.project.get_pymodule(init_dot_py)
+            self.pycore.module_cache.add_dependency(self.resource,
+                                                    init_dot_py)
             result.update(init_object.get_attributes())
         return result
 
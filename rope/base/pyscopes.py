@@ -1,3 +1,5 @@
+import bisect
+
 import rope.base.builtins
 import rope.base.codeanalyze
 import rope.base.pynames
@@ -216,6 +218,8 @@ class _HoldingScopeFinder(object):
 
     def __init__(self, pymodule):
         self.pymodule = pymodule
+        self._subscopes = {}
+        self._holding_scopes = {}
 
     def get_indents(self, lineno):
         return rope.base.codeanalyze.count_line_indents(
@@ -227,6 +231,13 @@ class _HoldingScopeFinder(object):
     def get_holding_scope(self, module_scope, lineno, line_indents=None):
         if line_indents is None:
             line_indents = self.get_indents(lineno)
+        key = (module_scope, lineno, line_indents)
+        if key not in self._holding_scopes:
+            self._holding_scopes[key] = self._find_holding_scope(
+                module_scope, lineno, line_indents)
+        return self._holding_scopes[key]
+
+    def _find_holding_scope(self, module_scope, lineno, line_indents):
         current_scope = module_scope
         new_scope = current_scope
         while new_scope is not None and \
@@ -236,16 +247,26 @@ class _HoldingScopeFinder(object):
             if current_scope.get_start() == lineno and \
                current_scope.get_kind() != 'Module':
                 return current_scope
-            new_scope = None
-            for scope in current_scope.get_scopes():
-                if scope.get_start() <= lineno:
-                    if lineno <= scope.get_end():
-                        new_scope = scope
-                        break
-                else:
-                    break
+            new_scope = self._find_subscope(current_scope, lineno)
         return current_scope
 
+    def _find_subscope(self, scope, lineno):
+        """Return the first subscope of `scope` that contains `lineno`"""
+        starts, scopes = self._get_subscopes(scope)
+        last = bisect.bisect_right(starts, lineno)
+        # only the last subscopes starting before `lineno` can hold it
+        first = bisect.bisect_left(starts, starts[last - 1]) if last else 0
+        for subscope in scopes[first:last]:
+            if lineno <= subscope.get_end():
+                return subscope
+
+    def _get_subscopes(self, scope):
+        if scope not in self._subscopes:
+            scopes = scope.get_scopes()
+            self._subscopes[scope] = ([subscope.get_start()
+                                       for subscope in scopes], scopes)
+        return self._subscopes[scope]
+
     def _is_empty_line(self, lineno):
         line = self.lines.get_line(lineno)
         return line.strip() == '' or line.lstrip().startswith('#')
@@ -29,6 +29,11 @@ class ResourceObserver(object):
         if self.changed is not None:
             self.changed(resource)
 
+    def resources_changed(self, resources):
+        """It is called when a list of resources change at once"""
+        for resource in resources:
+            self.resource_changed(resource)
+
     def resource_moved(self, resource, new_resource):
         """It is called when a resource is moved"""
         if self.moved is not None:
@@ -113,6 +118,12 @@ class FilteredResourceObserver(object):
         self._update_changes_caused_by_changed(changes, resource)
         self._perform_changes(changes)
 
+    def resources_changed(self, resources):
+        changes = _Changes()
+        for resource in resources:
+            self._update_changes_caused_by_changed(changes, resource)
+        self._perform_changes(changes)
+
     def _update_changes_caused_by_changed(self, changes, changed):
         if changed in self.resources:
             changes.add_changed(changed)
@@ -210,6 +210,7 @@ class _ResourceMatcher(object):
     def __init__(self):
         self.patterns = []
         self._compiled_patterns = []
+        self._joined_pattern = None
 
     def set_patterns(self, patterns):
         """Specify which resources to match
@@ -219,25 +220,48 @@ class _ResourceMatcher(object):
 
         """
         self._compiled_patterns = None
+        self._joined_pattern = None
         self.patterns = patterns
 
     def _add_pattern(self, pattern):
         re_pattern = pattern.replace('.', '\\.').\
             replace('*', '[^/]*').replace('?', '[^/]').\
-            replace('//', '/(.*/)?')
-        re_pattern = '^(.*/)?' + re_pattern + '(/.*)?$'
+            replace('//', '/(?:.*/)?')
+        # non-capturing groups; python 2 allows only 100 groups in
+        # `joined_pattern`
+        re_pattern = '^(?:.*/)?' + re_pattern + '(?:/.*)?$'
         self.compiled_patterns.append(re.compile(re_pattern))
 
     def does_match(self, resource):
-        for pattern in self.compiled_patterns:
-            if pattern.match(resource.path):
-                return True
+        if self.does_match_path(resource.path):
+            return True
         path = os.path.join(resource.project.address,
                             *resource.path.split('/'))
         if os.path.islink(path):
             return True
         return False
 
+    def does_match_path(self, path):
+        """Tell whether a pattern matches `path`
+
+        Unlike `does_match()`, symbolic links are not checked.
+        """
+        if self.joined_pattern is None:
+            return False
+        return self.joined_pattern.match(path) is not None
+
+    @property
+    def joined_pattern(self):
+        """All of the patterns in one regular expression
+
+        It is `None` if there are no patterns.
+        """
+        if self._joined_pattern is None and self.compiled_patterns:
+            self._joined_pattern = re.compile('|'.join(
+                '(?:%s)' % pattern.pattern
+                for pattern in self.compiled_patterns))
+        return self._joined_pattern
+
     @property
     def compiled_patterns(self):
         if self._compiled_patterns is None:
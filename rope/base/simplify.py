@@ -47,9 +47,8 @@ def real_code(source):
 @utils.cached(7)
 def ignored_regions(source):
     """Return ignored regions like strings and comments in `source` """
-    return [(match.start(), match.end()) for match in _str.finditer(source)]
+    return [(start, end) for start, end, kind
+            in codeanalyze.get_source_regions(source) if kind != 'fstring']
 
 
-_str = re.compile('%s|%s' % (codeanalyze.get_comment_pattern(),
-                             codeanalyze.get_string_pattern()))
 _parens = re.compile(r'[\({\[\]}\)\n]')
@@ -1,3 +1,5 @@
+import collections
+import hashlib
 import sys
 import warnings
 
@@ -58,32 +60,85 @@ def deprecated(message=None):
     return _decorator
 
 
-def cached(size):
-    """A caching decorator based on parameter objects"""
+def cached(size, digest=False):
+    """A caching decorator based on parameter objects
+
+    The results of the last `size` calls are kept and the least
+    recently used ones are dropped.  Parameters should be hashable;
+    calls with unhashable parameters are not cached.  If `digest` is
+    `True`, long `str` and `bytes` parameters are replaced with their
+    digest in cache keys, so that they are not kept by the cache.
+    The decorated function has a `get_stats()` attribute that returns
+    the number of cache hits and misses.
+
+    """
     def decorator(func):
-        cached_func = _Cached(func, size)
-        return lambda *a, **kw: cached_func(*a, **kw)
+        cached_func = _Cached(func, size, digest)
+        result = lambda *a, **kw: cached_func(*a, **kw)
+        result.get_stats = cached_func.get_stats
+        return result
     return decorator
 
 
 class _Cached(object):
 
-    def __init__(self, func, count):
+    _digest_threshold = 1024
+
+    def __init__(self, func, count, digest=False):
         self.func = func
-        self.cache = []
+        self.cache = collections.OrderedDict()
         self.count = count
+        self.digest = digest
+        self.hits = 0
+        self.misses = 0
 
     def __call__(self, *args, **kwds):
-        key = (args, kwds)
-        for cached_key, cached_result in self.cache:
-            if cached_key == key:
-                return cached_result
+        key = self._get_key(args, kwds)
+        try:
+            result = self.cache.pop(key)
+        except KeyError:
+            pass
+        except TypeError:
+            return self.func(*args, **kwds)
+        else:
+            self.hits += 1
+            self.cache[key] = result
+            return result
+        self.misses += 1
         result = self.func(*args, **kwds)
-        self.cache.append((key, result))
+        self.cache[key] = result
         if len(self.cache) > self.count:
-            del self.cache[0]
+            self.cache.popitem(last=False)
         return result
 
+    def _get_key(self, args, kwds):
+        if self.digest:
+            args = tuple(self._digest(arg) for arg in args)
+        if kwds:
+            return (args, tuple(sorted(kwds.items())))
+        return args
+
+    def _digest(self, value):
+        if isinstance(value, (bytes, _text_type)) and \
+           len(value) > self._digest_threshold:
+            if not isinstance(value, bytes):
+                value = value.encode('utf-8', _encoding_errors)
+            return (_Digest, hashlib.sha1(value).digest())
+        return value
+
+    def get_stats(self):
+        """Return a dict of cache hits and misses"""
+        return {'size': len(self.cache), 'hits': self.hits,
+                'misses': self.misses}
+
+
+class _Digest(object):
+    """Marks digests in cache keys"""
+
+
+_text_type = type(u'')
+_encoding_errors = 'surrogatepass' if sys.version_info[0] > 2 else 'strict'
+
 
 def resolve(str_or_obj):
     """Returns object from string"""
@@ -0,0 +1,318 @@
+"""Watching project files for changes made by other programs
+
+Without a watcher, changes made outside rope are found only when
+`rope.base.project.Project.validate()` is called, which checks every
+resource observers are interested in.  `InotifyWatcher` asks Linux to
+report the changes instead; `Project.validate()` then only reads the
+reported changes and passes them to the observers of the project, so
+it costs nothing when nothing has changed.  Clients with an event loop
+can wait for `InotifyWatcher.fileno()` to become readable and call
+`Project.validate()` then.
+
+Use ``watch_files`` project config for enabling the watcher.
+
+"""
+import errno
+import os
+import struct
+import sys
+
+from rope.base import resourceobserver
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+
+def create_watcher(project):
+    """Return a watcher for `project` or `None` if none is available"""
+    if not InotifyWatcher.is_available():
+        return None
+    watcher = InotifyWatcher(project)
+    try:
+        watcher.start()
+    except OSError:
+        # for instance when ``max_user_watches`` is reached
+        watcher.close()
+        return None
+    return watcher
+
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+
+_WATCHED_EVENTS = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+                   _IN_CREATE | _IN_DELETE | _IN_ONLYDIR)
+
+_event_header = struct.Struct('iIII')
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                            use_errno=True)
+    return _libc
+
+
+class InotifyWatcher(object):
+    """Report changes to the files of a project using Linux inotify
+
+    Each folder of the project that is not ignored is watched.  Changes
+    are read and reported when `process_events()` is called.  Changes
+    that rope itself has reported to the observers of the project are
+    not reported again.
+
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.fd = None
+        self.paths = {}
+        self._known = {}
+        self._timekeeper = resourceobserver.ChangeIndicator()
+        self.observer = resourceobserver.ResourceObserver(
+            self._changed, self._moved, self._created, self._removed)
+        self.project.add_observer(self.observer)
+
+    @staticmethod
+    def is_available():
+        if ctypes is None or not sys.platform.startswith('linux'):
+            return False
+        try:
+            return hasattr(_get_libc(), 'inotify_init1')
+        except OSError:
+            return False
+
+    def start(self):
+        """Start watching the folders of the project"""
+        libc = _get_libc()
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            self.fd = None
+            _raise_errno()
+        self._watch_tree('')
+
+    def close(self):
+        """Stop watching
+
+        Changes made after closing are found when `process_events()`
+        is called again by validating the whole project.
+        """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+            self.paths.clear()
+            self._known.clear()
+
+    def fileno(self):
+        return self.fd
+
+    def process_events(self):
+        """Report the changes read so far to the observers of the project"""
+        if self.fd is not None:
+            events = self._read_events()
+            if events is not None:
+                self._dispatch(events)
+                return
+            # some events were lost; folders created meanwhile are not
+            # watched yet
+            self.close()
+        self.start()
+        self._validate_all()
+
+    def _validate_all(self):
+        for observer in list(self.project.observers):
+            observer.validate(self.project.root)
+
+    def _watch_tree(self, path):
+        folders = [path]
+        while folders:
+            path = folders.pop()
+            self._watch(path)
+            real_path = self.project._get_resource_path(path)
+            try:
+                names = os.listdir(real_path)
+            except OSError:
+                continue
+            for name in names:
+                child = path + '/' + name if path else name
+                child_path = os.path.join(real_path, name)
+                if os.path.isdir(child_path) and \
+                   not os.path.islink(child_path) and \
+                   not self.project.ignored.does_match_path(child):
+                    folders.append(child)
+
+    def _watch(self, path):
+        real_path = self.project._get_resource_path(path)
+        wd = _get_libc().inotify_add_watch(
+            self.fd, real_path.encode(sys.getfilesystemencoding()),
+            _WATCHED_EVENTS)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            _raise_errno(error)
+        self.paths[wd] = path
+
+    def _read_events(self):
+        """Return the list of ``(mask, cookie, path)`` events
+
+        `None` is returned if some events were lost.
+        """
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not chunk:
+                break
+            data += chunk
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _event_header.unpack_from(data, offset)
+            offset += _event_header.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            if mask & _IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            if wd not in self.paths or not name:
+                continue
+            name = name.decode(sys.getfilesystemencoding())
+            parent = self.paths[wd]
+            path = parent + '/' + name if parent else name
+            if not self.project.ignored.does_match_path(path):
+                events.append((mask, cookie, path))
+        return events
+
+    def _dispatch(self, events):
+        moved_from = {}
+        created = set()
+        for mask, cookie, path in events:
+            resource = self._get_resource(path, mask & _IN_ISDIR)
+            if mask & _IN_CREATE:
+                created.add(path)
+            if mask & _IN_MOVED_FROM:
+                moved_from[cookie] = resource
+            elif mask & _IN_DELETE:
+                if not self._is_known(resource):
+                    self._notify('resource_removed', resource)
+            elif mask & _IN_MOVED_TO and cookie in moved_from:
+                old_resource = moved_from.pop(cookie)
+                if resource.is_folder():
+                    self._move_watches(old_resource.path, path)
+                if not resource.exists():
+                    # it is removed later; see the events that follow
+                    if not self._is_known(old_resource):
+                        self._notify('resource_removed', old_resource)
+                elif old_resource.path in created and \
+                        not resource.is_folder():
+                    # replaced with a new temporary file, as rope and
+                    # many editors do when saving files
+                    if not self._is_known(resource):
+                        if resource.path in self._known:
+                            self._notify('resource_changed', resource)
+                        else:
+                            self._notify('resource_created', resource)
+                elif not self._is_known(old_resource) or \
+                        not self._is_known(resource):
+                    self._notify('resource_moved', old_resource, resource)
+            elif not resource.exists():
+                continue
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                if not self._is_known(resource):
+                    self._notify('resource_created', resource)
+                if resource.is_folder():
+                    # files might have been added to it before it
+                    # was watched
+                    self._watch_tree(path)
+                    self._notify('validate', resource)
+            elif mask & _IN_CLOSE_WRITE:
+                if not self._is_known(resource):
+                    self._notify('resource_changed', resource)
+        for resource in moved_from.values():
+            # moved out of the project or to an ignored folder
+            if resource.is_folder():
+                self._forget_watches(resource.path)
+            if not self._is_known(resource):
+                self._notify('resource_removed', resource)
+
+    def _get_resource(self, path, is_folder):
+        if is_folder:
+            return self.project.get_folder(path)
+        return self.project.get_file(path)
+
+    def _move_watches(self, path, new_path):
+        for wd, watched in list(self.paths.items()):
+            if watched == path or watched.startswith(path + '/'):
+                self.paths[wd] = new_path + watched[len(path):]
+
+    def _forget_watches(self, path):
+        for wd, watched in list(self.paths.items()):
+            if watched == path or watched.startswith(path + '/'):
+                _get_libc().inotify_rm_watch(self.fd, wd)
+                del self.paths[wd]
+
+    def _notify(self, method, *resources):
+        for observer in list(self.project.observers):
+            if observer is not self.observer:
+                getattr(observer, method)(*resources)
+        for resource in resources:
+            self._remember(resource)
+
+    def _is_known(self, resource):
+        """Tell whether the observers know the state of `resource`"""
+        return resource.path in self._known and \
+            self._known[resource.path] == self._get_state(resource)
+
+    def _remember(self, resource):
+        self._known[resource.path] = self._get_state(resource)
+
+    def _get_state(self, resource):
+        path = resource.real_path
+        try:
+            if os.path.isdir(path):
+                return True
+            return self._timekeeper.get_indicator(resource)
+        except OSError:
+            return None
+
+    def _changed(self, resource):
+        self._remember(resource)
+
+    def _moved(self, resource, new_resource):
+        self._remember(resource)
+        self._remember(new_resource)
+
+    def _created(self, resource):
+        self._remember(resource)
+
+    def _removed(self, resource):
+        self._remember(resource)
+
+
+def _raise_errno(error=None):
+    if error is None:
+        error = ctypes.get_errno()
+    raise OSError(error, os.strerror(error))
@@ -1,13 +1,21 @@
+import bisect
+import multiprocessing
 import re
+import subprocess
+import sys
 
+from rope.base import ast
+from rope.base import astutils
 from rope.base import builtins
 from rope.base import exceptions
 from rope.base import libutils
+from rope.base import parallel
 from rope.base import pynames
 from rope.base import pyobjects
 from rope.base import resources
 from rope.base import resourceobserver
 from rope.base import taskhandle
+from rope.base.utils import pycompat
 from rope.refactor import importutils
 
 
@@ -29,9 +37,11 @@ class AutoImport(object):
         """
         self.project = project
         self.underlined = underlined
-        self.names = project.data_files.read_data('globalnames')
-        if self.names is None:
-            self.names = {}
+        self.names = {}
+        self.index = _NameIndex()
+        self._journal = None
+        self._changes = {}
+        self._load()
         project.data_files.add_write_hook(self._write)
         # XXX: using a filtered observer
         observer = resourceobserver.ResourceObserver(
@@ -45,79 +55,172 @@ class AutoImport(object):
         This function tries to find modules that have a global name
         that starts with `starting`.
         """
-        # XXX: breaking if gave up! use generators
-        result = []
-        for module in self.names:
-            for global_name in self.names[module]:
-                if global_name.startswith(starting):
-                    result.append((global_name, module))
-        return result
+        return self._with_modules(self.index.starting_with(starting))
+
+    def search(self, text):
+        """Return a list of ``(name, module)`` tuples
+
+        Like `import_assist()` but finds global names that contain
+        `text`, ignoring case.
+        """
+        return self._with_modules(self.index.containing(text))
+
+    def _with_modules(self, names):
+        return [(name, module) for name in names
+                for module in sorted(self.index.modules[name])]
 
     def get_modules(self, name):
         """Return the list of modules that have global `name`"""
-        result = []
-        for module in self.names:
-            if name in self.names[module]:
-                result.append(module)
-        return result
+        return sorted(self.index.modules.get(name, ()))
 
     def get_all_names(self):
         """Return the list of all cached global names"""
-        result = set()
-        for module in self.names:
-            result.update(set(self.names[module]))
-        return result
+        return set(self.index.modules)
 
     def get_name_locations(self, name):
         """Return a list of ``(resource, lineno)`` tuples"""
         result = []
-        for module in self.names:
-            if name in self.names[module]:
-                try:
-                    pymodule = self.project.get_module(module)
-                    if name in pymodule:
-                        pyname = pymodule[name]
-                        module, lineno = pyname.get_definition_location()
-                        if module is not None:
-                            resource = module.get_module().get_resource()
-                            if resource is not None and lineno is not None:
-                                result.append((resource, lineno))
-                except exceptions.ModuleNotFoundError:
-                    pass
+        for module in self.get_modules(name):
+            try:
+                pymodule = self.project.get_module(module)
+                if name in pymodule:
+                    pyname = pymodule[name]
+                    module, lineno = pyname.get_definition_location()
+                    if module is not None:
+                        resource = module.get_module().get_resource()
+                        if resource is not None and lineno is not None:
+                            result.append((resource, lineno))
+            except exceptions.ModuleNotFoundError:
+                pass
         return result
 
     def generate_cache(self, resources=None, underlined=None,
-                       task_handle=taskhandle.NullTaskHandle()):
+                       task_handle=taskhandle.NullTaskHandle(), workers=None):
         """Generate global name cache for project files
 
         If `resources` is a list of `rope.base.resource.File`, only
         those files are searched; otherwise all python modules in the
         project are cached.
 
+        If `workers` is not `None`, the names are found by a quick
+        pass over the syntax tree of each file, without making rope
+        module objects, and the files are divided among `workers`
+        processes; see `rope.base.parallel`.  Zero means one process
+        for each processor.
+
         """
         if resources is None:
             resources = self.project.get_python_files()
         job_set = task_handle.create_jobset(
             'Generatig autoimport cache', len(resources))
+        if workers is not None:
+            self._update_resources(resources, underlined, workers, job_set)
+            return
         for file in resources:
             job_set.started_job('Working on <%s>' % file.path)
             self.update_resource(file, underlined)
             job_set.finished_job()
 
     def generate_modules_cache(self, modules, underlined=None,
-                               task_handle=taskhandle.NullTaskHandle()):
-        """Generate global name cache for modules listed in `modules`"""
-        job_set = task_handle.create_jobset(
-            'Generatig autoimport cache for modules', len(modules))
+                               task_handle=taskhandle.NullTaskHandle(),
+                               workers=None, sandbox=False):
+        """Generate global name cache for modules listed in `modules`
+
+        `workers` is used as in `generate_cache()`.  If `sandbox` is
+        `True`, builtin and extension modules are imported in other
+        python processes, instead of this one, for finding their
+        names; a module that crashes or hangs when imported is skipped.
+
+        """
+        if workers is None and not sandbox:
+            job_set = task_handle.create_jobset(
+                'Generatig autoimport cache for modules', len(modules))
+            for modname in modules:
+                job_set.started_job('Working on <%s>' % modname)
+                if modname.endswith('.*'):
+                    mod = self.project.find_module(modname[:-2])
+                    if mod:
+                        for sub in submodules(mod):
+                            self.update_resource(sub, underlined)
+                else:
+                    self.update_module(modname, underlined)
+                job_set.finished_job()
+            return
+        resources = []
+        extensions = []
+        others = []
+        extension_modules = self.project.pycore.extension_modules
         for modname in modules:
-            job_set.started_job('Working on <%s>' % modname)
             if modname.endswith('.*'):
                 mod = self.project.find_module(modname[:-2])
                 if mod:
-                    for sub in submodules(mod):
-                        self.update_resource(sub, underlined)
+                    resources.extend(submodules(mod))
+            elif modname in extension_modules:
+                extensions.append(modname)
             else:
-                self.update_module(modname, underlined)
+                mod = self.project.find_module(modname)
+                if mod is not None and workers is not None:
+                    resources.append(mod)
+                else:
+                    others.append(modname)
+        if not sandbox:
+            others.extend(extensions)
+            extensions = []
+        job_set = task_handle.create_jobset(
+            'Generatig autoimport cache for modules',
+            len(resources) + len(extensions) + len(others))
+        for modname in others:
+            job_set.started_job('Working on <%s>' % modname)
+            self.update_module(modname, underlined)
+            job_set.finished_job()
+        if extensions:
+            self._update_extensions(extensions, underlined, workers,
+                                    extension_modules, job_set)
+        if resources:
+            self._update_resources(resources, underlined, workers, job_set)
+
+    def _update_resources(self, resources, underlined, workers, job_set):
+        if underlined is None:
+            underlined = self.underlined
+        results = parallel.map_resources(
+            self.project, _find_global_names, resources, args=(underlined,),
+            workers=workers, job_set=job_set)
+        for result in results:
+            for modname, names in result:
+                self._set_module(modname, names)
+
+    def _update_extensions(self, modnames, underlined, workers,
+                           extension_modules, job_set):
+        if underlined is None:
+            underlined = self.underlined
+        if parallel.is_available(workers):
+            executor = parallel.futures.ThreadPoolExecutor(
+                workers or multiprocessing.cpu_count())
+            try:
+                results = executor.map(_import_names, modnames)
+                self._add_extensions(modnames, results, underlined,
+                                     extension_modules, job_set)
+            finally:
+                executor.shutdown()
+        else:
+            results = (_import_names(modname) for modname in modnames)
+            self._add_extensions(modnames, results, underlined,
+                                 extension_modules, job_set)
+
+    def _add_extensions(self, modnames, results, underlined,
+                        extension_modules, job_set):
+        for modname, names in zip(modnames, results):
+            job_set.started_job('Working on <%s>' % modname)
+            if names is not None:
+                for extension in extension_modules:
+                    if extension.startswith(modname + '.'):
+                        name = extension[len(modname) + 1:]
+                        if '.' not in name and name not in names:
+                            names.append(name)
+                if not underlined:
+                    names = [name for name in names
+                             if not name.startswith('_')]
+                self._set_module(modname, names)
             job_set.finished_job()
 
     def clear_cache(self):
@@ -127,7 +230,8 @@ class AutoImport(object):
         regenerating global names.
 
         """
-        self.names.clear()
+        for modname in list(self.names):
+            self._remove_module(modname)
 
     def find_insertion_line(self, code):
         """Guess at what line the new import should be inserted"""
@@ -186,10 +290,62 @@ class AutoImport(object):
                 globals.append(name)
             if isinstance(pymodule, builtins.BuiltinModule):
                 globals.append(name)
-        self.names[modname] = globals
+        self._set_module(modname, globals)
+
+    def _set_module(self, modname, names):
+        old_names = self.names.get(modname)
+        if old_names == names:
+            return
+        if old_names is not None:
+            self.index.remove(modname, old_names)
+        self.names[modname] = names
+        self.index.add(modname, names)
+        self._changes[modname] = names
+
+    def _remove_module(self, modname):
+        if modname in self.names:
+            self.index.remove(modname, self.names.pop(modname))
+            self._changes[modname] = None
+
+    def _load(self):
+        """Read the names saved by `_write()`
+
+        The first record is a dict of module names and their global
+        names and the records that follow are lists of ``(modname,
+        names)`` changes; `names` is `None` for removed modules.
+        """
+        records, complete = self.project.data_files.read_journal(
+            'globalnames')
+        if not records or not isinstance(records[0], dict):
+            return
+        self.names = records[0]
+        self._journal = 0
+        for record in records[1:]:
+            for modname, names in record:
+                if names is None:
+                    self.names.pop(modname, None)
+                else:
+                    self.names[modname] = names
+            self._journal += len(record)
+        if not complete:
+            # names appended after what could not be read would be
+            # lost; rewrite them instead
+            self._journal = None
+        for modname, names in self.names.items():
+            self.index.add(modname, names)
 
     def _write(self):
-        self.project.data_files.write_data('globalnames', self.names)
+        if self._journal is not None and not self._changes:
+            return
+        if self._journal is None or \
+           self._journal + len(self._changes) > len(self.names):
+            self.project.data_files.write_data('globalnames', self.names)
+            self._journal = 0
+        else:
+            self.project.data_files.write_data(
+                'globalnames', list(self._changes.items()), append=True)
+            self._journal += len(self._changes)
+        self._changes.clear()
 
     def _changed(self, resource):
         if not resource.is_folder():
@@ -197,16 +353,302 @@ class AutoImport(object):
 
     def _moved(self, resource, newresource):
         if not resource.is_folder():
-            modname = self._module_name(resource)
-            if modname in self.names:
-                del self.names[modname]
+            self._remove_module(self._module_name(resource))
             self.update_resource(newresource)
 
     def _removed(self, resource):
         if not resource.is_folder():
-            modname = self._module_name(resource)
-            if modname in self.names:
-                del self.names[modname]
+            self._remove_module(self._module_name(resource))
+
+
+class _NameIndex(object):
+    """An index of global names
+
+    `modules` maps names to the set of modules that define them.  A
+    sorted list of names is kept for prefix searches and the names
+    joined in a string for substring searches.  They are updated when
+    they are searched; small changes are applied to them and they
+    are made again after many changes.
+
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self._sorted = []
+        self._added = set()
+        self._removed = set()
+        self._text = None
+        self._text_added = set()
+        self._text_removed = set()
+
+    def add(self, modname, names):
+        for name in names:
+            modules = self.modules.get(name)
+            if modules is None:
+                modules = self.modules[name] = set()
+                _add_to_changes(name, self._added, self._removed)
+                _add_to_changes(name, self._text_added, self._text_removed)
+            modules.add(modname)
+
+    def remove(self, modname, names):
+        for name in names:
+            modules = self.modules.get(name)
+            if modules is None:
+                continue
+            modules.discard(modname)
+            if not modules:
+                del self.modules[name]
+                _add_to_changes(name, self._removed, self._added)
+                _add_to_changes(name, self._text_removed, self._text_added)
+
+    def starting_with(self, prefix):
+        """Return the sorted list of names that start with `prefix`"""
+        names = self._get_sorted()
+        result = []
+        for index in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[index].startswith(prefix):
+                break
+            result.append(names[index])
+        return result
+
+    def containing(self, text):
+        """Return the sorted list of names that contain `text`
+
+        Case is ignored.
+        """
+        text = text.lower()
+        if not text or '\n' in text:
+            return sorted(self.modules) if not text else []
+        names, lowered = self._get_text()
+        result = set(name for name in self._text_added
+                     if text in name.lower())
+        if len(names) != len(lowered):
+            # lower-casing has changed the length of some names
+            result.update(name for name in names.split('\n')
+                          if text in name.lower())
+        else:
+            index = lowered.find(text)
+            while index != -1:
+                start = lowered.rfind('\n', 0, index) + 1
+                end = lowered.find('\n', index)
+                if end == -1:
+                    end = len(lowered)
+                result.add(names[start:end])
+                index = lowered.find(text, end)
+        result.difference_update(self._text_removed)
+        return sorted(result)
+
+    def _get_sorted(self):
+        if _is_changed_a_lot(self._added, self._removed, self.modules):
+            self._sorted = sorted(self.modules)
+        else:
+            for name in self._removed:
+                index = bisect.bisect_left(self._sorted, name)
+                if index < len(self._sorted) and self._sorted[index] == name:
+                    del self._sorted[index]
+            for name in self._added:
+                bisect.insort(self._sorted, name)
+        self._added.clear()
+        self._removed.clear()
+        return self._sorted
+
+    def _get_text(self):
+        if self._text is None or _is_changed_a_lot(
+                self._text_added, self._text_removed, self.modules):
+            names = '\n'.join(self.modules)
+            self._text = (names, names.lower())
+            self._text_added.clear()
+            self._text_removed.clear()
+        return self._text
+
+
+def _add_to_changes(name, added, removed):
+    if name in removed:
+        removed.discard(name)
+    else:
+        added.add(name)
+
+
+def _is_changed_a_lot(added, removed, names):
+    return len(added) + len(removed) > len(names) // 16
+
+
+def _find_global_names(project, resources, underlined):
+    """Return a list of ``(modname, names)`` for python `resources`
+
+    It is called in `rope.base.parallel` workers.
+    """
+    result = []
+    for resource in resources:
+        if resource.is_folder():
+            if not resource.has_child('__init__.py'):
+                result.append((libutils.modname(resource), []))
+                continue
+            source_file = resource.get_child('__init__.py')
+        else:
+            source_file = resource
+        try:
+            node = ast.parse(source_file.read_bytes())
+        except (SyntaxError, exceptions.RopeError):
+            continue
+        visitor = _GlobalNamesVisitor()
+        for child in node.body:
+            ast.walk(child, visitor)
+        names = [name for name, defined in visitor.names.items()
+                 if defined and (underlined or not name.startswith('_'))]
+        result.append((libutils.modname(resource), names))
+    return result
+
+
+class _GlobalNamesVisitor(object):
+    """Find the global names of a module from its syntax tree
+
+    It follows what `rope.base.pyobjectsdef` does for module scopes
+    without making rope objects.  `names` maps names to `True` if
+    they are defined or assigned in the module and to `False` if they
+    are imported.
+
+    """
+
+    def __init__(self):
+        self.names = {}
+
+    def _assigned(self, node):
+        for name, levels in astutils.get_name_levels(node):
+            self.names.setdefault(name, True)
+
+    def _walk_children(self, nodes):
+        for child in nodes:
+            ast.walk(child, self)
+
+    def _ClassDef(self, node):
+        self.names[node.name] = True
+
+    def _FunctionDef(self, node):
+        self.names[node.name] = True
+
+    def _AsyncFunctionDef(self, node):
+        self._FunctionDef(node)
+
+    def _Assign(self, node):
+        for target in node.targets:
+            self._assigned(target)
+        ast.walk(node.value, self)
+
+    def _AnnAssign(self, node):
+        self._assigned(node.target)
+
+    def _AugAssign(self, node):
+        pass
+
+    def _For(self, node):
+        self._assigned(node.target)
+        self._walk_children(node.body + node.orelse)
+
+    def _AsyncFor(self, node):
+        self._For(node)
+
+    def _With(self, node):
+        for item in pycompat.get_ast_with_items(node):
+            if item.optional_vars:
+                self._assigned(item.optional_vars)
+        self._walk_children(node.body)
+
+    def _AsyncWith(self, node):
+        self._With(node)
+
+    def _ExceptHandler(self, node):
+        if isinstance(node.name, pycompat.string_types):
+            self.names.setdefault(node.name, True)
+        elif node.name is not None:
+            self._assigned(node.name)
+        self._walk_children(node.body)
+
+    def _Import(self, node):
+        for import_pair in node.names:
+            if import_pair.asname is not None:
+                self.names[import_pair.asname] = False
+            else:
+                self.names[import_pair.name.split('.')[0]] = False
+
+    def _ImportFrom(self, node):
+        for imported_name in node.names:
+            if imported_name.name != '*':
+                name = imported_name.asname or imported_name.name
+                self.names[name] = False
+
+    def _Global(self, node):
+        for name in node.names:
+            self.names.setdefault(name, True)
+
+    def _GeneratorExp(self, node):
+        for child in ['elt', 'key', 'value']:
+            if hasattr(node, child):
+                ast.walk(getattr(node, child), self)
+        for comp in node.generators:
+            self._assigned(comp.target)
+            ast.walk(comp, self)
+            self._walk_children(comp.ifs)
+
+    def _ListComp(self, node):
+        self._GeneratorExp(node)
+
+    def _SetComp(self, node):
+        self._GeneratorExp(node)
+
+    def _DictComp(self, node):
+        self._GeneratorExp(node)
+
+    def _NamedExpr(self, node):
+        self._assigned(node.target)
+        ast.walk(node.value, self)
+
+    def _Lambda(self, node):
+        pass
+
+
+_import_names_script = """
+import sys
+module = __import__(sys.argv[1])
+for token in sys.argv[1].split('.')[1:]:
+    module = getattr(module, token)
+for name in dir(module):
+    try:
+        getattr(module, name)
+    except AttributeError:
+        continue
+    if name != 'None':
+        print(name)
+"""
+
+_import_names_timeout = 60
+
+
+def _import_names(modname):
+    """Return the names of `modname` by importing it in a new process
+
+    `None` is returned if the import fails or takes too long.
+    """
+    try:
+        process = subprocess.Popen(
+            [sys.executable, '-c', _import_names_script, modname],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+    except OSError:
+        return None
+    try:
+        if pycompat.PY3:
+            output, error = process.communicate(
+                timeout=_import_names_timeout)
+        else:
+            output, error = process.communicate()
+    except Exception:
+        process.kill()
+        process.communicate()
+        return None
+    if process.returncode != 0:
+        return None
+    return output.decode('utf-8', 'replace').split()
 
 
 def submodules(mod):
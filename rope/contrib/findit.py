@@ -1,23 +1,47 @@
 import rope.base.codeanalyze
 import rope.base.evaluate
 import rope.base.pyobjects
-from rope.base import taskhandle, exceptions, worder
+from rope.base import taskhandle, exceptions, parallel, worder
 from rope.contrib import fixsyntax
 from rope.refactor import occurrences
 
 
 def find_occurrences(project, resource, offset, unsure=False, resources=None,
                      in_hierarchy=False,
-                     task_handle=taskhandle.NullTaskHandle()):
+                     task_handle=taskhandle.NullTaskHandle(), workers=None):
     """Return a list of `Location`
 
     If `unsure` is `True`, possible matches are returned, too.  You
     can use `Location.unsure` to see which are unsure occurrences.
     `resources` can be a list of `rope.base.resource.File` that
     should be searched for occurrences; if `None` all python files
-    in the project are searched.
+    in the project are searched.  If `workers` is more than one,
+    resources are searched in this many processes; see
+    `rope.base.parallel`.
 
     """
+    if resources is None:
+        resources = project.get_python_files()
+    job_set = task_handle.create_jobset('Finding Occurrences',
+                                        count=len(resources))
+    if parallel.is_available(workers) and len(resources) > 1:
+        results = parallel.map_resources(
+            project, _find_occurrences_in_resources, resources,
+            args=(resource.path, offset, unsure, in_hierarchy),
+            workers=workers, job_set=job_set)
+        result = []
+        for locations in results:
+            for location in locations:
+                location.resource = project.get_file(location.resource)
+                result.append(location)
+        return result
+    finder = _create_occurrences_finder(project, resource, offset, unsure,
+                                        in_hierarchy)
+    return _find_locations(finder, resources, job_set)
+
+
+def _create_occurrences_finder(project, resource, offset, unsure,
+                               in_hierarchy):
     name = worder.get_name_at(resource, offset)
     this_pymodule = project.get_pymodule(resource)
     primary, pyname = rope.base.evaluate.eval_location2(
@@ -25,14 +49,24 @@ def find_occurrences(project, resource, offset, unsure=False, resources=None,
 
     def is_match(occurrence):
         return unsure
-    finder = occurrences.create_finder(
+    return occurrences.create_finder(
         project, name, pyname, unsure=is_match,
         in_hierarchy=in_hierarchy, instance=primary)
-    if resources is None:
-        resources = project.get_python_files()
-    job_set = task_handle.create_jobset('Finding Occurrences',
-                                        count=len(resources))
-    return _find_locations(finder, resources, job_set)
+
+
+def _find_occurrences_in_resources(project, resources, path, offset,
+                                   unsure, in_hierarchy):
+    """Called in `rope.base.parallel` worker processes
+
+    The returned `Location` objects hold resource paths instead of
+    resources.
+    """
+    finder = _create_occurrences_finder(
+        project, project.get_resource(path), offset, unsure, in_hierarchy)
+    result = _find_locations(finder, resources, taskhandle.NullJobSet())
+    for location in result:
+        location.resource = location.resource.path
+    return result
 
 
 def find_implementations(project, resource, offset, resources=None,
@@ -6,7 +6,8 @@ based on inputs.
 """
 from rope.base import (pyobjects, codeanalyze, exceptions, pynames,
                        taskhandle, evaluate, worder, libutils)
-from rope.base.change import ChangeSet, ChangeContents, MoveResource
+from rope.base.change import (ChangeSet, ChangeContents, MoveResource,
+                              LazyChangeSet)
 from rope.refactor import importutils, rename, occurrences, sourceutils, \
     functionutils
 
@@ -261,7 +262,13 @@ class MoveGlobal(object):
       return isinstance(pyname, pynames.AssignedName)
 
     def get_changes(self, dest, resources=None,
-                    task_handle=taskhandle.NullTaskHandle()):
+                    task_handle=taskhandle.NullTaskHandle(), stream=False):
+        """Get the changes needed for moving to `dest`
+
+        If `stream` is `True`, a `rope.base.change.LazyChangeSet` is
+        returned; the changes are computed when they are previewed or
+        performed and their contents are kept in a temporary file.
+        """
         if resources is None:
             resources = self.project.get_python_files()
         if dest is None or not dest.exists():
@@ -275,18 +282,24 @@ class MoveGlobal(object):
         if self.source == dest:
             raise exceptions.RefactoringError(
                 'Moving global elements to the same module.')
-        return self._calculate_changes(dest, resources, task_handle)
+        description = 'Moving global <%s>' % self.old_name
+        changes = self._calculate_changes(dest, resources, task_handle)
+        if stream:
+            return LazyChangeSet(description, changes, spill=True)
+        result = ChangeSet(description)
+        for change in changes:
+            result.add_change(change)
+        return result
 
     def _calculate_changes(self, dest, resources, task_handle):
-        changes = ChangeSet('Moving global <%s>' % self.old_name)
         job_set = task_handle.create_jobset('Collecting Changes',
                                             len(resources))
         for file_ in resources:
             job_set.started_job(file_.path)
             if file_ == self.source:
-                changes.add_change(self._source_module_changes(dest))
+                yield self._source_module_changes(dest)
             elif file_ == dest:
-                changes.add_change(self._dest_module_changes(dest))
+                yield self._dest_module_changes(dest)
             elif self.tools.occurs_in_module(resource=file_):
                 pymodule = self.project.get_pymodule(file_)
                 # Changing occurrences
@@ -307,9 +320,8 @@ class MoveGlobal(object):
                     source = source.replace(placeholder, imported)
                 source = self.tools.new_source(pymodule, source)
                 if source != file_.read():
-                    changes.add_change(ChangeContents(file_, source))
+                    yield ChangeContents(file_, source)
             job_set.finished_job()
-        return changes
 
     def _source_module_changes(self, dest):
         placeholder = '__rope_moving_%s_' % self.old_name
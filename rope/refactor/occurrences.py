@@ -71,17 +71,30 @@ class Finder(object):
 
     def find_occurrences(self, resource=None, pymodule=None):
         """Generate `Occurrence` instances"""
+        if pymodule is None and not self._may_occur_in(resource):
+            return
         tools = _OccurrenceToolsCreator(self.project, resource=resource,
                                         pymodule=pymodule, docs=self.docs)
         for offset in self._textual_finder.find_offsets(tools.source_code):
             occurrence = Occurrence(tools, offset)
-            for filter in self.filters:
-                result = filter(occurrence)
-                if result is None:
-                    continue
-                if result:
-                    yield occurrence
-                break
+            if self._is_match(occurrence):
+                yield occurrence
+
+    def _is_match(self, occurrence):
+        for filter in self.filters:
+            result = filter(occurrence)
+            if result is None:
+                continue
+            return bool(result)
+        return False
+
+    def _may_occur_in(self, resource):
+        if resource is None or resource.project != self.project:
+            return True
+        name_index = self.project.name_index
+        if name_index is None:
+            return True
+        return name_index.contains(resource, self.name)
 
 
 def create_finder(project, name, pyname, only_calls=False, imports=True,
@@ -117,6 +130,53 @@ def create_finder(project, name, pyname, only_calls=False, imports=True,
     return Finder(project, name, filters=filters, docs=docs)
 
 
+def create_multi_finder(project, pynames_, **kwds):
+    """Create a `MultiFinder` for a ``{name: pyname}`` dict
+
+    Other arguments are passed to `create_finder()` for each name.
+    """
+    return MultiFinder(project, [create_finder(project, name, pyname, **kwds)
+                                 for name, pyname in pynames_.items()])
+
+
+class MultiFinder(object):
+    """For finding occurrences of several names at once
+
+    Each file is searched once for all names of `finders`, a list of
+    `Finder`; each possible occurrence is passed to the filters of the
+    finders of its name.  Occurrences are generated in the order they
+    appear in the file.
+
+    """
+
+    def __init__(self, project, finders):
+        self.project = project
+        self.finders = finders
+        self._textual_finder = _MultiTextualFinder(
+            [finder.name for finder in finders])
+
+    def find_occurrences(self, resource=None, pymodule=None):
+        """Generate `Occurrence` instances"""
+        finders = {}
+        for finder in self.finders:
+            if pymodule is not None or finder._may_occur_in(resource):
+                finders.setdefault(finder.name, []).append(finder)
+        if not finders:
+            return
+        tools = {}
+        for docs in set(finder.docs for finder in self.finders):
+            tools[docs] = _OccurrenceToolsCreator(
+                self.project, resource=resource, pymodule=pymodule, docs=docs)
+        source = tools[self.finders[0].docs].source_code
+        for offset, name, kind in self._textual_finder.find_offsets(source):
+            for finder in finders.get(name, ()):
+                if kind == ('fstring' if finder.docs else 'text'):
+                    continue
+                occurrence = Occurrence(tools[finder.docs], offset)
+                if finder._is_match(occurrence):
+                    yield occurrence
+
+
 class Occurrence(object):
 
     def __init__(self, tools, offset):
@@ -298,12 +358,7 @@ class _TextualFinder(object):
     def __init__(self, name, docs=False):
         self.name = name
         self.docs = docs
-        self.comment_pattern = _TextualFinder.any('comment', [r'#[^\n]*'])
-        self.string_pattern = _TextualFinder.any(
-            'string', [codeanalyze.get_string_pattern()])
-        self.f_string_pattern = _TextualFinder.any(
-            'fstring', [codeanalyze.get_formatted_string_pattern()])
-        self.pattern = self._get_occurrence_pattern(self.name)
+        self.pattern = re.compile(r'\b' + name + r'\b')
 
     def find_offsets(self, source):
         if not self._fast_file_query(source):
@@ -316,13 +371,29 @@ class _TextualFinder(object):
             yield matched
 
     def _re_search(self, source):
+        # comments and strings come from the table shared with `Worder`
+        regions = codeanalyze.get_source_regions(source)
+        index = 0
         for match in self.pattern.finditer(source):
-            if match.groupdict()['occurrence']:
-                yield match.start('occurrence')
-            elif utils.pycompat.PY36 and match.groupdict()['fstring']:
-                f_string = match.groupdict()['fstring']
+            offset = match.start()
+            while index < len(regions) and regions[index][1] <= offset:
+                for found in self._search_in_region(source, regions[index]):
+                    yield found
+                index += 1
+            if index < len(regions) and regions[index][0] <= offset:
+                continue
+            yield offset
+        for region in regions[index:]:
+            for found in self._search_in_region(source, region):
+                yield found
+
+    def _search_in_region(self, source, region):
+        start, end, kind = region
+        if kind == 'fstring' and utils.pycompat.PY36:
+            f_string = source[start:end]
+            if self.name in f_string:
                 for occurrence_node in self._search_in_f_string(f_string):
-                    yield match.start('fstring') + occurrence_node.col_offset
+                    yield start + occurrence_node.col_offset
 
     def _search_in_f_string(self, f_string):
         tree = ast.parse(f_string)
@@ -360,17 +431,52 @@ class _TextualFinder(object):
         else:
             return pymodule.source_code
 
-    def _get_occurrence_pattern(self, name):
-        occurrence_pattern = _TextualFinder.any('occurrence',
-                                                ['\\b' + name + '\\b'])
-        pattern = re.compile(occurrence_pattern + '|' + self.comment_pattern +
-                             '|' + self.string_pattern + '|' +
-                             self.f_string_pattern)
-        return pattern
-
-    @staticmethod
-    def any(name, list_):
-        return '(?P<%s>' % name + '|'.join(list_) + ')'
+
+class _MultiTextualFinder(object):
+    """Find the offsets of several names in one pass
+
+    `find_offsets()` returns a list of ``(offset, name, kind)`` in
+    offset order; `kind` is ``'code'``, ``'text'`` for matches in
+    comments and strings or ``'fstring'`` for names used in the
+    expressions of f-strings.
+
+    """
+
+    def __init__(self, names):
+        self.names = sorted(set(names), key=len, reverse=True)
+        self.pattern = re.compile(
+            r'\b(?:' + '|'.join(self.names) + r')\b')
+
+    def find_offsets(self, source):
+        if not any(name in source for name in self.names):
+            return []
+        regions = codeanalyze.get_source_regions(source)
+        found = []
+        index = 0
+        for match in self.pattern.finditer(source):
+            offset = match.start()
+            while index < len(regions) and regions[index][1] <= offset:
+                found.extend(self._search_in_region(source, regions[index]))
+                index += 1
+            if index < len(regions) and regions[index][0] <= offset:
+                found.append((offset, match.group(), 'text'))
+            else:
+                found.append((offset, match.group(), 'code'))
+        for region in regions[index:]:
+            found.extend(self._search_in_region(source, region))
+        found.sort()
+        return found
+
+    def _search_in_region(self, source, region):
+        start, end, kind = region
+        if kind != 'fstring' or not utils.pycompat.PY36:
+            return
+        f_string = source[start:end]
+        if not self.pattern.search(f_string):
+            return
+        for node in ast.walk(ast.parse(f_string)):
+            if isinstance(node, ast.Name) and node.id in self.names:
+                yield (start + node.col_offset, node.id, 'fstring')
 
 
 class _OccurrenceToolsCreator(object):
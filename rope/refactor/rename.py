@@ -1,8 +1,9 @@
 import warnings
 
 from rope.base import (exceptions, pyobjects, pynames, taskhandle,
-                       evaluate, worder, codeanalyze, libutils)
-from rope.base.change import ChangeSet, ChangeContents, MoveResource
+                       evaluate, worder, codeanalyze, libutils, parallel)
+from rope.base.change import (ChangeSet, ChangeContents, MoveResource,
+                              LazyChangeSet)
 from rope.refactor import occurrences
 
 
@@ -18,6 +19,7 @@ class Rename(object):
         """If `offset` is None, the `resource` itself will be renamed"""
         self.project = project
         self.resource = resource
+        self.offset = offset
         if offset is not None:
             self.old_name = worder.get_name_at(self.resource, offset)
             this_pymodule = self.project.get_pymodule(self.resource)
@@ -44,7 +46,8 @@ class Rename(object):
 
     def get_changes(self, new_name, in_file=None, in_hierarchy=False,
                     unsure=None, docs=False, resources=None,
-                    task_handle=taskhandle.NullTaskHandle()):
+                    task_handle=taskhandle.NullTaskHandle(), workers=None,
+                    stream=False):
         """Get the changes needed for this refactoring
 
         Parameters:
@@ -64,16 +67,21 @@ class Rename(object):
           will be applied to all python files.
         - `in_file`: this argument has been deprecated; use
           `resources` instead.
+        - `workers`: if more than one, `resources` are searched in
+          this many processes; if zero, one process per processor is
+          used.  See `rope.base.parallel`; if `unsure` cannot be
+          pickled, resources are searched in this process.
+        - `stream`: if `True`, a `rope.base.change.LazyChangeSet` is
+          returned; the changes are computed when they are previewed
+          or performed and their contents are kept in a temporary
+          file.
 
         """
         if unsure in (True, False):
             warnings.warn(
                 'unsure parameter should be a function that returns '
                 'True or False', DeprecationWarning, stacklevel=2)
-
-            def unsure_func(value=unsure):
-                return value
-            unsure = unsure_func
+            unsure = _UnsureValue(unsure)
         if in_file is not None:
             warnings.warn(
                 '`in_file` argument has been deprecated; use `resources` '
@@ -84,25 +92,51 @@ class Rename(object):
             resources = [self.resource]
         if resources is None:
             resources = self.project.get_python_files()
-        changes = ChangeSet('Renaming <%s> to <%s>' %
-                            (self.old_name, new_name))
-        finder = occurrences.create_finder(
-            self.project, self.old_name, self.old_pyname, unsure=unsure,
-            docs=docs, instance=self.old_instance,
-            in_hierarchy=in_hierarchy and self.is_method())
+        description = 'Renaming <%s> to <%s>' % (self.old_name, new_name)
+        changes = self._generate_changes(new_name, unsure, docs,
+                                         in_hierarchy, resources,
+                                         task_handle, workers)
+        if stream:
+            return LazyChangeSet(description, changes, spill=True)
+        result = ChangeSet(description)
+        for change in changes:
+            result.add_change(change)
+        return result
+
+    def _generate_changes(self, new_name, unsure, docs, in_hierarchy,
+                          resources, task_handle, workers):
         job_set = task_handle.create_jobset('Collecting Changes',
                                             len(resources))
-        for file_ in resources:
-            job_set.started_job(file_.path)
-            new_content = rename_in_module(finder, new_name, resource=file_)
-            if new_content is not None:
-                changes.add_change(ChangeContents(file_, new_content))
-            job_set.finished_job()
+        if parallel.is_available(workers) and len(resources) > 1 and \
+           parallel.is_picklable(unsure):
+            results = parallel.map_resources(
+                self.project, _rename_in_resources, resources,
+                args=(self.resource.path, self.offset, new_name, unsure,
+                      docs, in_hierarchy),
+                workers=workers, job_set=job_set)
+            for result in results:
+                for path, new_content in result:
+                    yield ChangeContents(self.project.get_file(path),
+                                         new_content)
+        else:
+            finder = self._create_finder(unsure, docs, in_hierarchy)
+            for file_ in resources:
+                job_set.started_job(file_.path)
+                new_content = rename_in_module(finder, new_name,
+                                               resource=file_)
+                if new_content is not None:
+                    yield ChangeContents(file_, new_content)
+                job_set.finished_job()
         if self._is_renaming_a_module():
             resource = self.old_pyname.get_object().get_resource()
             if self._is_allowed_to_move(resources, resource):
-                self._rename_module(resource, new_name, changes)
-        return changes
+                yield self._rename_module(resource, new_name)
+
+    def _create_finder(self, unsure, docs, in_hierarchy):
+        return occurrences.create_finder(
+            self.project, self.old_name, self.old_pyname, unsure=unsure,
+            docs=docs, instance=self.old_instance,
+            in_hierarchy=in_hierarchy and self.is_method())
 
     def _is_allowed_to_move(self, resources, resource):
         if resource.is_folder():
@@ -124,7 +158,7 @@ class Rename(object):
             isinstance(pyname.get_object(), pyobjects.PyFunction) and \
             isinstance(pyname.get_object().parent, pyobjects.PyClass)
 
-    def _rename_module(self, resource, new_name, changes):
+    def _rename_module(self, resource, new_name):
         if not resource.is_folder():
             new_name = new_name + '.py'
         parent_path = resource.parent.path
@@ -132,7 +166,7 @@ class Rename(object):
             new_location = new_name
         else:
             new_location = parent_path + '/' + new_name
-        changes.add_change(MoveResource(resource, new_location))
+        return MoveResource(resource, new_location)
 
 
 class ChangeOccurrences(object):
@@ -207,6 +241,29 @@ def rename_in_module(occurrences_finder, new_name, resource=None,
     return change_collector.get_changed()
 
 
+class _UnsureValue(object):
+    """An `unsure` function for the deprecated `bool` values"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, occurrence):
+        return self.value
+
+
+def _rename_in_resources(project, resources, path, offset, new_name,
+                         unsure, docs, in_hierarchy):
+    """Called in `rope.base.parallel` worker processes"""
+    renamer = Rename(project, project.get_resource(path), offset)
+    finder = renamer._create_finder(unsure, docs, in_hierarchy)
+    result = []
+    for file_ in resources:
+        new_content = rename_in_module(finder, new_name, resource=file_)
+        if new_content is not None:
+            result.append((file_.path, new_content))
+    return result
+
+
 def _is_local(pyname):
     module, lineno = pyname.get_definition_location()
     if lineno is None:
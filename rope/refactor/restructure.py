@@ -92,13 +92,17 @@ class Restructure(object):
         self.template = similarfinder.CodeTemplate(self.goal)
 
     def get_changes(self, checks=None, imports=None, resources=None,
-                    task_handle=taskhandle.NullTaskHandle()):
+                    task_handle=taskhandle.NullTaskHandle(), stream=False):
         """Get the changes needed by this restructuring
 
         `resources` can be a list of `rope.base.resources.File` to
         apply the restructuring on.  If `None`, the restructuring will
         be applied to all python files.
 
+        If `stream` is `True`, a `rope.base.change.LazyChangeSet` is
+        returned; the changes are computed when they are previewed or
+        performed and their contents are kept in a temporary file.
+
         `checks` argument has been deprecated.  Use the `args` argument
         of the constructor.  The usage of::
 
@@ -128,13 +132,22 @@ class Restructure(object):
                 'use imports parameter of the constructor, instead.',
                 DeprecationWarning, stacklevel=2)
             self.imports = imports
-        changes = change.ChangeSet('Restructuring <%s> to <%s>' %
-                                   (self.pattern, self.goal))
+        description = 'Restructuring <%s> to <%s>' % (self.pattern,
+                                                     self.goal)
         if resources is not None:
             files = [resource for resource in resources
                      if libutils.is_python_file(self.project, resource)]
         else:
             files = self.project.get_python_files()
+        changes = self._generate_changes(files, task_handle)
+        if stream:
+            return change.LazyChangeSet(description, changes, spill=True)
+        result = change.ChangeSet(description)
+        for change_ in changes:
+            result.add_change(change_)
+        return result
+
+    def _generate_changes(self, files, task_handle):
         job_set = task_handle.create_jobset('Collecting Changes', len(files))
         for resource in files:
             job_set.started_job(resource.path)
@@ -147,10 +160,8 @@ class Restructure(object):
             if result is not None:
                 imported_source = self._add_imports(resource, result,
                                                     self.imports)
-                changes.add_change(change.ChangeContents(resource,
-                                                         imported_source))
+                yield change.ChangeContents(resource, imported_source)
             job_set.finished_job()
-        return changes
 
     def _compute_changes(self, matches, pymodule):
         return _ChangeComputer(
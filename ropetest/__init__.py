@@ -17,6 +17,9 @@ import ropetest.runmodtest
 import ropetest.builtinstest
 import ropetest.historytest
 import ropetest.simplifytest
+import ropetest.nameindextest
+import ropetest.watchertest
+import ropetest.paralleltest
 
 import ropetest.contrib
 import ropetest.refactor
@@ -37,6 +40,9 @@ def suite():
     result.addTests(ropetest.builtinstest.suite())
     result.addTests(ropetest.historytest.suite())
     result.addTests(ropetest.simplifytest.suite())
+    result.addTests(ropetest.nameindextest.suite())
+    result.addTests(ropetest.watchertest.suite())
+    result.addTests(ropetest.paralleltest.suite())
 
     result.addTests(ropetest.refactor.suite())
     result.addTests(ropetest.contrib.suite())
@@ -32,6 +32,23 @@ class DynamicOITest(unittest.TestCase):
         self.assertEqual(pymod['a_func'].get_object(),
                           pymod['a_var'].get_object())
 
+    def test_running_several_modules(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod.write('def a_func(arg):\n    return eval("arg")\n')
+        mod1.write('import mod\nclass C1(object):\n    pass\n'
+                   'a_var = mod.a_func(C1)\n')
+        mod2.write('import mod\nclass C2(object):\n    pass\n'
+                   'a_var = mod.a_func(C2)\n')
+        self.pycore.run_modules([mod1, mod2]).wait_process()
+        pymod1 = self.project.get_pymodule(mod1)
+        pymod2 = self.project.get_pymodule(mod2)
+        self.assertEqual(pymod1['C1'].get_object(),
+                         pymod1['a_var'].get_object())
+        self.assertEqual(pymod2['C2'].get_object(),
+                         pymod2['a_var'].get_object())
+
     def test_module_dti(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod2 = testutils.create_module(self.project, 'mod2')
@@ -365,6 +382,13 @@ class DynamicOITest(unittest.TestCase):
                           pymod['a_var'].get_object())
 
 
+class SampledDynamicOITest(DynamicOITest):
+
+    def setUp(self):
+        super(SampledDynamicOITest, self).setUp()
+        self.project.prefs['doa_samples'] = 4
+
+
 class NewStaticOITest(unittest.TestCase):
 
     def setUp(self):
@@ -726,6 +750,35 @@ class NewStaticOITest(unittest.TestCase):
         p_type = f_scope['p'].get_object().get_type()
         self.assertEqual(c_class, p_type)
 
+    def test_analyzing_all_modules_in_workers(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('class C(object):\n    pass\ndef f(p):\n    pass\n')
+        mod2.write('import mod1\nmod1.f(mod1.C())\n'
+                   'l = []\nl.append(mod1.C())\nvar = l.pop()\n')
+        self.mod.write('def g(p):\n    return p\ng("")\n')
+        rope.base.libutils.analyze_modules(self.project, workers=2)
+        pymod1 = self.project.get_pymodule(mod1)
+        c_class = pymod1['C'].get_object()
+        f_scope = pymod1['f'].get_object().get_scope()
+        self.assertEqual(c_class, f_scope['p'].get_object().get_type())
+        pymod2 = self.project.get_pymodule(mod2)
+        self.assertEqual(c_class, pymod2['var'].get_object().get_type())
+        pymod = self.project.get_pymodule(self.mod)
+        g_scope = pymod['g'].get_object().get_scope()
+        self.assertTrue(isinstance(g_scope['p'].get_object().get_type(),
+                                   Str))
+
+    def test_recording_objectdb_additions(self):
+        code = 'class C(object):\n    pass\ndef f(p):\n    pass\nf(C())\n'
+        self.mod.write(code)
+        objectdb = self.pycore.object_info.objectdb
+        objectdb.start_recording()
+        self.pycore.analyze_module(self.mod)
+        records = objectdb.stop_recording()
+        self.assertEqual(['callinfo'], [record[0] for record in records])
+        self.assertEqual(('mod.py', 'f'), records[0][1:3])
+
     def test_validation_problems_for_objectdb_retrievals(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod2 = testutils.create_module(self.project, 'mod2')
@@ -781,6 +834,7 @@ class NewStaticOITest(unittest.TestCase):
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(DynamicOITest))
+    result.addTests(unittest.makeSuite(SampledDynamicOITest))
     result.addTests(unittest.makeSuite(NewStaticOITest))
     return result
 
@@ -50,6 +50,23 @@ class SourceLinesAdapterTest(unittest.TestCase):
         to_lines = SourceLinesAdapter('line1')
         self.assertEqual(1, to_lines.get_line_number(5))
 
+    def test_source_lines_line_and_column(self):
+        to_lines = SourceLinesAdapter('line1\nline2\n')
+        self.assertEqual((1, 0), to_lines.get_line_and_column(0))
+        self.assertEqual((2, 3), to_lines.get_line_and_column(9))
+        self.assertEqual(9, to_lines.get_offset(2, 3))
+
+    def test_source_regions(self):
+        code = 'a = "s"  # c\nb = f"{a}"\n'
+        self.assertEqual([(4, 7, 'string'), (9, 12, 'comment'),
+                          (17, 23, 'fstring')],
+                         codeanalyze.get_source_regions(code))
+
+    def test_source_lines_sharing_line_starts(self):
+        code = 'line1\nline2\n'
+        self.assertTrue(SourceLinesAdapter(code).starts is
+                        SourceLinesAdapter(code).starts)
+
 
 class WordRangeFinderTest(unittest.TestCase):
 
@@ -640,6 +657,22 @@ class LogicalLineFinderTest(unittest.TestCase):
         self.assertEqual((3, 3), line_finder.logical_line_in(3))
         self.assertEqual([5, 6, 7], list(line_finder.generate_starts(4)))
 
+    def test_comments_ending_with_backslashes(self):
+        code = dedent("""\
+            a = [1,  # \\
+                 2]
+            b = 1  # \\
+            c = 2
+        """)
+        line_finder = self._logical_finder(code)
+        self.assertEqual([1, 3, 4], list(line_finder.generate_starts()))
+
+    def test_backslashes_in_strings(self):
+        code = 'a = "1\\\n2"\nb = 1\n'
+        line_finder = self._logical_finder(code)
+        self.assertEqual((1, 2), line_finder.logical_line_in(2))
+        self.assertEqual([1, 3], list(line_finder.generate_starts()))
+
 
 class TokenizerLogicalLineFinderTest(LogicalLineFinderTest):
 
@@ -657,6 +690,14 @@ class CustomLogicalLineFinderTest(LogicalLineFinderTest):
             lines, codeanalyze.custom_generator)
 
 
+class LineScanningLogicalLineFinderTest(LogicalLineFinderTest):
+
+    def _logical_finder(self, code):
+        lines = SourceLinesAdapter(code)
+        return codeanalyze.CachingLogicalLineFinder(
+            lines, lambda lines: codeanalyze._CustomGenerator(lines)())
+
+
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(SourceLinesAdapterTest))
@@ -665,6 +706,7 @@ def suite():
     result.addTests(unittest.makeSuite(LogicalLineFinderTest))
     result.addTests(unittest.makeSuite(TokenizerLogicalLineFinderTest))
     result.addTests(unittest.makeSuite(CustomLogicalLineFinderTest))
+    result.addTests(unittest.makeSuite(LineScanningLogicalLineFinderTest))
     return result
 
 if __name__ == '__main__':
@@ -1,3 +1,5 @@
+import sys
+
 try:
     import unittest2 as unittest
 except ImportError:
@@ -124,6 +126,113 @@ class AutoImportTest(unittest.TestCase):
         self.importer.update_module('sys')
         self.assertTrue('sys' in self.importer.get_modules('exit'))
 
+    def test_import_assist_with_several_names(self):
+        self.mod1.write('myvar = None\nmyfunc = None\nother = None\n')
+        self.mod2.write('myvar = None\n')
+        self.importer.update_resource(self.mod1)
+        self.importer.update_resource(self.mod2)
+        self.assertEqual([('myfunc', 'mod1'), ('myvar', 'mod1'),
+                          ('myvar', 'pkg.mod2')],
+                         self.importer.import_assist('my'))
+
+    def test_import_assist_after_updating_modules(self):
+        names = ['name%d' % index for index in range(100)]
+        self.mod1.write(''.join(name + ' = None\n' for name in names))
+        self.importer.update_resource(self.mod1)
+        self.assertEqual(100, len(self.importer.import_assist('name')))
+        self.mod2.write('name1000 = None\n')
+        self.importer.update_resource(self.mod2)
+        self.mod1.write(''.join(name + ' = None\n' for name in names[1:]))
+        self.importer.update_resource(self.mod1)
+        self.assertEqual([('name10', 'mod1'), ('name1000', 'pkg.mod2')],
+                         self.importer.import_assist('name10'))
+        self.assertEqual([], self.importer.import_assist('name0'))
+
+    def test_searching_names(self):
+        self.mod1.write('AClass = None\nmy_class = None\nother = None\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEqual([('AClass', 'mod1'), ('my_class', 'mod1')],
+                         self.importer.search('class'))
+        self.assertEqual([('AClass', 'mod1')],
+                         self.importer.search('Ac'))
+        self.assertEqual([], self.importer.search('classes'))
+
+    def test_searching_names_after_updating_modules(self):
+        self.mod1.write('my_class = None\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEqual([('my_class', 'mod1')],
+                         self.importer.search('class'))
+        self.mod1.write('your_class = None\n')
+        self.importer.update_resource(self.mod1)
+        self.assertEqual([('your_class', 'mod1')],
+                         self.importer.search('class'))
+
+    def test_generating_cache_in_workers(self):
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('myvar = None\n')
+        self.importer.generate_cache(workers=2)
+        self.assertEqual(['mod1', 'pkg.mod2'],
+                         self.importer.get_modules('myvar'))
+
+    def test_generating_cache_in_workers_finds_the_same_names(self):
+        self.mod1.write(
+            'import os\nfrom sys import path as p\nos = None\n'
+            'a, [b, c] = 1, [2, 3]\ne += 1\n'
+            'if True:\n    def f():\n        g = 1\n'
+            'class C(object):\n    h = 1\n'
+            'for i in []:\n    pass\n'
+            'with open("x") as j:\n    pass\n'
+            'try:\n    pass\nexcept Exception as k:\n    pass\n'
+            'l = lambda m: m\n_n = 1\n')
+        self.importer.update_resource(self.mod1)
+        expected = sorted(self.importer.names['mod1'])
+        self.importer.clear_cache()
+        self.importer.generate_cache(resources=[self.mod1], workers=1)
+        self.assertEqual(expected, sorted(self.importer.names['mod1']))
+        self.assertEqual(['C', 'a', 'b', 'c', 'f', 'i', 'j', 'k', 'l'],
+                         expected)
+
+    @unittest.skipIf(sys.version_info < (3, 6),
+                     'annotated assignments need python 3.6')
+    def test_generating_cache_in_workers_and_annotated_assignments(self):
+        self.mod1.write('a: int = 1\nb: int\n')
+        self.importer.update_resource(self.mod1)
+        expected = sorted(self.importer.names['mod1'])
+        self.importer.clear_cache()
+        self.importer.generate_cache(resources=[self.mod1], workers=1)
+        self.assertEqual(expected, sorted(self.importer.names['mod1']))
+        self.assertTrue('a' in expected)
+
+    def test_generating_cache_in_workers_and_syntax_errors(self):
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('def f(:\n')
+        self.importer.generate_cache(workers=1)
+        self.assertEqual(['mod1'], self.importer.get_modules('myvar'))
+        self.assertEqual([], self.importer.get_modules('f'))
+
+    def test_generating_modules_cache_in_workers(self):
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('myvar = None\n')
+        self.importer.generate_modules_cache(['mod1', 'pkg.*'], workers=2)
+        self.assertEqual(['mod1', 'pkg.mod2'],
+                         self.importer.get_modules('myvar'))
+
+    def test_generating_modules_cache_out_of_project_in_workers(self):
+        self.importer.generate_modules_cache(['json', 'email.*'], workers=2)
+        self.assertEqual(['json'], self.importer.get_modules('loads'))
+        self.assertTrue('email.message' in
+                        self.importer.get_modules('Message'))
+
+    def test_importing_extension_modules_in_sandbox(self):
+        self.importer.generate_modules_cache(['sys'], sandbox=True)
+        self.assertTrue(('path', 'sys') in self.importer.import_assist('pa'))
+        self.assertFalse('sys' in self.importer.get_modules('__name__'))
+
+    def test_sandbox_and_modules_that_cannot_be_imported(self):
+        self.project.prefs['extension_modules'] = ['sys', 'nosuchmodule']
+        self.importer.generate_modules_cache(['nosuchmodule'], sandbox=True)
+        self.assertEqual([], self.importer.get_modules('path'))
+
     def test_submodules(self):
         self.assertEqual(set([self.mod1]),
                           autoimport.submodules(self.mod1))
@@ -160,10 +269,73 @@ class AutoImportObservingTest(unittest.TestCase):
         self.assertEqual([], self.importer.get_modules('myvar'))
 
 
+class AutoImportSavingTest(unittest.TestCase):
+
+    def setUp(self):
+        super(AutoImportSavingTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.mod1 = testutils.create_module(self.project, 'mod1')
+        self.mod2 = testutils.create_module(self.project, 'mod2')
+        self.mod1.write('myvar = None\n')
+        self.mod2.write('myvar = None\n')
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(AutoImportSavingTest, self).tearDown()
+
+    def _reload(self):
+        self.project.data_files.write()
+        return autoimport.AutoImport(self.project, observe=False)
+
+    def test_saving_names(self):
+        importer = autoimport.AutoImport(self.project, observe=False)
+        importer.generate_cache()
+        importer = self._reload()
+        self.assertEqual(['mod1', 'mod2'], importer.get_modules('myvar'))
+
+    def test_saving_changes(self):
+        importer = autoimport.AutoImport(self.project)
+        importer.generate_cache()
+        self.project.data_files.write()
+        self.mod1.write('another = None\n')
+        importer = self._reload()
+        self.assertEqual(['mod1'], importer.get_modules('another'))
+        self.assertEqual(['mod2'], importer.get_modules('myvar'))
+        records = self.project.data_files.read_records('globalnames')
+        self.assertEqual(2, len(records))
+
+    def test_saving_removed_modules(self):
+        importer = autoimport.AutoImport(self.project)
+        importer.generate_cache()
+        self.project.data_files.write()
+        self.mod2.remove()
+        importer = self._reload()
+        self.assertEqual(['mod1'], importer.get_modules('myvar'))
+
+    def test_rewriting_names_with_truncated_records(self):
+        importer = autoimport.AutoImport(self.project)
+        importer.generate_cache()
+        self.project.data_files.write()
+        path = self.project.ropefolder.get_child('globalnames').real_path
+        with open(path, 'ab') as output:
+            output.write(b'\x80\x02(X')
+        importer = autoimport.AutoImport(self.project)
+        self.mod1.write('another = None\n')
+        importer = self._reload()
+        self.assertEqual(['mod1'], importer.get_modules('another'))
+
+    def test_reading_names_saved_by_old_versions(self):
+        self.project.data_files.write_data('globalnames',
+                                           {'mod1': ['myvar']})
+        importer = autoimport.AutoImport(self.project, observe=False)
+        self.assertEqual([('myvar', 'mod1')], importer.import_assist('my'))
+
+
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(AutoImportTest))
     result.addTests(unittest.makeSuite(AutoImportObservingTest))
+    result.addTests(unittest.makeSuite(AutoImportSavingTest))
     return result
 
 if __name__ == '__main__':
@@ -37,6 +37,19 @@ class FindItTest(unittest.TestCase):
         modules = (result[0].resource, result[1].resource)
         self.assertTrue(mod1 in modules and mod2 in modules)
 
+    def test_finding_occurrences_in_parallel(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('a_var = 1\n')
+        mod2.write('import mod1\nmy_var = mod1.a_var')
+        result = find_occurrences(self.project, mod1, 1,
+                                  resources=[mod1, mod2], workers=2)
+        self.assertEqual([mod1, mod2],
+                         [location.resource for location in result])
+        self.assertEqual([0, mod2.read().index('a_var')],
+                         [location.offset for location in result])
+        self.assertEqual([1, 2], [location.lineno for location in result])
+
     def test_finding_occurrences_matching_when_unsure(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod1.write('class C(object):\n    def a_func(self):\n        pass\n'
@@ -2,11 +2,14 @@ import base64
 import hashlib
 import hmac
 import multiprocessing
+import os
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 import socket
+import struct
+import threading
 try:
     import unittest2 as unittest
 except ImportError:
@@ -14,6 +17,7 @@ except ImportError:
 
 
 from rope.base.oi import doa
+from ropetest import testutils
 
 
 class DOATest(unittest.TestCase):
@@ -47,22 +51,24 @@ class DOATest(unittest.TestCase):
         # Make sure the exploit did not run
         self.assertEqual(0, len(received_objs))
         
+    def make_frame(self, key, data):
+        pickled_data = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        digest = hmac.new(key, pickled_data, hashlib.sha256).digest()
+        return struct.pack('>I', len(pickled_data)) + digest + pickled_data
+
     def test_CVE_2014_3539_signature_mismatch(self):
         # Attacker sends well-formed data with an incorrect signature.
         receiver = doa._SocketReceiver()
 
-        pickled_data = pickle.dumps('def foo():\n    return 123\n',
-                                    pickle.HIGHEST_PROTOCOL)
-        digest = hmac.new(b'invalid-key', pickled_data, hashlib.sha256).digest()
-        payload = (base64.b64encode(digest) + b':' +
-                   base64.b64encode(pickled_data) + b'\n')
+        payload = self.make_frame(b'invalid-key',
+                                  ['def foo():\n    return 123\n'])
         received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
 
         # Make sure the exploit did not run
         self.assertEqual(0, len(received_objs))
-        
-    def test_CVE_2014_3539_sanity(self):
-        # Tests that sending valid, signed data on the socket does work.
+
+    def test_CVE_2014_3539_old_line_format(self):
+        # Attacker sends a signed line in the format used before frames.
         receiver = doa._SocketReceiver()
 
         pickled_data = base64.b64encode(
@@ -72,9 +78,53 @@ class DOATest(unittest.TestCase):
         payload = (base64.b64encode(digest) + b':' + pickled_data + b'\n')
         received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
 
+        self.assertEqual(0, len(received_objs))
+
+    def test_CVE_2014_3539_sanity(self):
+        # Tests that sending valid, signed data on the socket does work.
+        receiver = doa._SocketReceiver()
+
+        payload = self.make_frame(receiver.key,
+                                  ['def foo():\n    return 123\n'])
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
         # Make sure the exploit did not run
         self.assertEqual(1, len(received_objs))
 
+    def test_dropping_frames_with_signature_mismatch(self):
+        receiver = doa._SocketReceiver()
+
+        payload = self.make_frame(b'invalid-key', [1, 2]) + \
+            self.make_frame(receiver.key, [3, 4])
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        self.assertEqual([3, 4], received_objs)
+
+    def test_dropping_cut_frames(self):
+        receiver = doa._SocketReceiver()
+
+        payload = self.make_frame(receiver.key, [1, 2]) + \
+            self.make_frame(receiver.key, [3, 4])[:-1]
+        received_objs = self.try_CVE_2014_3539_exploit(receiver, payload)
+
+        self.assertEqual([1, 2], received_objs)
+
+    @testutils.skipNotPOSIX()
+    def test_receiving_on_unix_sockets(self):
+        receiver = doa._UnixSocketReceiver()
+
+        def sender():
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.connect(receiver.path)
+            s.sendall(self.make_frame(receiver.key, [1, 2]))
+            s.close()
+        sender_thread = threading.Thread(target=sender)
+        sender_thread.start()
+        received_objs = list(receiver.receive_data())
+        sender_thread.join()
+        self.assertEqual([1, 2], received_objs)
+        self.assertFalse(os.path.exists(receiver.folder))
+
     def test_compare_digest_compat(self):
         self.assertTrue(doa._compat_compare_digest('', ''))
         self.assertTrue(doa._compat_compare_digest('abc', 'abc'))
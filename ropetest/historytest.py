@@ -1,3 +1,4 @@
+import os
 try:
     import unittest2 as unittest
 except ImportError:
@@ -6,6 +7,7 @@ except ImportError:
 import rope.base.history
 from rope.base import exceptions
 import rope.base.change
+import rope.base.resourceobserver
 from ropetest import testutils
 
 
@@ -404,12 +406,281 @@ class SavingHistoryTest(unittest.TestCase):
         history.redo()
         self.assertTrue(myfile.exists())
 
+    def test_saving_change_contents_as_deltas(self):
+        myfile = self.project.get_file('myfile.txt')
+        myfile.create()
+        old = 'a\nb\nc\nd\n'
+        new = 'a\nB\nc\nd\ne\n'
+        change = rope.base.change.ChangeContents(myfile, new, old)
+        data = self.to_data(change)
+        self.assertFalse(old in repr(data))
+        result = self.to_change(data)
+        self.assertEqual(old, result.old_contents)
+        self.assertEqual(new, result.new_contents)
+
+    def test_reading_change_contents_saved_by_old_versions(self):
+        myfile = self.project.get_file('myfile.txt')
+        data = ('ChangeContents', (myfile.path, 'new', 'old'))
+        result = self.to_change(data)
+        self.assertEqual('old', result.old_contents)
+
+    def test_writing_only_new_changes_to_history(self):
+        self.project.set('save_history', True)
+        history = rope.base.history.History(self.project)
+        myfile = self.project.get_file('myfile.txt')
+        history.do(rope.base.change.CreateResource(myfile))
+        history.write()
+        history.do(rope.base.change.ChangeContents(myfile, 'text'))
+        history.write()
+        records = self.project.data_files.read_records('history')
+        self.assertEqual(['snapshot', 'change', 'lists'],
+                         [record[0] for record in records])
+
+        history = rope.base.history.History(self.project)
+        self.assertEqual(2, len(history.undo_list))
+        history.undo()
+        self.assertEqual('', myfile.read())
+
+    def test_reading_history_saved_by_old_versions(self):
+        self.project.set('save_history', True)
+        myfile = self.project.get_file('myfile.txt')
+        data = [[self.to_data(rope.base.change.CreateResource(myfile))], []]
+        self.project.data_files.write_data('history', data)
+        myfile.create()
+        history = rope.base.history.History(self.project)
+        history.undo()
+        self.assertFalse(myfile.exists())
+
+    def test_compacting_history_journal(self):
+        self.project.set('save_history', True)
+        history = rope.base.history.History(self.project, maxundos=2)
+        myfile = self.project.get_file('myfile.txt')
+        myfile.create()
+        for index in range(10):
+            history.do(rope.base.change.ChangeContents(myfile, str(index)))
+            history.write()
+        records = self.project.data_files.read_records('history')
+        self.assertTrue(len(records) < 10)
+
+        history = rope.base.history.History(self.project, maxundos=2)
+        self.assertEqual(['9', '8'], [change.new_contents for change
+                                      in reversed(history.undo_list)])
+
+    def test_ignoring_truncated_history_records(self):
+        self.project.set('save_history', True)
+        history = rope.base.history.History(self.project)
+        myfile = self.project.get_file('myfile.txt')
+        history.do(rope.base.change.CreateResource(myfile))
+        history.write()
+        path = self.project.ropefolder.get_child('history').real_path
+        with open(path, 'ab') as output:
+            output.write(b'\x80\x02(X')
+        history = rope.base.history.History(self.project)
+        self.assertEqual(1, len(history.undo_list))
+
+    def test_rewriting_history_with_truncated_records(self):
+        self.project.set('save_history', True)
+        history = rope.base.history.History(self.project)
+        myfile = self.project.get_file('myfile.txt')
+        history.do(rope.base.change.CreateResource(myfile))
+        history.write()
+        path = self.project.ropefolder.get_child('history').real_path
+        with open(path, 'ab') as output:
+            output.write(b'\x80\x02(X')
+        history = rope.base.history.History(self.project)
+        history.do(rope.base.change.ChangeContents(myfile, 'text'))
+        history.write()
+        history = rope.base.history.History(self.project)
+        self.assertEqual(2, len(history.undo_list))
+class LazyChangeSetTest(unittest.TestCase):
+
+    def setUp(self):
+        super(LazyChangeSetTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.file1 = self.project.root.create_file('file1.txt')
+        self.file2 = self.project.root.create_file('file2.txt')
+        self.computed = []
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(LazyChangeSetTest, self).tearDown()
+
+    def _generate(self, *contents):
+        for resource, new_contents in zip([self.file1, self.file2],
+                                          contents):
+            self.computed.append(resource)
+            yield rope.base.change.ChangeContents(resource, new_contents)
+
+    def _create_changes(self, *contents, **kwds):
+        return rope.base.change.LazyChangeSet(
+            'testing', self._generate(*contents), **kwds)
+
+    def test_not_computing_changes_before_they_are_needed(self):
+        self._create_changes('1', '2')
+        self.assertEqual([], self.computed)
+
+    def test_iterating_changes_one_by_one(self):
+        changes = self._create_changes('1', '2')
+        iterator = changes.iter_changes()
+        self.assertEqual(self.file1, next(iterator).resource)
+        self.assertEqual([self.file1], self.computed)
+        self.assertEqual([self.file1, self.file2],
+                         [change.resource for change in changes.changes])
+        self.assertEqual(self.file2, next(iterator).resource)
+        self.assertEqual(2, len(list(changes.iter_changes())))
+
+    def test_counting_changes(self):
+        changes = self._create_changes('1', '2')
+        self.assertEqual(None, rope.base.change.count_changes(changes))
+        changes.changes
+        self.assertEqual(2, rope.base.change.count_changes(changes))
+
+    def test_performing_and_undoing(self):
+        self.file1.write('a')
+        self.project.do(self._create_changes('1', '2'))
+        self.assertEqual('1', self.file1.read())
+        self.assertEqual('2', self.file2.read())
+        self.project.history.undo()
+        self.assertEqual('a', self.file1.read())
+        self.assertEqual('', self.file2.read())
+
+    def test_computing_all_changes_before_performing_them(self):
+        def generate():
+            yield rope.base.change.ChangeContents(self.file1, '1')
+            yield rope.base.change.ChangeContents(
+                self.file2, self.file1.read() + '2')
+        changes = rope.base.change.LazyChangeSet('testing', generate())
+        self.project.do(changes)
+        self.assertEqual('2', self.file2.read())
+
+    def test_spilling_contents(self):
+        self.file1.write(u'a\u0101')
+        changes = self._create_changes(u'1\u0101', '2', spill=True)
+        change = next(changes.iter_changes())
+        self.assertFalse(isinstance(change._new_contents,
+                                    type(change.new_contents)))
+        self.assertEqual(u'1\u0101', change.new_contents)
+        self.project.do(changes)
+        self.assertFalse(isinstance(change._old_contents,
+                                    type(change.old_contents)))
+        self.assertEqual(u'a\u0101', change.old_contents)
+        self.project.history.undo()
+        self.assertEqual(u'a\u0101', self.file1.read())
+
+    def test_describing_changes(self):
+        changes = self._create_changes('1\n', spill=True)
+        self.assertTrue('+1' in changes.get_description())
+
+    def test_saving_spilled_changes_in_history(self):
+        self.project.set('save_history', True)
+        self.project.do(self._create_changes('1', '2', spill=True))
+        self.project.history.write()
+        history = rope.base.history.History(self.project)
+        self.assertEqual('testing', history.undo_list[-1].description)
+        history.undo()
+        self.assertEqual('', self.file1.read())
+class BatchedChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        super(BatchedChangesTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.file1 = self.project.root.create_file('file1.txt')
+        self.file2 = self.project.root.create_file('file2.txt')
+        self.file1.write('a')
+        self.file2.write('b')
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(BatchedChangesTest, self).tearDown()
+
+    def _create_changes(self, *changes):
+        result = rope.base.change.ChangeSet('testing')
+        for resource, contents in changes:
+            result.add_change(
+                rope.base.change.ChangeContents(resource, contents))
+        return result
+
+    def test_performing_and_undoing(self):
+        self.project.do(self._create_changes((self.file1, '1'),
+                                             (self.file2, '2')))
+        self.assertEqual('1', self.file1.read())
+        self.assertEqual('2', self.file2.read())
+        self.project.history.undo()
+        self.assertEqual('a', self.file1.read())
+        self.assertEqual('b', self.file2.read())
+
+    def test_changing_a_file_twice(self):
+        self.project.do(self._create_changes(
+            (self.file1, '1'), (self.file2, '2'), (self.file1, '3')))
+        self.assertEqual('3', self.file1.read())
+        self.project.history.undo()
+        self.assertEqual('a', self.file1.read())
+
+    def test_notifying_observers_once(self):
+        changed = []
+        self.project.add_observer(rope.base.resourceobserver.ResourceObserver(
+            changed=changed.append))
+        observer = rope.base.resourceobserver.ResourceObserver()
+        observer.resources_changed = changed.append
+        self.project.add_observer(observer)
+        self.project.do(self._create_changes((self.file1, '1'),
+                                             (self.file2, '2')))
+        self.assertEqual([self.file1, self.file2, [self.file1, self.file2]],
+                         changed)
+
+    def test_reading_new_contents_just_before_writing_them(self):
+        folder = self.project.address
+        temps = []
+
+        class Contents(rope.base.change.ChangeContents):
+
+            @property
+            def new_contents(self):
+                temps.append(len([name for name in os.listdir(folder)
+                                  if name.startswith('.file')]))
+                return self._new_contents
+
+            @new_contents.setter
+            def new_contents(self, contents):
+                self._new_contents = contents
+        changes = rope.base.change.ChangeSet('testing')
+        changes.add_change(Contents(self.file1, '1'))
+        changes.add_change(Contents(self.file2, '2'))
+        self.project.do(changes)
+        self.assertEqual([0, 1], temps)
+        self.assertEqual('1', self.file1.read())
+        self.assertEqual('2', self.file2.read())
+
+    def test_not_changing_any_file_if_writing_fails(self):
+        names = sorted(os.listdir(self.project.address))
+        changes = self._create_changes((self.file1, '1'),
+                                       (self.file2, object()))
+        self.assertRaises(TypeError, self.project.do, changes)
+        self.assertEqual('a', self.file1.read())
+        self.assertEqual('b', self.file2.read())
+        self.assertEqual(names, sorted(os.listdir(self.project.address)))
+
+    @testutils.skipNotPOSIX()
+    def test_keeping_file_modes(self):
+        os.chmod(self.file1.real_path, 0o750)
+        self.project.do(self._create_changes((self.file1, '1'),
+                                             (self.file2, '2')))
+        self.assertEqual(0o750, os.stat(self.file1.real_path).st_mode & 0o777)
+
+    def test_syncing_changes(self):
+        self.project.set('fsync_changes', True)
+        self.project.do(self._create_changes((self.file1, '1'),
+                                             (self.file2, '2')))
+        self.assertEqual('1', self.file1.read())
+
 
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(HistoryTest))
     result.addTests(unittest.makeSuite(IsolatedHistoryTest))
     result.addTests(unittest.makeSuite(SavingHistoryTest))
+    result.addTests(unittest.makeSuite(LazyChangeSetTest))
+    result.addTests(unittest.makeSuite(BatchedChangesTest))
     return result
 
 if __name__ == '__main__':
@@ -0,0 +1,124 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from rope.base import nameindex
+from rope.base.project import Project
+from rope.refactor import rename
+from ropetest import testutils
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        super(NameIndexTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.index = nameindex.NameIndex(self.project)
+        self.mod = testutils.create_module(self.project, 'mod')
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(NameIndexTest, self).tearDown()
+
+    def test_simple_names(self):
+        self.mod.write('a_var = 1\nprint(a_var)\n')
+        self.assertEqual(set(['a_var', '1', 'print']),
+                         self.index.get_names(self.mod))
+
+    def test_contains(self):
+        self.mod.write('a_var = 1\n')
+        self.assertTrue(self.index.contains(self.mod, 'a_var'))
+        self.assertFalse(self.index.contains(self.mod, 'another_var'))
+        self.assertFalse(self.index.contains(self.mod, 'a_va'))
+
+    def test_names_that_are_not_identifiers(self):
+        self.mod.write('import os.path\n')
+        self.assertTrue(self.index.contains(self.mod, 'os.path'))
+
+    def test_names_in_comments_and_strings(self):
+        self.mod.write('# a_var\ns = "another_var"\n')
+        self.assertTrue(self.index.contains(self.mod, 'a_var'))
+        self.assertTrue(self.index.contains(self.mod, 'another_var'))
+
+    def test_updating_after_changes(self):
+        self.mod.write('a_var = 1\n')
+        self.assertTrue(self.index.contains(self.mod, 'a_var'))
+        self.mod.write('another_var = 1\n')
+        self.assertFalse(self.index.contains(self.mod, 'a_var'))
+        self.assertTrue(self.index.contains(self.mod, 'another_var'))
+
+    def test_updating_after_changes_by_other_programs(self):
+        self.mod.write('a_var = 1\n')
+        self.assertTrue(self.index.contains(self.mod, 'a_var'))
+        with open(self.mod.real_path, 'w') as output:
+            output.write('another_var = 1\n')
+        self.assertFalse(self.index.contains(self.mod, 'a_var'))
+        self.assertTrue(self.index.contains(self.mod, 'another_var'))
+
+    def test_moving_and_removing_files(self):
+        self.mod.write('a_var = 1\n')
+        self.index.contains(self.mod, 'a_var')
+        self.mod.move('mod2.py')
+        self.assertEqual(set(), set(self.index.files))
+        mod2 = self.project.get_resource('mod2.py')
+        self.assertTrue(self.index.contains(mod2, 'a_var'))
+        mod2.remove()
+        self.assertEqual(set(), set(self.index.files))
+
+    def test_getting_resources(self):
+        self.mod.write('a_var = 1\n')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('another_var = 1\n')
+        self.assertEqual([self.mod], self.index.get_resources('a_var'))
+
+    def test_persisting_the_index(self):
+        self.mod.write('a_var = 1\n')
+        self.index.contains(self.mod, 'a_var')
+        self.project.close()
+        project = Project(self.project.address)
+        index = nameindex.NameIndex(project)
+        self.assertEqual(set(['mod.py']), set(index.files))
+        self.assertTrue(index.contains(self.mod, 'a_var'))
+
+
+class FinderNameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        super(FinderNameIndexTest, self).setUp()
+        self.project = testutils.sample_project(use_name_index=True)
+        self.mod1 = testutils.create_module(self.project, 'mod1')
+        self.mod2 = testutils.create_module(self.project, 'mod2')
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(FinderNameIndexTest, self).tearDown()
+
+    def test_skipping_files_without_the_name(self):
+        self.mod1.write('def a_func():\n    pass\n')
+        self.mod2.write('import mod1\nmod1.a_func()\n')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod3.write('invalid syntax (\n')
+        renamer = rename.Rename(self.project, self.mod1,
+                                self.mod1.read().index('a_func'))
+        changes = renamer.get_changes('new_func')
+        self.assertEqual(set([self.mod1, self.mod2]),
+                         set(changes.get_changed_resources()))
+
+    def test_not_using_the_index_by_default(self):
+        project = testutils.sample_project(foldername='another_project')
+        try:
+            self.assertTrue(project.name_index is None)
+        finally:
+            testutils.remove_project(project)
+
+
+def suite():
+    result = unittest.TestSuite()
+    result.addTests(unittest.makeSuite(NameIndexTest))
+    result.addTests(unittest.makeSuite(FinderNameIndexTest))
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
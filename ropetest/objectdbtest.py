@@ -4,7 +4,7 @@ except ImportError:
     import unittest
 
 
-from rope.base.oi import objectdb, memorydb
+from rope.base.oi import objectdb, memorydb, sqlitedb
 from ropetest import testutils
 
 
@@ -48,7 +48,8 @@ class ObjectDBTest(unittest.TestCase):
         self.project = testutils.sample_project()
         validation = _MockValidation()
         self.dbs = [
-            objectdb.ObjectDB(memorydb.MemoryDB(self.project), validation)]
+            objectdb.ObjectDB(memorydb.MemoryDB(self.project), validation),
+            objectdb.ObjectDB(sqlitedb.SQLiteDB(self.project), validation)]
 
     def tearDown(self):
         for db in self.dbs:
@@ -153,6 +154,49 @@ class ObjectDBTest(unittest.TestCase):
         db.validate_files()
         self.assertEqual('removed invalid ', observer.log)
 
+    def test_persisting_sqlite_db(self):
+        validation = _MockValidation()
+        db = objectdb.ObjectDB(
+            sqlitedb.SQLiteDB(self.project, persist=True), validation)
+        db.add_callinfo('file', 'key', (1, 2), 3)
+        db.add_pername('file', 'key', 'name', 1)
+        self.project.close()
+        db = objectdb.ObjectDB(
+            sqlitedb.SQLiteDB(self.project, persist=True), validation)
+        self.assertEqual(3, db.get_returned('file', 'key', (1, 2)))
+        self.assertEqual(1, db.get_pername('file', 'key', 'name'))
+        self.assertEqual(['file'], list(db.get_files()))
+
+    @_do_for_all_dbs
+    def test_equal_arguments_that_are_different_objects(self, db):
+        path = 'mod.py'
+        other_path = ''.join(['mod', '.py'])
+        db.add_callinfo('file', 'key', ((path, 'C'), (path, 'C')), 3)
+        args = ((path, 'C'), (other_path, 'C'))
+        self.assertEqual(3, db.get_returned('file', 'key', args))
+        db.add_callinfo('file', 'key', args, 4)
+        self.assertEqual(1, len(list(db.get_callinfos('file', 'key'))))
+
+    def test_selecting_sqlite_backend(self):
+        project = testutils.sample_project(foldername='another_project',
+                                           objectdb_backend='sqlite')
+        try:
+            objectdb_ = project.pycore.object_info.objectdb
+            self.assertTrue(isinstance(objectdb_.db, sqlitedb.SQLiteDB))
+        finally:
+            testutils.remove_project(project)
+
+    def test_opening_a_new_project_with_sqlite_backend(self):
+        project = testutils.sample_project(
+            foldername='another_project', objectdb_backend='sqlite',
+            save_objectdb=True, validate_objectdb=True)
+        try:
+            objectdb_ = project.pycore.object_info.objectdb
+            self.assertTrue(isinstance(objectdb_.db, sqlitedb.SQLiteDB))
+            self.assertTrue(project.ropefolder.has_child('objectdb.sqlite'))
+        finally:
+            testutils.remove_project(project)
+
 
 def suite():
     result = unittest.TestSuite()
@@ -0,0 +1,79 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from rope.base import exceptions, parallel, taskhandle
+from ropetest import testutils
+
+
+_read_paths = []
+
+
+def _read_resources(project, resources):
+    result = []
+    for resource in resources:
+        _read_paths.append(resource.path)
+        result.append(resource.read())
+    return result
+
+
+class ParallelTest(unittest.TestCase):
+
+    def setUp(self):
+        super(ParallelTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.mods = [testutils.create_module(self.project, 'mod%d' % index)
+                     for index in range(3)]
+        del _read_paths[:]
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(ParallelTest, self).tearDown()
+
+    def test_mapping_resources_without_workers(self):
+        for mod in self.mods:
+            mod.write(mod.path)
+        results = parallel.map_resources(self.project, _read_resources,
+                                         self.mods, workers=1)
+        self.assertEqual(['mod0.py', 'mod1.py', 'mod2.py'],
+                         [contents for result in results
+                          for contents in result])
+
+    def test_reporting_progress_without_workers(self):
+        handle = taskhandle.TaskHandle()
+        job_set = handle.create_jobset('reading', len(self.mods))
+        progress = []
+        handle.add_observer(
+            lambda: progress.append((job_set.done, len(_read_paths))))
+        parallel.map_resources(self.project, _read_resources, self.mods,
+                               workers=1, job_set=job_set)
+        self.assertEqual((1, 1), progress[1])
+        self.assertEqual((3, 3), progress[-1])
+
+    def test_stopping_without_workers(self):
+        handle = taskhandle.TaskHandle()
+        job_set = handle.create_jobset('reading', len(self.mods))
+
+        def stop():
+            if job_set.done == 1 and not handle.is_stopped():
+                handle.stop()
+        handle.add_observer(stop)
+        with self.assertRaises(exceptions.InterruptedTaskError):
+            parallel.map_resources(self.project, _read_resources, self.mods,
+                                   workers=1, job_set=job_set)
+        self.assertEqual(['mod0.py'], _read_paths)
+
+    def test_picklable_objects(self):
+        self.assertTrue(parallel.is_picklable((_read_resources, 1)))
+        self.assertFalse(parallel.is_picklable(lambda: None))
+
+
+def suite():
+    result = unittest.TestSuite()
+    result.addTests(unittest.makeSuite(ParallelTest))
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
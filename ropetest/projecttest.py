@@ -2,13 +2,15 @@ import os
 from textwrap import dedent
 import os.path
 import shutil
+import subprocess
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
+import rope.base.change
 from rope.base.exceptions import RopeError, ResourceNotFoundError
-from rope.base.fscommands import FileSystemCommands
+from rope.base.fscommands import FileSystemCommands, GITCommands
 from rope.base.libutils import path_to_resource
 from rope.base.project import Project, NoProject, _realpath
 from ropetest import testutils
@@ -507,6 +509,23 @@ class ProjectTest(unittest.TestCase):
         finally:
             testutils.remove_project(project2)
 
+    @testutils.skipNotPOSIX()
+    def test_ignoring_symlinks_in_get_files(self):
+        project2 = testutils.sample_project(foldername='sampleproject2')
+        mod = project2.root.create_file('mod.py')
+        try:
+            self.project.root.create_file('myfile.txt')
+            os.symlink(mod.real_path, os.path.join(self.project.address,
+                                                   'linkedfile.txt'))
+            os.symlink(project2.address, os.path.join(self.project.address,
+                                                      'linkedfolder'))
+            self.assertEqual(
+                set([self.project.get_file('myfile.txt'),
+                     self.project.get_file(self.sample_file)]),
+                set(self.project.get_files()))
+        finally:
+            testutils.remove_project(project2)
+
     def test_getting_empty_source_folders(self):
         self.assertEqual([], self.project.get_source_folders())
 
@@ -597,6 +616,31 @@ class ResourceObserverTest(unittest.TestCase):
         sample_file.write('a sample file version 2')
         self.assertEqual(0, sample_observer.change_count)
 
+    def _change_files(self, *files):
+        changes = rope.base.change.ChangeSet('changing files')
+        for file_ in files:
+            changes.add_change(rope.base.change.ChangeContents(file_, 'new'))
+        self.project.do(changes)
+
+    def test_changing_several_files_at_once(self):
+        file1 = self.project.root.create_file('file1.txt')
+        file2 = self.project.root.create_file('file2.txt')
+        sample_observer = _SampleObserver()
+        self.project.add_observer(sample_observer)
+        self._change_files(file1, file2)
+        self.assertEqual(2, sample_observer.change_count)
+
+    def test_filtered_observers_and_changing_several_files_at_once(self):
+        folder = self.project.root.create_folder('folder')
+        file1 = folder.create_file('file1.txt')
+        file2 = folder.create_file('file2.txt')
+        sample_observer = _SampleObserver()
+        self.project.add_observer(FilteredResourceObserver(sample_observer,
+                                                           [folder]))
+        self._change_files(file1, file2)
+        self.assertEqual(1, sample_observer.change_count)
+        self.assertEqual(folder, sample_observer.last_changed)
+
     def test_resource_change_observer_for_folders(self):
         root_folder = self.project.root
         my_folder = root_folder.create_folder('my_folder')
@@ -774,6 +818,44 @@ class ResourceObserverTest(unittest.TestCase):
         self.project.validate()
         self.assertEqual(1, len(self.project.get_files()))
 
+    def test_validating_folders_in_get_files_list(self):
+        folder = self.project.root.create_folder('folder')
+        self.assertEqual(0, len(self.project.get_files()))
+        open(os.path.join(folder.real_path, 'myfile.txt'), 'w').close()
+        self.project.validate(folder)
+        self.assertEqual([folder.get_child('myfile.txt')],
+                         list(self.project.get_files()))
+
+    def test_updating_get_files_list_incrementally(self):
+        files = self.project.get_files()
+        folder = self.project.root.create_folder('folder')
+        mod = folder.create_file('mod.py')
+        self.assertTrue(self.project.get_files() is files)
+        self.assertEqual(set([mod]), files)
+        folder.move('pkg')
+        pkg = self.project.get_folder('pkg')
+        self.assertEqual(set([pkg.get_child('mod.py')]), files)
+        pkg.remove()
+        self.assertTrue(self.project.get_files() is files)
+        self.assertEqual(set(), files)
+
+    def test_file_list_generation(self):
+        self.project.get_files()
+        generation = self.project.file_list.generation
+        myfile = self.project.root.create_file('myfile.txt')
+        self.assertNotEqual(generation, self.project.file_list.generation)
+        generation = self.project.file_list.generation
+        myfile.write('text')
+        self.assertEqual(generation, self.project.file_list.generation)
+
+    def test_get_python_files_after_changes(self):
+        mod1 = self.project.root.create_file('mod1.py')
+        self.assertEqual([mod1], self.project.get_python_files())
+        mod2 = self.project.root.create_file('mod2.py')
+        self.project.root.create_file('file.txt')
+        self.assertEqual(set([mod1, mod2]),
+                         set(self.project.get_python_files()))
+
     def test_clear_observered_resources_for_filtered_observers(self):
         sample_file = self.project.root.create_file('myfile.txt')
         sample_observer = _SampleObserver()
@@ -960,6 +1042,16 @@ class RopeFolderTest(unittest.TestCase):
         myfile = self.project.root.create_file('myfile.txt')  # noqa
         self.assertEqual(0, len(self.project.get_files()))
 
+    def test_ignored_folders_and_get_files(self):
+        self.project = testutils.sample_project(
+            ignored_resources=['build', '*.o'], ropefolder=None)
+        build = self.project.root.create_folder('build')
+        build.create_file('mod.py')
+        src = self.project.root.create_folder('src')
+        src.create_file('lib.o')
+        mod = src.create_folder('pkg').create_file('mod.py')
+        self.assertEqual(set([mod]), set(self.project.get_files()))
+
     def test_setting_ignored_resources_patterns(self):
         self.project = testutils.sample_project(ignored_resources=['m?file.*'])
         myfile = self.project.get_file('myfile.txt')
@@ -967,6 +1059,15 @@ class RopeFolderTest(unittest.TestCase):
         self.assertTrue(self.project.is_ignored(myfile))
         self.assertFalse(self.project.is_ignored(file2))
 
+    def test_many_ignored_resources_patterns(self):
+        patterns = ['folder%d//*.txt' % index for index in range(200)]
+        self.project = testutils.sample_project(ignored_resources=patterns)
+        self.assertEqual(0, self.project.ignored.joined_pattern.groups)
+        folder = self.project.root.create_folder('folder199')
+        self.assertTrue(self.project.is_ignored(
+            folder.create_folder('sub').create_file('myfile.txt')))
+        self.assertFalse(self.project.is_ignored(folder.create_file('a.py')))
+
     def test_star_should_not_include_slashes(self):
         self.project = testutils.sample_project(ignored_resources=['f*.txt'])
         folder = self.project.root.create_folder('folder')
@@ -1034,6 +1135,130 @@ class RopeFolderTest(unittest.TestCase):
         ropefolder = self.project.ropefolder
         self.assertEqual('.f1/f2', ropefolder.path)
         self.assertTrue(ropefolder.exists())
+def _is_git_available():
+    try:
+        return subprocess.call(['git', 'version'],
+                               stdout=subprocess.PIPE) == 0
+    except OSError:
+        return False
+
+
+@unittest.skipUnless(_is_git_available(), 'git is not available')
+class GITCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        super(GITCommandsTest, self).setUp()
+        self.project = testutils.sample_project(ropefolder=None)
+        self._git('init', '-q')
+        self.fscommands = GITCommands(self.project.address)
+        self.project.fscommands = self.fscommands
+        self.commands = []
+        do = self.fscommands._do
+
+        def logging_do(args, input=None):
+            self.commands.append(args)
+            do(args, input=input)
+        self.fscommands._do = logging_do
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(GITCommandsTest, self).tearDown()
+
+    def _git(self, *args):
+        process = subprocess.Popen(('git',) + args, cwd=self.project.address,
+                                   stdout=subprocess.PIPE)
+        return process.communicate()[0].decode('utf-8')
+
+    def _tracked(self):
+        return sorted(self._git('ls-files').split())
+
+    def _do(self, *changes):
+        changes_ = rope.base.change.ChangeSet('changes')
+        for change_ in changes:
+            changes_.add_change(change_)
+        self.project.do(changes_)
+
+    def _create_package(self):
+        pkg = self.project.root.create_folder('pkg')
+        self._do(*[rope.base.change.CreateFile(pkg, name)
+                   for name in ['__init__.py', 'mod1.py', 'mod2.py']])
+        return pkg
+
+    def test_adding_created_files_at_once(self):
+        self._create_package()
+        self.assertEqual(1, len(self.commands))
+        self.assertEqual(['pkg/__init__.py', 'pkg/mod1.py', 'pkg/mod2.py'],
+                         self._tracked())
+
+    def test_moving_files_at_once(self):
+        pkg = self._create_package()
+        del self.commands[:]
+        self._do(*[rope.base.change.MoveResource(pkg.get_child(name),
+                                                 'pkg/new_' + name)
+                   for name in ['mod1.py', 'mod2.py']])
+        self.assertEqual(1, len(self.commands))
+        self.assertEqual(['pkg/__init__.py', 'pkg/new_mod1.py',
+                          'pkg/new_mod2.py'], self._tracked())
+
+    def test_not_staging_changes_of_moved_files(self):
+        pkg = self._create_package()
+        self._git('-c', 'user.name=rope', '-c', 'user.email=rope@localhost',
+                  'commit', '-q', '-m', 'package')
+        with open(pkg.get_child('mod1.py').real_path, 'w') as output:
+            output.write('unstaged = 1\n')
+        self._do(rope.base.change.MoveResource(pkg.get_child('mod1.py'),
+                                               'pkg/mod3.py'))
+        self.assertEqual('', self._git('diff', '--cached', '--name-only',
+                                       '-M', '--diff-filter=AD'))
+        self.assertEqual('pkg/mod3.py\n', self._git('diff', '--name-only'))
+        self.assertEqual('unstaged = 1\n',
+                         self.project.get_file('pkg/mod3.py').read())
+
+    def test_swapping_files(self):
+        pkg = self._create_package()
+        self._do(rope.base.change.MoveResource(pkg.get_child('mod1.py'),
+                                               'pkg/tmp.py'),
+                 rope.base.change.MoveResource(pkg.get_child('mod2.py'),
+                                               'pkg/mod1.py'),
+                 rope.base.change.MoveResource(
+                     self.project.get_file('pkg/tmp.py'), 'pkg/mod2.py'))
+        self.assertEqual(['pkg/__init__.py', 'pkg/mod1.py', 'pkg/mod2.py'],
+                         self._tracked())
+
+    def test_moving_folders(self):
+        pkg = self._create_package()
+        pkg.move('newpkg')
+        self.assertEqual(['newpkg/__init__.py', 'newpkg/mod1.py',
+                          'newpkg/mod2.py'], self._tracked())
+        self.project.history.undo()
+        self.assertEqual(['pkg/__init__.py', 'pkg/mod1.py', 'pkg/mod2.py'],
+                         self._tracked())
+
+    def test_moving_a_file_twice(self):
+        pkg = self._create_package()
+        mod1 = pkg.get_child('mod1.py')
+        self._do(rope.base.change.MoveResource(mod1, 'pkg/mod3.py'),
+                 rope.base.change.MoveResource(
+                     self.project.get_file('pkg/mod3.py'), 'pkg/mod4.py'))
+        self.assertEqual(['pkg/__init__.py', 'pkg/mod2.py', 'pkg/mod4.py'],
+                         self._tracked())
+
+    def test_not_adding_moved_untracked_files(self):
+        self._create_package()
+        with open(os.path.join(self.project.address, 'untracked.txt'), 'w'):
+            pass
+        self.project.get_file('untracked.txt').move('moved.txt')
+        self.assertTrue(self.project.get_file('moved.txt').exists())
+        self.assertFalse('moved.txt' in self._tracked())
+
+    def test_removing_files_at_once(self):
+        pkg = self._create_package()
+        del self.commands[:]
+        self._do(rope.base.change.RemoveResource(pkg.get_child('mod1.py')),
+                 rope.base.change.RemoveResource(pkg.get_child('mod2.py')))
+        self.assertEqual(1, len(self.commands))
+        self.assertEqual(['pkg/__init__.py'], self._tracked())
+        self.assertFalse(pkg.has_child('mod1.py'))
 
 
 def suite():
@@ -1042,6 +1267,7 @@ def suite():
     result.addTests(unittest.makeSuite(ResourceObserverTest))
     result.addTests(unittest.makeSuite(OutOfProjectTest))
     result.addTests(unittest.makeSuite(RopeFolderTest))
+    result.addTests(unittest.makeSuite(GITCommandsTest))
     return result
 
 if __name__ == '__main__':
@@ -1,3 +1,4 @@
+import os
 import sys
 
 from rope.base.builtins import File, BuiltinClass
@@ -1142,6 +1143,154 @@ class PyCoreProjectConfigsTest(unittest.TestCase):
         with self.assertRaises(exceptions.ModuleSyntaxError):
             self.project.pycore.resource_to_pyobject(pkg, force_errors=True)
 
+    def test_saving_asts_in_ast_cache(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a_var = 1\n')
+        pymod = self.project.get_pymodule(mod)
+        self.assertTrue('a_var' in pymod)
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual(1, len(os.listdir(cache_folder.real_path)))
+
+    def test_loading_asts_from_ast_cache(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a_var = 1\n')
+        self.project.get_pymodule(mod)
+        ast_cache = self.project.pycore.ast_cache
+        node = ast_cache.parse(mod.read().encode('utf-8'), mod.path)
+        self.assertEqual('a_var', node.body[0].targets[0].id)
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual(1, len(os.listdir(cache_folder.real_path)))
+
+    def test_ast_cache_entries_for_modules_with_equal_contents(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a_var = 1\n')
+        self.project.get_pymodule(mod)
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('a_var = 1\n')
+        pymod2 = self.project.get_pymodule(mod2)
+        self.assertTrue('a_var' in pymod2)
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual(2, len(os.listdir(cache_folder.real_path)))
+
+    def test_replacing_ast_cache_entries_of_changed_modules(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a_var = 1\n')
+        self.project.get_pymodule(mod)
+        mod.write('another_var = 1\n')
+        pymod = self.project.get_pymodule(mod)
+        self.assertTrue('another_var' in pymod)
+        self.assertFalse('a_var' in pymod)
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual(1, len(os.listdir(cache_folder.real_path)))
+
+    def test_clearing_ast_cache(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a_var = 1\n')
+        self.project.get_pymodule(mod)
+        self.project.pycore.ast_cache.clear()
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual([], os.listdir(cache_folder.real_path))
+
+    def test_not_caching_asts_with_syntax_errors(self):
+        self.project = testutils.sample_project(save_ast_cache=True)
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('syntax error ...\n')
+        with self.assertRaises(exceptions.ModuleSyntaxError):
+            self.project.get_pymodule(mod)
+        cache_folder = self.project.get_folder('.ropeproject/astcache')
+        self.assertEqual([], os.listdir(cache_folder.real_path))
+
+    def test_module_cache_stats(self):
+        self.project = testutils.sample_project()
+        mod = testutils.create_module(self.project, 'mod')
+        module_cache = self.project.pycore.module_cache
+        self.project.get_pymodule(mod)
+        self.project.get_pymodule(mod)
+        self.assertEqual({'modules': 1, 'hits': 1, 'misses': 1,
+                          'evictions': 0}, module_cache.get_stats())
+
+    def test_max_cached_modules(self):
+        self.project = testutils.sample_project(max_cached_modules=2)
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        module_cache = self.project.pycore.module_cache
+        pymod1 = self.project.get_pymodule(mod1)
+        self.project.get_pymodule(mod2)
+        self.assertTrue(pymod1 is self.project.get_pymodule(mod1))
+        self.project.get_pymodule(mod3)
+        self.assertEqual([mod1, mod3], list(module_cache.module_map))
+        self.assertEqual(1, module_cache.get_stats()['evictions'])
+        self.assertFalse(mod2 in self.project.pycore.observer.resources)
+
+    def test_evicted_modules_are_reloaded(self):
+        self.project = testutils.sample_project(max_cached_modules=1)
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod1.write('a_var = 1\n')
+        self.project.get_pymodule(mod1)
+        self.project.get_pymodule(mod2)
+        self.assertTrue('a_var' in self.project.get_pymodule(mod1))
+
+    def test_changing_evicted_modules(self):
+        self.project = testutils.sample_project(max_cached_modules=2)
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod1.write('class A(object):\n    pass\n'
+                   'class B(object):\n    pass\na = A()\n')
+        mod2.write('import mod1\nx = mod1.a\n')
+        pymod2 = self.project.get_pymodule(mod2)
+        self.assertEqual('A', pymod2['x'].get_object().get_type().get_name())
+        self.project.get_pymodule(mod2)
+        self.project.get_pymodule(mod3)
+        self.assertFalse(mod1 in self.project.pycore.module_cache.module_map)
+        mod1.write('class A(object):\n    pass\n'
+                   'class B(object):\n    pass\na = B()\n')
+        self.assertTrue(pymod2 is self.project.get_pymodule(mod2))
+        self.assertEqual('B', pymod2['x'].get_object().get_type().get_name())
+
+    def test_forgetting_data_of_dependent_modules_only(self):
+        self.project = testutils.sample_project()
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod4 = testutils.create_module(self.project, 'mod4')
+        mod1.write('import mod2\n')
+        mod2.write('import mod3\n')
+        mod3.write('a_var = 1\n')
+        pymod1 = self.project.get_pymodule(mod1)
+        pymod2 = self.project.get_pymodule(mod2)
+        self.project.get_pymodule(mod4)
+        pymod1['mod2'].get_object()
+        pymod2['mod3'].get_object()
+        mod4.write('a_var = 2\n')
+        self.assertTrue(pymod1['mod2'].pymodule.get() is not None)
+        self.assertTrue(pymod2['mod3'].pymodule.get() is not None)
+        mod3.write('a_var = 2\n')
+        self.assertTrue(pymod1['mod2'].pymodule.get() is None)
+        self.assertTrue(pymod2['mod3'].pymodule.get() is None)
+
+    def test_module_dependencies(self):
+        self.project = testutils.sample_project()
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod1.write('import mod2\n')
+        mod2.write('from mod3 import a_var\n')
+        mod3.write('a_var = 1\n')
+        self.project.get_pymodule(mod1)['mod2'].get_object()
+        self.project.get_pymodule(mod2)['a_var'].get_object()
+        module_cache = self.project.pycore.module_cache
+        self.assertEqual(set([mod1, mod2]),
+                         module_cache.get_dependents(mod3))
+        self.assertEqual(set([mod1]), module_cache.get_dependents(mod2))
+
 
 def suite():
     result = unittest.TestSuite()
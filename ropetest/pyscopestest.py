@@ -295,6 +295,29 @@ class PyCoreScopesTest(unittest.TestCase):
         f_in_c = c_scope.get_scopes()[0]
         self.assertEqual(f_in_c, scope.get_inner_scope_for_line(7))
 
+    def test_get_inner_scope_for_line_with_many_scopes(self):
+        code = ''.join('def f%d():\n    a = 1\n\n' % index
+                       for index in range(20))
+        scope = libutils.get_string_scope(self.project, code)
+        scopes = scope.get_scopes()
+        for index in range(20):
+            self.assertEqual(scopes[index],
+                             scope.get_inner_scope_for_line(index * 3 + 1))
+            self.assertEqual(scopes[index],
+                             scope.get_inner_scope_for_line(index * 3 + 2))
+        self.assertEqual(scope, scope.get_inner_scope_for_line(3, 0))
+
+    def test_get_inner_scope_for_line_after_nested_scopes(self):
+        scope = libutils.get_string_scope(
+            self.project,
+            'def f():\n    def g():\n        pass\n    a = 1\n'
+            'b = 2\n')
+        f_scope = scope.get_scopes()[0]
+        self.assertEqual(f_scope, scope.get_inner_scope_for_line(4))
+        self.assertEqual(scope, scope.get_inner_scope_for_line(5))
+        self.assertEqual(f_scope.get_scopes()[0],
+                         scope.get_inner_scope_for_line(3))
+
     def test_getting_defined_names_for_classes(self):
         scope = libutils.get_string_scope(
             self.project,
@@ -36,6 +36,16 @@ class MoveRefactoringTest(unittest.TestCase):
         self.assertEqual('', self.mod1.read())
         self.assertEqual('foo = 123\n', self.mod2.read())
 
+    def test_streaming_changes(self):
+        self.mod1.write('foo = 123\n')
+        self.mod3.write('import mod1\nprint(mod1.foo)\n')
+        mover = move.create_move(self.project, self.mod1,
+                                 self.mod1.read().index('foo') + 1)
+        self.project.do(mover.get_changes(self.mod2, stream=True))
+        self.assertEqual('', self.mod1.read())
+        self.assertEqual('foo = 123\n', self.mod2.read())
+        self.assertEqual('import mod2\nprint(mod2.foo)\n', self.mod3.read())
+
     def test_move_constant_2(self):
         self.mod1.write('bar = 321\nfoo = 123\n')
         self._move(self.mod1, self.mod1.read().index('foo') + 1,
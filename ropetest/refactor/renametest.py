@@ -1,4 +1,6 @@
+import re
 import sys
+import warnings
 from textwrap import dedent
 try:
     import unittest2 as unittest
@@ -7,6 +9,7 @@ except ImportError:
 
 import rope.base.codeanalyze
 import rope.refactor.occurrences
+from rope.base.change import LazyChangeSet
 from rope.refactor import rename
 from rope.refactor.rename import Rename
 from ropetest import testutils
@@ -267,6 +270,23 @@ class RenameRefactoringTest(unittest.TestCase):
                           mod1.read())
         self.assertEqual('import mod1\nmod1.new_func()\n', mod2.read())
 
+    def test_renaming_functions_across_modules_in_parallel(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('def a_func():\n    pass\na_func()\n')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('import mod1\nmod1.a_func()\n')
+        mod3 = testutils.create_module(self.project, 'mod3')
+        mod3.write('a_func = 1\n')
+        changes = Rename(self.project, mod1, len(mod1.read()) - 5).\
+            get_changes('new_func', resources=[mod1, mod2, mod3], workers=2)
+        self.assertEqual([mod1, mod2],
+                         [change.resource for change in changes.changes])
+        self.project.do(changes)
+        self.assertEqual('def new_func():\n    pass\nnew_func()\n',
+                          mod1.read())
+        self.assertEqual('import mod1\nmod1.new_func()\n', mod2.read())
+        self.assertEqual('a_func = 1\n', mod3.read())
+
     def test_renaming_functions_across_modules_from_import(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod1.write('def a_func():\n    pass\na_func()\n')
@@ -308,6 +328,22 @@ class RenameRefactoringTest(unittest.TestCase):
                         self.project.find_module('newmod') is not None)
         self.assertEqual('from newmod import a_func\n', mod2.read())
 
+    def test_streaming_changes(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('def a_func():\n    pass\n')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('from mod1 import a_func\n')
+        renamer = Rename(self.project, mod2, mod2.read().index('mod1') + 1)
+        changes = renamer.get_changes('newmod', stream=True)
+        self.assertTrue(isinstance(changes, LazyChangeSet))
+        self.assertFalse(changes.is_computed())
+        self.project.do(changes)
+        self.assertTrue(not mod1.exists() and
+                        self.project.find_module('newmod') is not None)
+        self.assertEqual('from newmod import a_func\n', mod2.read())
+        self.project.history.undo()
+        self.assertEqual('from mod1 import a_func\n', mod2.read())
+
     def test_renaming_modules_aliased(self):
         mod1 = testutils.create_module(self.project, 'mod1')
         mod1.write('def a_func():\n    pass\n')
@@ -634,6 +670,26 @@ class RenameRefactoringTest(unittest.TestCase):
             'class C(object):\n    def new_func(self):\n        pass\n'
             'def f(arg):\n    arg.a_func()\n', mod1.read())
 
+    def test_renaming_when_unsure_in_parallel(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('class C(object):\n    def a_func(self):\n        pass\n')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('def f(arg):\n    arg.a_func()\n')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            self._rename(mod1, mod1.read().index('a_func'), 'new_func',
+                         unsure=True, workers=2)
+        self.assertEqual('def f(arg):\n    arg.new_func()\n', mod2.read())
+
+    def test_renaming_when_unsure_with_unpicklable_functions(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod1.write('class C(object):\n    def a_func(self):\n        pass\n')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        mod2.write('def f(arg):\n    arg.a_func()\n')
+        self._rename(mod1, mod1.read().index('a_func'), 'new_func',
+                     unsure=lambda occurrence: True, workers=2)
+        self.assertEqual('def f(arg):\n    arg.new_func()\n', mod2.read())
+
     def test_renaming_when_unsure_not_renaming_knowns(self):
         code = 'class C1(object):\n    def a_func(self):\n        pass\n' \
                'class C2(object):\n    def a_func(self):\n        pass\n' \
@@ -828,11 +884,91 @@ class ImplicitInterfacesTest(unittest.TestCase):
             'mod1.f(A())\nmod1.f(B())\n', self.mod2.read())
 
 
+class MultiFinderTest(unittest.TestCase):
+
+    def setUp(self):
+        super(MultiFinderTest, self).setUp()
+        self.project = testutils.sample_project()
+        self.mod = testutils.create_module(self.project, 'mod')
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(MultiFinderTest, self).tearDown()
+
+    def _find(self, names, **kwds):
+        pymod = self.project.get_pymodule(self.mod)
+        pynames = dict((name, pymod[name]) for name in names)
+        finder = rope.refactor.occurrences.create_multi_finder(
+            self.project, pynames, **kwds)
+        return [(occurrence.offset, self._word(occurrence))
+                for occurrence in finder.find_occurrences(self.mod)]
+
+    def _word(self, occurrence):
+        start, end = occurrence.get_word_range()
+        return self.mod.read()[start:end]
+
+    def _offsets(self, code, *names):
+        result = []
+        for name in names:
+            pattern = re.compile(r'\b%s\b' % name)
+            result.extend((match.start(), name)
+                          for match in pattern.finditer(code))
+        return sorted(result)
+
+    def test_finding_several_names(self):
+        code = 'a = 1\nab = 2\nprint(a, ab)\n'
+        self.mod.write(code)
+        self.assertEqual(self._offsets(code, 'a', 'ab'),
+                         self._find(['a', 'ab']))
+
+    def test_applying_filters_of_each_name(self):
+        code = 'a = 1\nb = 2\ndef f(a):\n    print(a, b)\n'
+        self.mod.write(code)
+        self.assertEqual([(0, 'a'), (6, 'b'), (code.rindex('b'), 'b')],
+                         self._find(['a', 'b']))
+
+    def test_skipping_comments_and_strings(self):
+        code = 'a = 1\nb = 2\n# a b\nprint("a b", a)\n'
+        self.mod.write(code)
+        self.assertEqual([(0, 'a'), (6, 'b'), (code.rindex('a'), 'a')],
+                         self._find(['a', 'b']))
+
+    def test_searching_comments_and_strings_with_docs(self):
+        code = 'a = 1\nb = 2\n# a b\n'
+        self.mod.write(code)
+        self.assertEqual(self._offsets(code, 'a', 'b'),
+                         self._find(['a', 'b'], docs=True))
+
+    @testutils.only_for('3.6')
+    def test_finding_names_in_f_strings(self):
+        code = 'a = 1\nb = 2\nprint(f"{a} {b} a")\n'
+        self.mod.write(code)
+        self.assertEqual([(0, 'a'), (6, 'b'), (21, 'a'), (25, 'b')],
+                         self._find(['a', 'b']))
+
+    def test_matching_single_finders(self):
+        code = 'def f():\n    pass\nclass C(object):\n' \
+               '    def f(self):\n        f()\nC().f()\n# f C\n'
+        self.mod.write(code)
+        pymod = self.project.get_pymodule(self.mod)
+        finders = [rope.refactor.occurrences.create_finder(
+            self.project, name, pymod[name]) for name in ['f', 'C']]
+        expected = sorted(
+            (occurrence.offset, self._word(occurrence))
+            for finder in finders
+            for occurrence in finder.find_occurrences(self.mod))
+        finder = rope.refactor.occurrences.MultiFinder(self.project, finders)
+        self.assertEqual(expected, [
+            (occurrence.offset, self._word(occurrence))
+            for occurrence in finder.find_occurrences(self.mod)])
+
+
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(RenameRefactoringTest))
     result.addTests(unittest.makeSuite(ChangeOccurrencesTest))
     result.addTests(unittest.makeSuite(ImplicitInterfacesTest))
+    result.addTests(unittest.makeSuite(MultiFinderTest))
     return result
 
 
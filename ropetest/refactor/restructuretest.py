@@ -33,6 +33,15 @@ class RestructureTest(unittest.TestCase):
         self.project.do(refactoring.get_changes())
         self.assertEqual('a = int(1)\nb = 1\n', self.mod.read())
 
+    def test_streaming_changes(self):
+        refactoring = restructure.Restructure(self.project,
+                                              'a = 1', 'a = int(1)')
+        self.mod.write('a = 1\nb = 1\n')
+        changes = refactoring.get_changes(stream=True)
+        self.assertTrue('a = int(1)' in changes.get_description())
+        self.project.do(changes)
+        self.assertEqual('a = int(1)\nb = 1\n', self.mod.read())
+
     def test_replacing_patterns_with_normal_names(self):
         refactoring = restructure.Restructure(
             self.project, '${a} = 1', '${a} = int(1)', args={'a': 'exact'})
@@ -6,6 +6,7 @@ except ImportError:
 
 
 from rope.base import exceptions
+from rope.base.oi import doa
 from ropetest import testutils
 
 
@@ -157,6 +158,95 @@ class PythonFileRunnerTest(unittest.TestCase):
         runner.wait_process()
         self.assertEqual('run', self.get_output_file_content(file_path))
 
+    def test_running_several_modules(self):
+        resources = []
+        for index in range(3):
+            file_path = 'sample%d.py' % index
+            self.project.root.create_file(file_path)
+            resource = self.project.get_resource(file_path)
+            resource.write("output = open('output%d.txt', 'w')\n"
+                           "output.write('run')\noutput.close()\n" % index)
+            resources.append(resource)
+        runners = self.pycore.run_modules(resources)
+        runners.wait_process()
+        for index in range(3):
+            output = self.project.get_resource('output%d.txt' % index)
+            self.assertEqual('run', output.read())
+
+    def test_notifying_when_all_modules_are_finished(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        finished = []
+        runners = doa.PythonFileRunners(
+            [doa.PythonFileRunner(self.pycore, mod, analyze_batch=list)
+             for mod in [mod1, mod2]])
+        runners.add_finishing_observer(lambda: finished.append(True))
+        runners.run()
+        runners.wait_process()
+        self.assertEqual([True], finished)
+
+    def _get_function_calls(self, code):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write(code)
+        data = []
+        runner = doa.PythonFileRunner(self.pycore, mod,
+                                      analyze_data=data.append)
+        runner.run()
+        runner.wait_process()
+        # the module has no arguments
+        return [args for function, args, returned in data if args]
+
+    def test_sending_each_function_call_once(self):
+        calls = self._get_function_calls(
+            'def f(arg):\n    return arg\n'
+            'for i in range(10):\n    f(1)\nf("a")\n')
+        self.assertEqual(2, len(calls))
+
+    def test_limiting_function_calls(self):
+        self.project.prefs['max_doa_calls'] = 2
+        calls = self._get_function_calls(
+            'def f(arg):\n    return arg\n'
+            'f(1)\nf(1)\nf("a")\nf([])\n')
+        self.assertEqual(2, len(calls))
+        self.assertEqual(('builtin', 'str'), calls[1][0])
+
+    def test_limiting_function_calls_for_each_function(self):
+        self.project.prefs['max_doa_calls'] = 1
+        calls = self._get_function_calls(
+            'def f(arg):\n    return arg\n'
+            'def g(arg):\n    return arg\n'
+            'f(1)\nf("a")\ng("a")\ng(1)\n')
+        self.assertEqual(2, len(calls))
+        self.assertEqual(('builtin', 'str'), calls[1][0])
+
+    def test_receiving_function_calls_in_batches(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('def f(arg):\n    return arg\n'
+                  'for i in range(3000):\n    f(i)\n'
+                  'f("a")\nf(None)\nf([])\n')
+        batches = []
+        runner = doa.PythonFileRunner(self.pycore, mod,
+                                      analyze_batch=batches.append)
+        runner.run()
+        runner.wait_process()
+        self.assertTrue(batches)
+        calls = [args for batch in batches for function, args, returned
+                 in batch if args]
+        self.assertEqual(4, len(calls))
+
+    def test_sending_function_calls_when_the_program_fails(self):
+        calls = self._get_function_calls(
+            'def f(arg):\n    return arg\nf(1)\nraise ValueError()\n')
+        self.assertEqual(1, len(calls))
+
+    def test_sampling_function_calls(self):
+        self.project.prefs['doa_samples'] = 2
+        calls = self._get_function_calls(
+            'def f(arg):\n    return arg\n'
+            'for i in range(10):\n    f(1)\nf("a")\nf([])\n')
+        self.assertEqual(2, len(calls))
+        self.assertEqual(('builtin', 'str'), calls[1][0])
+
 
 def suite():
     result = unittest.TestSuite()
@@ -3,7 +3,7 @@ try:
 except ImportError:
     import unittest
 
-from rope.base import simplify
+from rope.base import simplify, utils
 
 
 class SimplifyTest(unittest.TestCase):
@@ -62,9 +62,58 @@ class SimplifyTest(unittest.TestCase):
         self.assertEqual('a = 1\nb = 2\n', simplify.real_code(code))
 
 
+class CachedTest(unittest.TestCase):
+
+    def setUp(self):
+        super(CachedTest, self).setUp()
+        self.calls = []
+
+    def _func(self, *args, **kwds):
+        self.calls.append((args, kwds))
+        return len(self.calls)
+
+    def test_caching_results(self):
+        func = utils.cached(2)(self._func)
+        self.assertEqual(1, func('a'))
+        self.assertEqual(1, func('a'))
+        self.assertEqual(2, func('b', c=1))
+        self.assertEqual(2, func('b', c=1))
+        self.assertEqual({'size': 2, 'hits': 2, 'misses': 2},
+                         func.get_stats())
+
+    def test_dropping_least_recently_used_results(self):
+        func = utils.cached(2)(self._func)
+        func('a')
+        func('b')
+        func('a')
+        func('c')
+        self.assertEqual(1, func('a'))
+        self.assertEqual(4, func('b'))
+
+    def test_unhashable_parameters(self):
+        func = utils.cached(2)(self._func)
+        self.assertEqual(1, func(['a']))
+        self.assertEqual(2, func(['a']))
+
+    def test_digest_keys(self):
+        func = utils.cached(2, digest=True)(self._func)
+        text = 'a' * 2000
+        self.assertEqual(1, func(text))
+        self.assertEqual(1, func('a' * 2000))
+        self.assertEqual(2, func(text + 'b'))
+
+    def test_caching_real_code(self):
+        code = 's = "..."\n'
+        hits = simplify.real_code.get_stats()['hits']
+        simplify.real_code(code)
+        simplify.real_code(code)
+        self.assertTrue(simplify.real_code.get_stats()['hits'] > hits)
+
+
 def suite():
     result = unittest.TestSuite()
     result.addTests(unittest.makeSuite(SimplifyTest))
+    result.addTests(unittest.makeSuite(CachedTest))
     return result
 
 if __name__ == '__main__':
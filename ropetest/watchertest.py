@@ -0,0 +1,183 @@
+import os
+import shutil
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from rope.base import watcher
+from rope.base.change import ChangeSet, ChangeContents
+from rope.base.resourceobserver import ResourceObserver
+from ropetest import testutils
+
+
+@unittest.skipUnless(watcher.InotifyWatcher.is_available(),
+                     'inotify is not available')
+class InotifyWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        super(InotifyWatcherTest, self).setUp()
+        self.project = testutils.sample_project(watch_files=True)
+        self.events = []
+        self.project.add_observer(ResourceObserver(
+            changed=lambda resource: self._add_event('changed', resource),
+            moved=lambda resource, new_resource: self._add_event(
+                'moved', resource, new_resource),
+            created=lambda resource: self._add_event('created', resource),
+            removed=lambda resource: self._add_event('removed', resource)))
+
+    def tearDown(self):
+        testutils.remove_project(self.project)
+        super(InotifyWatcherTest, self).tearDown()
+
+    def _add_event(self, kind, *resources):
+        self.events.append((kind,) + tuple(resource.path
+                                           for resource in resources))
+
+    def _write(self, path, contents):
+        with open(os.path.join(self.project.address, path), 'w') as output:
+            output.write(contents)
+
+    def test_creating_the_watcher(self):
+        self.assertTrue(isinstance(self.project.watcher,
+                                   watcher.InotifyWatcher))
+
+    def test_not_creating_the_watcher_by_default(self):
+        project = testutils.sample_project(foldername='sampleproject2')
+        try:
+            self.assertEqual(None, project.watcher)
+        finally:
+            testutils.remove_project(project)
+
+    def test_validating_without_changes(self):
+        self.project.validate()
+        self.assertEqual([], self.events)
+
+    def test_files_created_by_other_programs(self):
+        self.project.get_files()
+        self._write('mod.py', 'a = 1\n')
+        self.project.validate()
+        self.assertEqual([('created', 'mod.py')], self.events)
+        self.assertEqual([self.project.get_file('mod.py')],
+                         list(self.project.get_files()))
+
+    def test_files_changed_by_other_programs(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a = 1\n')
+        self.project.validate()
+        del self.events[:]
+        self._write('mod.py', 'a = 2\n')
+        self.project.validate()
+        self.assertEqual([('changed', 'mod.py')], self.events)
+        pymod = self.project.get_module('mod')
+        self.assertTrue('a' in pymod)
+
+    def test_not_reporting_changes_made_by_rope_again(self):
+        mod = testutils.create_module(self.project, 'mod')
+        mod.write('a = 1\n')
+        del self.events[:]
+        self.project.validate()
+        self.assertEqual([], self.events)
+
+    def test_not_reporting_files_replaced_by_rope_again(self):
+        mod1 = testutils.create_module(self.project, 'mod1')
+        mod2 = testutils.create_module(self.project, 'mod2')
+        self.project.validate()
+        changes = ChangeSet('changing modules')
+        changes.add_change(ChangeContents(mod1, 'a = 1\n'))
+        changes.add_change(ChangeContents(mod2, 'b = 1\n'))
+        self.project.do(changes)
+        del self.events[:]
+        self.project.validate()
+        self.assertEqual([], self.events)
+
+    def test_files_replaced_by_other_programs(self):
+        self.project.root.create_file('mod.py')
+        self.project.validate()
+        del self.events[:]
+        self._write('.mod.py.tmp', 'a = 1\n')
+        os.rename(os.path.join(self.project.address, '.mod.py.tmp'),
+                  os.path.join(self.project.address, 'mod.py'))
+        self.project.validate()
+        self.assertEqual([('changed', 'mod.py')], self.events)
+
+    def test_files_moved_by_other_programs(self):
+        self.project.root.create_file('mod1.py')
+        self.project.validate()
+        del self.events[:]
+        os.rename(os.path.join(self.project.address, 'mod1.py'),
+                  os.path.join(self.project.address, 'mod2.py'))
+        self.project.validate()
+        self.assertEqual([('moved', 'mod1.py', 'mod2.py')], self.events)
+
+    def test_files_in_folders_moved_by_other_programs(self):
+        self.project.root.create_folder('pkg1')
+        self.project.validate()
+        os.rename(os.path.join(self.project.address, 'pkg1'),
+                  os.path.join(self.project.address, 'pkg2'))
+        self.project.validate()
+        del self.events[:]
+        self._write('pkg2/mod.py', '')
+        self.project.validate()
+        self.assertEqual([('created', 'pkg2/mod.py')], self.events)
+
+    def test_folders_removed_by_other_programs(self):
+        pkg = self.project.root.create_folder('pkg')
+        pkg.create_file('mod.py')
+        self.project.get_files()
+        self.project.validate()
+        del self.events[:]
+        shutil.rmtree(pkg.real_path)
+        self.project.validate()
+        self.assertTrue(('removed', 'pkg') in self.events)
+        self.assertEqual(0, len(self.project.get_files()))
+
+    def test_files_in_new_folders(self):
+        os.mkdir(os.path.join(self.project.address, 'pkg'))
+        self._write('pkg/mod.py', '')
+        self.project.get_files()
+        self.project.validate()
+        self.assertEqual([self.project.get_file('pkg/mod.py')],
+                         list(self.project.get_files()))
+
+    def test_ignored_files(self):
+        self._write('mod.pyc', '')
+        self.project.validate()
+        self.assertEqual([], self.events)
+
+    def test_validating_after_closing(self):
+        self.project.get_files()
+        self.project.close()
+        self._write('mod.py', '')
+        self.project.validate()
+        self.assertEqual([self.project.get_file('mod.py')],
+                         list(self.project.get_files()))
+
+    def test_files_in_folders_created_when_events_were_lost(self):
+        self.project.get_files()
+        self.project.validate()
+        project_watcher = self.project.watcher
+        read_events = project_watcher._read_events
+
+        def overflowing_read_events():
+            read_events()
+            project_watcher._read_events = read_events
+            return None
+        project_watcher._read_events = overflowing_read_events
+        os.mkdir(os.path.join(self.project.address, 'newpkg'))
+        self.project.validate()
+        self.assertTrue('newpkg' in project_watcher.paths.values())
+        del self.events[:]
+        self._write('newpkg/mod.py', '')
+        self.project.validate()
+        self.assertEqual([('created', 'newpkg/mod.py')], self.events)
+
+
+def suite():
+    result = unittest.TestSuite()
+    result.addTests(unittest.makeSuite(InotifyWatcherTest))
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()